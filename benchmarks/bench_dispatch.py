@@ -0,0 +1,81 @@
+import argparse
+import asyncio
+import sys
+import time
+
+from zeronineseven.hotkeys._common import normalize_action
+from zeronineseven.hotkeys._dispatch import Dispatcher
+from zeronineseven.hotkeys._engine import ComboEngine, ReadyForNextCombo
+from zeronineseven.hotkeys._replay import synthesize_session
+
+
+async def _two_queues(schedule, motions) -> float:
+    # NOTE(zeronineseven): The pre-dispatch trainer pipeline: the key handler puts into `motions`, a task feeds the
+    #                      engine which puts into `events`, and another task consumes those.
+    motions_q, events_q, combos, done = asyncio.Queue(), asyncio.Queue(), iter(schedule), object()
+
+    def on_event(event) -> None:
+        events_q.put_nowait(event)
+        if event is ReadyForNextCombo:
+            for combo in combos:
+                engine.expect(combo)
+                break
+
+    async def process_motions():
+        while (m := await motions_q.get()) is not done:
+            engine.feed(m)
+        events_q.put_nowait(done)
+
+    async def lifecycle():
+        while await events_q.get() is not done:
+            pass
+
+    engine = ComboEngine(on_event)
+    on_event(ReadyForNextCombo)
+    events_q.get_nowait()
+    started = time.perf_counter()
+    tasks = asyncio.gather(process_motions(), lifecycle())
+    for m in motions:
+        motions_q.put_nowait(m)
+        await asyncio.sleep(0)
+    motions_q.put_nowait(done)
+    await tasks
+    return time.perf_counter() - started
+
+
+async def _direct(schedule, motions) -> float:
+    dispatcher, combos = Dispatcher(), iter(schedule)
+
+    def on_event(event) -> None:
+        if event is ReadyForNextCombo:
+            for combo in combos:
+                engine.expect(combo)
+                break
+
+    engine = ComboEngine(dispatcher.publish)
+    dispatcher.subscribe(on_event)
+    on_event(ReadyForNextCombo)
+    started = time.perf_counter()
+    for m in motions:
+        engine.feed(m)
+        await asyncio.sleep(0)
+    return time.perf_counter() - started
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Per-motion overhead of the queue pipeline vs direct dispatch.")
+    parser.add_argument("--combos", type=int, default=50_000)
+    args = parser.parse_args()
+
+    actions = [normalize_action(("bench",), combo, "") for combo in ("↓ctrl↓f", "↓↑a", "↓alt↓shift↓j", "↓↑f5")]
+    schedule, motions = synthesize_session(actions, args.combos, error_rate=0)
+    # NOTE(zeronineseven): Both variants yield to the loop once per motion, just like separate Qt key events do.
+    legacy = asyncio.run(_two_queues(schedule, motions))
+    direct = asyncio.run(_direct(schedule, motions))
+    print(f"two queues: {legacy / len(motions) * 1e9:.0f}ns per motion")
+    print(f"direct:     {direct / len(motions) * 1e9:.0f}ns per motion ({legacy / direct:.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+import random
+import sys
+import timeit
+import typing
+
+from zeronineseven.hotkeys._common import Key, Press, Release, parse_key_combo_dsl, parse_key_combo_dsl_many
+
+
+def _legacy_parse_key_combo_dsl(keys_combos: str):
+    # NOTE(zeronineseven): Verbatim copy of the pre-compiled character-by-character parser. Kept as the reference
+    #                      both for the speedup numbers and for the equivalence check below.
+    def parse_iter():
+        pressed, index = set(), 0
+        while index < len(keys_combos):
+            m_index = index
+            while keys_combos[m_index] in {"↓", "↑"}:
+                m_index += 1
+            k_index = m_index
+            try:
+                while keys_combos[k_index] not in {"↓", "↑"}:
+                    k_index += 1
+            except IndexError:
+                pass
+            m = keys_combos[index: m_index]
+            k = keys_combos[m_index: k_index]
+            if k not in set(typing.get_args(Key)):
+                raise ValueError(f"Unknown keyboard key '{k}'")
+            if m == "↓↑":
+                yield Press(k)
+                yield Release(k)
+            elif m == "↑↓":
+                raise ValueError("Invalid motion '↑↓'!")
+            elif m == "↑":
+                try:
+                    pressed.remove(k)
+                except KeyError:
+                    raise ValueError(f"'{k}' was never indicated as pressed!")
+                yield Release(k)
+            elif m == "↓":
+                if k in pressed:
+                    raise RuntimeError(f"'{k}' key should already be pressed!")
+                pressed.add(k)
+                yield Press(k)
+            elif __debug__ is True:
+                raise AssertionError()
+            index = k_index
+
+    return tuple(parse_iter())
+
+
+def _random_combo(rnd: random.Random, length: int) -> str:
+    keys = typing.get_args(Key)
+    pressed, parts = [], []
+    for _ in range(length):
+        if pressed and rnd.random() < 0.3:
+            parts.append("↑" + pressed.pop(rnd.randrange(len(pressed))))
+        elif rnd.random() < 0.3:
+            parts.append("↓↑" + rnd.choice(keys))
+        else:
+            k = rnd.choice([k for k in keys if k not in pressed])
+            pressed.append(k)
+            parts.append("↓" + k)
+    return "".join(parts)
+
+
+def _random_garbage(rnd: random.Random, length: int) -> str:
+    return "".join(rnd.choice(("↓", "↑", "a", "b", "f1", "ctrl", "omg")) for _ in range(length))
+
+
+def _outcome(f, combo: str):
+    try:
+        return f(combo)
+    except Exception as e:
+        return type(e), str(e)
+
+
+def check_equivalence(n: int = 20_000, seed: int = 0) -> None:
+    rnd = random.Random(seed)
+    for _ in range(n):
+        combo = _random_combo(rnd, rnd.randint(0, 8)) if rnd.random() < 0.5 else _random_garbage(rnd, rnd.randint(0, 8))
+        expected, actual = _outcome(_legacy_parse_key_combo_dsl, combo), _outcome(parse_key_combo_dsl, combo)
+        assert expected == actual, (combo, expected, actual)
+
+
+def main(deck_size: int = 50_000, repeat: int = 3) -> None:
+    check_equivalence()
+    rnd = random.Random(1)
+    unique = [_random_combo(rnd, rnd.randint(1, 6)) for _ in range(deck_size // 10)]
+    deck = [rnd.choice(unique) for _ in range(deck_size)]
+    results = {
+        "legacy": lambda: [_legacy_parse_key_combo_dsl(c) for c in deck],
+        "parse_key_combo_dsl": lambda: [parse_key_combo_dsl(c) for c in deck],
+        "parse_key_combo_dsl_many": lambda: parse_key_combo_dsl_many(deck),
+    }
+    baseline = None
+    for name, f in results.items():
+        best = min(timeit.repeat(f, number=1, repeat=repeat))
+        baseline = baseline or best
+        print(f"{name:>26}: {best * 1000:9.1f} ms for {deck_size} combos ({baseline / best:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
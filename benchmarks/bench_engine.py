@@ -0,0 +1,32 @@
+import argparse
+import random
+import sys
+import typing
+
+from zeronineseven.hotkeys._common import Key, normalize_action
+from zeronineseven.hotkeys._replay import replay, synthesize_session
+
+
+def _synthetic_deck(size: int, seed: int = 0):
+    rnd, keys = random.Random(seed), typing.get_args(Key)
+    return [normalize_action(("bench",), "".join("↓" + k for k in rnd.sample(keys, rnd.randint(1, 4))), str(n))
+            for n in range(size)]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay synthetic typing through the headless trainer engine.")
+    parser.add_argument("--deck-size", type=int, default=1_000)
+    parser.add_argument("--combos", type=int, default=300_000)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--min-rate", type=float, default=0, help="fail if fewer motions per second get replayed")
+    args = parser.parse_args()
+
+    schedule, motions = synthesize_session(_synthetic_deck(args.deck_size), args.combos, args.error_rate)
+    stats = replay(schedule, motions)
+    print(f"{stats.motions} motions, {stats.matched} matched, {stats.mismatched} mismatched "
+          f"in {stats.seconds:.3f}s: {stats.motions_per_second / 1e6:.2f}M motions/s")
+    return int(stats.motions_per_second < args.min_rate)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
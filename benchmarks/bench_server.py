@@ -0,0 +1,83 @@
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+from zeronineseven.hotkeys._decks import DECKS, load_decks
+from zeronineseven.hotkeys._latency import LatencyHistogram
+from zeronineseven.hotkeys._replay import synthesize_attempt
+from zeronineseven.hotkeys._server import EventKind, TrainingClient, TrainingServer, deck_fingerprint
+
+
+async def _typist(n: int, args: argparse.Namespace, actions, latencies: LatencyHistogram) -> int:
+    client = await (TrainingClient.open_unix(args.unix, f"typist-{n}") if args.unix else
+                    TrainingClient.open_tcp(args.host, args.port, f"typist-{n}"))
+    if client.fingerprint != deck_fingerprint(actions):
+        raise RuntimeError("The server is training on a different deck")
+    rnd, motions = random.Random(n), 0
+    try:
+        for _ in range(args.combos):
+            kind, index = await client.next_event()
+            assert kind is EventKind.EXPECTED
+            if args.think_time:
+                await asyncio.sleep(rnd.expovariate(1 / args.think_time))
+            attempt = synthesize_attempt(actions[index].combo, rnd, args.error_rate)
+            sent_at = time.perf_counter_ns()
+            await client.send(attempt)
+            kind, _ = await client.next_event()
+            assert kind in (EventKind.MATCHED, EventKind.MISMATCHED)
+            latencies.record(time.perf_counter_ns() - sent_at)
+            motions += len(attempt)
+    finally:
+        await client.close()
+    return motions
+
+
+async def _run(args: argparse.Namespace) -> None:
+    actions = load_decks(args.decks or DECKS)
+    server = None
+    if not args.connect:
+        server = TrainingServer(actions)
+        listening = await (server.serve_unix(args.unix) if args.unix else server.serve_tcp(args.host, args.port))
+        args.port = listening.sockets[0].getsockname()[1] if not args.unix else args.port
+    latencies = LatencyHistogram()
+    started = time.perf_counter()
+    motions = sum(await asyncio.gather(*(_typist(n, args, actions, latencies) for n in range(args.clients))))
+    elapsed = time.perf_counter() - started
+    print(f"{args.clients} typists sent {motions} motions in {elapsed:.2f}s: {motions / elapsed:,.0f} motions/s, "
+          f"{latencies.count / elapsed:,.0f} combos/s")
+    print(f"round trip: p50 {latencies.percentile(50) / 1e3:.0f}us, p99 {latencies.percentile(99) / 1e3:.0f}us, "
+          f"p99.9 {latencies.percentile(99.9) / 1e3:.0f}us, max {latencies.max / 1e3:.0f}us")
+    if server is not None:
+        print(f"server: {server.writes} writes for {2 * latencies.count} results, "
+              f"{server.paused} backpressure pauses")
+        listening.close()
+        await listening.wait_closed()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Simulate many concurrent typists against the training server.")
+    parser.add_argument("--deck", dest="decks", action="append", metavar="DECK")
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--combos", type=int, default=50, help="combos per typist")
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--think-time", type=float, default=0, metavar="SECONDS",
+                        help="mean pause before every combo")
+    parser.add_argument("--connect", action="store_true",
+                        help="load an already running server instead of starting one in-process")
+    parser.add_argument("--unix", metavar="PATH")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        if not args.connect and args.unix is None:
+            args.unix = os.path.join(tmp, "server.socket")
+        asyncio.run(_run(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
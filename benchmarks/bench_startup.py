@@ -0,0 +1,50 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Tuple
+
+_ENTRY_POINTS = {
+    "parser": "import zeronineseven.hotkeys._common",
+    "analyzer": "import zeronineseven.hotkeys._conflicts",
+    "package": "import zeronineseven.hotkeys",
+    "all decks": "from zeronineseven.hotkeys import all_controls",
+}
+
+
+def _import_times(code: str, env: Dict[str, str]) -> Tuple[int, List[Tuple[int, int, str]]]:
+    # NOTE(zeronineseven): `-X importtime` writes "import time: self [us] | cumulative | imported package" lines.
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", code], env=env, stderr=subprocess.PIPE,
+                               text=True, check=True)
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), module.rstrip()))
+    return sum(r[0] for r in rows), rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Report `-X importtime` breakdowns of the package entry points.")
+    parser.add_argument("--top", type=int, default=10, help="number of slowest imports to show per entry point")
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as cache_home:
+        env = {**os.environ, "XDG_CACHE_HOME": cache_home}
+        for name, code in {**_ENTRY_POINTS, "all decks (warm)": _ENTRY_POINTS["all decks"]}.items():
+            total_us, rows = _import_times(code, env)
+            print(f"{name}: {total_us / 1000:.1f} ms ({code})")
+            for self_us, cumulative_us, module in sorted(rows, key=lambda r: -r[0])[:args.top]:
+                print(f"    {self_us / 1000:8.2f} ms self {cumulative_us / 1000:8.2f} ms cumulative {module}")
+            heavy = {m.strip() for _, _, m in rows} & {"PyQt5", "qasync"}
+            if heavy:
+                failed = True
+                print(f"    ERROR: non-GUI entry point imports {', '.join(sorted(heavy))}")
+    return int(failed)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import timeit
+import typing
+from typing import Callable, Dict, Iterator, List, Optional
+
+from zeronineseven.hotkeys._common import Key, PackedMotions, parse_key_combo_dsl, parse_key_combo_dsl_many, \
+    pretty_print_motions, serialize_motions_to_str
+
+_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+_COMBO_LENGTHS = 1, 2, 4, 8, 16
+_DECK_SIZES = 1_000, 10_000, 100_000, 1_000_000
+
+
+class _Skipped(Exception):
+    pass
+
+
+# NOTE(zeronineseven): Every benchmark yields `(name, fn, operations)` and gets reported in nanoseconds per
+#                      operation. They are plain generators, so that expensive setup happens only for the selected
+#                      ones and gets thrown away as soon as they are measured. Benchmarks left out by the options
+#                      are still yielded with `fn` being None, so that their baseline numbers are not missed.
+_BENCHMARKS: Dict[str, Callable[[argparse.Namespace], Iterator]] = {}
+
+
+def _benchmark(group: str):
+    def register(f):
+        _BENCHMARKS[group] = f
+        return f
+    return register
+
+
+def _synthetic_combo(rnd: random.Random, length: int) -> str:
+    # NOTE(zeronineseven): Exactly `length` motions: modifier-style presses first, then releases in reverse, and an
+    #                      odd motion is left as a dangling press just like in "↓ctrl↓f".
+    keys = rnd.sample(typing.get_args(Key), (length + 1) // 2)
+    return "".join("↓" + k for k in keys) + "".join("↑" + k for k in reversed(keys[:length // 2]))
+
+
+def synthetic_deck(size: int, seed: int = 0) -> List[str]:
+    # NOTE(zeronineseven): Real decks bind the same combos in many contexts, so bindings are drawn from a pool of
+    #                      unique combos a tenth of the deck's size. `parse_key_combo_dsl_many` parses every unique
+    #                      combo once, so nine in ten bindings hit its memo, the same share at every deck size.
+    rnd = random.Random(seed)
+    pool = [_synthetic_combo(rnd, rnd.randint(1, 8)) for _ in range(max(1, size // 10))]
+    return rnd.choices(pool, k=size)
+
+
+@_benchmark("parse")
+def _parse(args: argparse.Namespace) -> Iterator:
+    rnd = random.Random(0)
+    for length in _COMBO_LENGTHS:
+        combos = [_synthetic_combo(rnd, length) for _ in range(1_000)]
+        yield f"parse/length={length}", lambda combos=combos: [parse_key_combo_dsl(c) for c in combos], len(combos)
+    for size in _DECK_SIZES:
+        if size > args.max_deck_size:
+            yield f"parse_many/deck={size}", None, size
+            continue
+        deck = synthetic_deck(size)
+        yield f"parse_many/deck={size}", lambda deck=deck: parse_key_combo_dsl_many(deck), size
+
+
+@_benchmark("serialize")
+def _serialize(args: argparse.Namespace) -> Iterator:
+    # NOTE(zeronineseven): Cold runs go through more combos than the memoization caches hold, hot runs keep hitting
+    #                      the very same few. Packed runs are cold runs over `PackedMotions`, which are memoized
+    #                      just like tuples.
+    rnd = random.Random(0)
+    for length in _COMBO_LENGTHS:
+        cold = [parse_key_combo_dsl(_synthetic_combo(rnd, length)) for _ in range(10_000)]
+        hot, packed = cold[:100] * 100, [PackedMotions(ms) for ms in cold]
+        for name, f in ("serialize", serialize_motions_to_str), ("pretty_print", pretty_print_motions):
+            yield f"{name}/length={length}/cold", lambda f=f, ms=cold: [f(m) for m in ms], len(cold)
+            yield f"{name}/length={length}/hot", lambda f=f, ms=hot: [f(m) for m in ms], len(hot)
+            yield f"{name}/length={length}/packed", lambda f=f, ms=packed: [f(m) for m in ms], len(packed)
+
+
+@contextlib.contextmanager
+def _offscreen_qt() -> Iterator:
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    # NOTE(zeronineseven): Only PyQt5 itself is optional, the trainer failing to import is a broken benchmark.
+    try:
+        from PyQt5.QtWidgets import QApplication
+    except ImportError as e:
+        raise _Skipped(f"{e.name} is not installed")
+    from zeronineseven.hotkeys import __main__ as trainer
+    app = QApplication.instance() or QApplication([])
+    yield app, trainer
+
+
+@_benchmark("qt")
+def _qt(args: argparse.Namespace) -> Iterator:
+    with _offscreen_qt() as (app, trainer):
+        from PyQt5.QtCore import QEvent, Qt
+        from PyQt5.QtGui import QKeyEvent
+
+        rnd = random.Random(0)
+        mixed = Qt.Key_Control, Qt.Key_Shift, Qt.Key_Alt, Qt.Key_Escape, Qt.Key_F5, Qt.Key_Tab, Qt.Key_A, Qt.Key_5
+        events = [QKeyEvent(QEvent.KeyPress, rnd.choice(mixed), Qt.NoModifier) for _ in range(10_000)]
+        yield "qt/extract_key", lambda: [trainer._extract_key(e) for e in events], len(events)
+
+        # NOTE(zeronineseven): The whole per-keystroke path: Qt delivering the event to the widget, key translation,
+        #                      the engine and the subscribers. Renders are flushed once per run, since frames
+        #                      coalesce them anyway.
+        loop = asyncio.new_event_loop()
+        renderer = trainer.RenderScheduler(loop=loop)
+        combo = parse_key_combo_dsl("↓ctrl↓shift↓a↑a↑shift↑ctrl")
+        qt_keys = {"ctrl": Qt.Key_Control, "shift": Qt.Key_Shift, "a": Qt.Key_A}
+        keystrokes = [QKeyEvent(QEvent.KeyPress if isinstance(m, trainer.Press) else QEvent.KeyRelease,
+                                qt_keys[m.key], Qt.NoModifier) for m in combo] * 1_000
+        with trainer._ComboInput.exists(renderer) as combo_input:
+            combo_input.events.subscribe(
+                lambda event: combo_input.expect(combo) if event is trainer.ReadyForNextCombo else None)
+            combo_input.expect(combo)
+            widget = combo_input.widget
+
+            def type_combos() -> None:
+                for event in keystrokes:
+                    app.sendEvent(widget, event)
+                renderer.flush()
+
+            yield "qt/combo_input_keystroke", type_combos, len(keystrokes)
+        loop.close()
+
+
+def _calibrate() -> float:
+    # NOTE(zeronineseven): A fixed pure Python workload. Results are compared relative to it, so that a baseline
+    #                      recorded on another machine still means something. Shared machines change speed over a
+    #                      run by a third and more, so it runs right before every benchmark, and every benchmark is
+    #                      compared at the speed it was measured at.
+    def workload():
+        d = {}
+        for i in range(10_000):
+            d[i % 97] = d.get(i % 97, 0) + i
+        return d
+
+    return _measure(workload, 10_000, repeat=3)
+
+
+def _measure(fn: Callable[[], object], operations: int, repeat: int) -> float:
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number / operations * 1e9
+
+
+def _slower(ns: float, expected: Optional[float], scale: float, tolerance: float) -> bool:
+    return expected is not None and ns > expected * scale * (1 + tolerance)
+
+
+def _scale(calibration: float, baseline: Dict[str, object], name: str) -> float:
+    return calibration / baseline.get("calibrations", {}).get(name, baseline["calibration_ns"])
+
+
+def run(groups: List[str], args: argparse.Namespace,
+        baseline: Optional[Dict[str, object]] = None) -> Dict[str, object]:
+    results, calibrations, skipped, excluded, names = {}, {}, {}, [], {}
+    expected = baseline["results"] if baseline is not None else {}
+    for group in groups:
+        try:
+            for name, fn, operations in _BENCHMARKS[group](args):
+                names[name] = group
+                if fn is None or args.filter and args.filter not in name:
+                    excluded.append(name)
+                    continue
+                calibrations[name] = _calibrate()
+                results[name] = _measure(fn, operations, args.repeat)
+                # NOTE(zeronineseven): Shared machines are noisy, so a regression is only believed once it shows up
+                #                      in a few more runs in a row.
+                for _ in range(args.confirm):
+                    if baseline is None or not _slower(results[name], expected.get(name),
+                                                       _scale(calibrations[name], baseline, name), args.tolerance):
+                        break
+                    calibration, ns = _calibrate(), _measure(fn, operations, args.repeat)
+                    if ns / calibration < results[name] / calibrations[name]:
+                        calibrations[name], results[name] = calibration, ns
+                print(f"{name:>40}: {results[name]:12.1f} ns/op", flush=True)
+        except _Skipped as e:
+            skipped[group] = str(e)
+            print(f"{group:>40}: skipped, {e}", flush=True)
+    calibration = statistics.median(calibrations.values()) if calibrations else _calibrate()
+    return {"python": platform.python_version(), "implementation": platform.python_implementation(),
+            "machine": platform.machine(), "calibration_ns": calibration, "results": results,
+            "calibrations": calibrations, "groups": names, "selected": groups, "skipped": skipped, "excluded": excluded}
+
+
+def compare(current: Dict[str, object], baseline: Dict[str, object], tolerance: float) -> List[str]:
+    # NOTE(zeronineseven): A benchmark fails when it got slower, but also when it is missing from either side, unless
+    #                      the options left it out or its group was skipped: otherwise a benchmark that silently stops
+    #                      running, or never made it into the baseline, would always pass.
+    failures = []
+    for name, ns in current["results"].items():
+        expected = baseline["results"].get(name)
+        if expected is None:
+            print(f"{name:>40}: MISSING from the baseline")
+            failures.append(name)
+            continue
+        scale = _scale(current["calibrations"][name], baseline, name)
+        slower = _slower(ns, expected, scale, tolerance)
+        print(f"{name:>40}: {ns / (expected * scale):6.2f}x baseline{' REGRESSION' if slower else ''}")
+        if slower:
+            failures.append(name)
+    left_out = set(current["excluded"])
+    for name in baseline["results"].keys() - current["results"].keys():
+        group = baseline.get("groups", {}).get(name)
+        if name in left_out or group is not None and group not in current["selected"]:
+            continue
+        if group in current["skipped"]:
+            print(f"{name:>40}: skipped")
+            continue
+        print(f"{name:>40}: DID NOT RUN")
+        failures.append(name)
+    return failures
+
+
+def main() -> int:
+    # NOTE(zeronineseven): Like the other benchmarks, run from the repository root, so that the package imports.
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite",
+                                     description="Benchmark the parse, serialize and keystroke hot paths, "
+                                                 "and compare the results against a stored baseline.")
+    parser.add_argument("groups", nargs="*",
+                        help=f"benchmark groups to run, all by default: {', '.join(_BENCHMARKS)}")
+    parser.add_argument("--filter", help="only run benchmarks with this substring in their names")
+    parser.add_argument("--max-deck-size", type=int, default=max(_DECK_SIZES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", default=_BASELINE, help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="fail if any benchmark gets slower than the baseline by more than this fraction")
+    parser.add_argument("--confirm", type=int, default=2,
+                        help="re-run a benchmark up to this many times before reporting it as a regression")
+    parser.add_argument("--update-baseline", action="store_true", help="store the results as the new baseline")
+    args = parser.parse_args()
+    unknown = set(args.groups) - set(_BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmark groups: {', '.join(sorted(unknown))}")
+
+    baseline: Optional[Dict[str, object]] = None
+    with contextlib.suppress(FileNotFoundError):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    current = run(args.groups or list(_BENCHMARKS), args, None if args.update_baseline else baseline)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+    if args.update_baseline:
+        # NOTE(zeronineseven): Benchmarks that were not run this time, e.g. the skipped Qt ones, keep their numbers
+        #                      along with the speed they were measured at.
+        if baseline is not None:
+            current = {**current, "results": {**baseline["results"], **current["results"]},
+                       "calibrations": {**{name: baseline.get("calibrations", {}).get(name, baseline["calibration_ns"])
+                                           for name in baseline["results"]}, **current["calibrations"]},
+                       "groups": {**baseline.get("groups", {}), **current["groups"]}}
+        with open(args.baseline, "w") as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+            f.write("\n")
+        return 0
+    if baseline is None:
+        print(f"No baseline at {args.baseline}, run with --update-baseline to store one.")
+        return 0
+    failures = compare(current, baseline, args.tolerance)
+    if failures:
+        print(f"{len(failures)} benchmark(s) regressed beyond {args.tolerance:.0%} or did not match the baseline: "
+              f"{', '.join(failures)}")
+    return int(bool(failures))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
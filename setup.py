@@ -11,5 +11,5 @@ setup(name="zeronineseven-hotkeys",
       author_email="zeronineseven@gmail.com",
       packages=find_namespace_packages(include=["zeronineseven.*"]),
       install_requires=["qasync==0.22.0", "PyQt5==5.15.6", "attr==0.3.1"],
-      extras_require={"tests": ["pytest==7.0.0"]},
+      extras_require={"tests": ["pytest==7.0.0"], "analytics": ["numpy"]},
       )
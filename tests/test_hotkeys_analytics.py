@@ -0,0 +1,62 @@
+import math
+
+import pytest
+
+from zeronineseven.hotkeys._common import KEY_IDS, normalize_action
+from zeronineseven.hotkeys._recording import SessionLog, SessionRecorder
+
+np = pytest.importorskip("numpy")
+analytics = pytest.importorskip("zeronineseven.hotkeys._analytics")
+
+_actions = (
+    normalize_action(("ide",), "↓ctrl↓f", "Find."),
+    normalize_action(("ide",), "↓ctrl↓shift↓f", "Find in files."),
+    normalize_action(("ide",), "↓↑f12", "Terminal."),
+)
+
+
+def test_deck_arrays_and_derived_matrices():
+    deck = analytics.deck_arrays(_actions)
+    assert deck.offsets.tolist() == [0, 2, 5, 7]
+    heatmap = analytics.key_heatmap(deck)
+    assert (heatmap[KEY_IDS["ctrl"]], heatmap[KEY_IDS["f"]], heatmap[KEY_IDS["f12"]]) == (2, 2, 1)
+    modifiers, cooccurrence = analytics.modifier_cooccurrence(deck)
+    ctrl, shift = modifiers.index("ctrl"), modifiers.index("shift")
+    assert (cooccurrence[ctrl, ctrl], cooccurrence[ctrl, shift]) == (2, 1)
+    assert analytics.expensive_bindings(deck, top=1) == ((_actions[1], 6.0),)
+
+
+def test_session_analytics(tmp_path):
+    with SessionRecorder(tmp_path / "session.log") as recorder:
+        for action, matched in ((_actions[0], True), (_actions[2], False), (_actions[0], False)):
+            recorder.expected(action)
+            for m in action.combo:
+                recorder.motion(m)
+            (recorder.matched if matched else recorder.mismatched)(action)
+    with SessionLog(tmp_path / "session.log") as log:
+        records = analytics.session_arrays([log])
+    deck = analytics.deck_arrays(_actions)
+    assert analytics.session_key_heatmap(records)[KEY_IDS["ctrl"]] == 2
+    keys, latencies = analytics.inter_press_latencies(records)
+    assert keys.tolist() == [KEY_IDS["f"], KEY_IDS["f"]] and (latencies > 0).all()
+    percentiles = analytics.latency_percentiles_by_key(keys, latencies, (0, 100))
+    assert percentiles[KEY_IDS["f"]].tolist() == [latencies.min(), latencies.max()]
+    assert math.isnan(percentiles[KEY_IDS["ctrl"], 0])
+    error_rate = analytics.error_rate_by_key(deck, records)
+    assert (error_rate[KEY_IDS["ctrl"]], error_rate[KEY_IDS["f12"]]) == (0.5, 1.0)
+    assert math.isnan(error_rate[KEY_IDS["shift"]])
+
+
+def test_inter_press_latencies_restart_at_every_log(tmp_path):
+    for name in "first.log", "second.log":
+        with SessionRecorder(tmp_path / name) as recorder:
+            for m in _actions[2].combo:
+                recorder.motion(m)
+            recorder.expected(_actions[0])
+            for m in _actions[0].combo:
+                recorder.motion(m)
+            recorder.matched(_actions[0])
+    with SessionLog(tmp_path / "first.log") as first, SessionLog(tmp_path / "second.log") as second:
+        records = analytics.session_arrays([first, second])
+    keys, latencies = analytics.inter_press_latencies(records)
+    assert keys.tolist() == [KEY_IDS["f"], KEY_IDS["f"]] and (latencies > 0).all()
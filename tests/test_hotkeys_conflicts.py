@@ -0,0 +1,33 @@
+from zeronineseven.hotkeys._common import normalize_action
+from zeronineseven.hotkeys._conflicts import analyze_controls, ConflictingMeanings, Duplicate, PrefixShadowing, \
+    UnboundContext
+
+_editor, _search = ("ide", "editor"), ("ide", "search")
+
+
+def test_clean_controls_report_nothing():
+    assert not analyze_controls([normalize_action(_editor, "↓ctrl↓f", "Find."),
+                                 normalize_action(_search, "↓ctrl↓f", "Find again.")], [_editor, _search])
+
+
+def test_every_kind_of_finding_is_reported():
+    find = normalize_action(_editor, "↓ctrl↓f", "Find.")
+    scroll = normalize_action(_editor, "↓ctrl↓f", "Scroll.")
+    ctrl = normalize_action(_editor, "↓ctrl", "Nothing.")
+    reordered = normalize_action(_editor, "↓f↓ctrl", "Also nothing.")
+    report = analyze_controls([find, scroll, find, ctrl, reordered], [_editor, _search])
+    assert report.duplicates == (Duplicate(find, 2),)
+    assert report.conflicts == (ConflictingMeanings(_editor, find.combo, ("Find.", "Scroll.")),)
+    assert set(report.shadowing) == {PrefixShadowing(ctrl, find), PrefixShadowing(ctrl, scroll)}
+    assert not any(finding.combo == reordered.combo for finding in report.conflicts)
+    assert report.unbound_contexts == (UnboundContext(_search),)
+
+
+def test_every_prefix_of_a_combo_shadows_it():
+    ctrl = normalize_action(_editor, "↓ctrl", "Nothing.")
+    ctrl_k = normalize_action(_editor, "↓ctrl↓k", "Chord.")
+    ctrl_k_c = normalize_action(_editor, "↓ctrl↓k↑k↓c", "Comment.")
+    ctrl_c = normalize_action(_search, "↓ctrl↓k↑k↓c", "Copy.")
+    report = analyze_controls([ctrl_k_c, ctrl_c, ctrl_k, ctrl])
+    assert set(report.shadowing) == {PrefixShadowing(ctrl, ctrl_k), PrefixShadowing(ctrl, ctrl_k_c),
+                                     PrefixShadowing(ctrl_k, ctrl_k_c)}
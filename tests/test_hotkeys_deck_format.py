@@ -0,0 +1,36 @@
+import pytest
+
+from zeronineseven.hotkeys._common import normalize_action
+from zeronineseven.hotkeys._deck_format import CompiledDeck, write_compiled_deck
+from zeronineseven.hotkeys._decks import load_deck
+
+_actions = (
+    normalize_action(("ide", "editor"), "↓ctrl↓f", "Find."),
+    normalize_action(("ide", "editor"), "↓↑shift↓shift", "Search everywhere."),
+    normalize_action(("браузер",), "↓ctrl↓f", "Find."),
+)
+
+
+def test_compiled_deck_round_trip(tmp_path):
+    assert write_compiled_deck(tmp_path / "test.deck", _actions) == 3
+    with CompiledDeck(tmp_path / "test.deck") as deck:
+        assert len(deck) == 3
+        assert deck[-1] == _actions[-1]
+        assert tuple(deck) == deck[:] == _actions
+
+
+def test_malformed_decks_are_rejected_up_front(tmp_path):
+    write_compiled_deck(tmp_path / "test.deck", _actions)
+    data = (tmp_path / "test.deck").read_bytes()
+    for name, content, message in (("empty", b"", "not a compiled deck"),
+                                   ("foreign", b"\x00" * len(data), "not a compiled deck"),
+                                   ("truncated", data[:-1], "truncated or corrupt")):
+        (tmp_path / name).write_bytes(content)
+        with pytest.raises(ValueError, match=message):
+            CompiledDeck(tmp_path / name)
+
+
+def test_compiled_decks_load_lazily(tmp_path):
+    write_compiled_deck(tmp_path / "test.deck", _actions)
+    deck = load_deck(str(tmp_path / "test.deck"))
+    assert isinstance(deck, CompiledDeck) and deck[1] == _actions[1] and tuple(deck) == _actions
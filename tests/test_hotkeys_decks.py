@@ -0,0 +1,32 @@
+import os
+import sys
+
+from zeronineseven.hotkeys._common import normalize_action
+from zeronineseven.hotkeys._decks import load_deck, reload_deck
+
+
+def test_snapshot_matches_freshly_parsed_deck(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    parsed = load_deck("edge", use_snapshot=False)
+    assert load_deck("edge") == parsed
+    assert len(os.listdir(tmp_path / "zeronineseven-hotkeys")) == 1
+    assert load_deck("edge") == parsed
+    assert all(type(a.context) is tuple for a in parsed)
+
+
+def test_reload_never_serves_stale_bytecode(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(sys, "dont_write_bytecode", False)
+    deck = tmp_path / "same_mtime_deck.py"
+    source = "from zeronineseven.hotkeys._common import normalize_action\n" \
+             "all_controls = (normalize_action((\"ide\",), \"↓ctrl↓{}\", \"Replace.\"),)\n"
+    deck.write_text(source.format("r"))
+    assert load_deck("same_mtime_deck")[0].combo[-1].key == "r"
+    # NOTE(zeronineseven): Same size and mtime, so the cached bytecode looks up to date.
+    stat = os.stat(deck)
+    deck.write_text(source.format("h"))
+    os.utime(deck, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    expected = (normalize_action(("ide",), "↓ctrl↓h", "Replace."),)
+    assert reload_deck("same_mtime_deck") == expected
+    assert load_deck("same_mtime_deck") == expected
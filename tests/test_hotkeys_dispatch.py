@@ -0,0 +1,30 @@
+from zeronineseven.hotkeys._common import parse_key_combo_dsl
+from zeronineseven.hotkeys._dispatch import Dispatcher
+from zeronineseven.hotkeys._engine import ComboEngine, Matched, ReadyForNextCombo
+
+
+def test_dispatcher_fans_out_in_subscription_order():
+    dispatcher, seen = Dispatcher(), []
+    unsubscribe = dispatcher.subscribe(lambda e: seen.append(("a", e)))
+    dispatcher.subscribe(lambda e: seen.append(("b", e)))
+    dispatcher.publish(1)
+    unsubscribe()
+    dispatcher.publish(2)
+    assert seen == [("a", 1), ("b", 1), ("b", 2)] and dispatcher.published == 2
+
+
+def test_engine_drives_subscribers_synchronously():
+    dispatcher, seen = Dispatcher(), []
+    engine = ComboEngine(dispatcher.publish)
+
+    def on_event(event):
+        seen.append(event)
+        # NOTE(zeronineseven): Subscribers may react by expecting the next combo right away.
+        if event is ReadyForNextCombo:
+            engine.expect(parse_key_combo_dsl("↓↑b"))
+
+    dispatcher.subscribe(on_event)
+    engine.expect(combo := parse_key_combo_dsl("↓↑a"))
+    for m in parse_key_combo_dsl("↓↑a"):
+        engine.feed(m)
+    assert seen[2:] == [Matched(combo), ReadyForNextCombo] and engine.expected == parse_key_combo_dsl("↓↑b")
@@ -1,7 +1,8 @@
 import pytest
 
-from ssost.hotkeys._common import parse_key_combo_dsl, serialize_motions_to_str
-from ssost.hotkeys._common import Press, Release
+from zeronineseven.hotkeys._common import parse_key_combo_dsl, parse_key_combo_dsl_many, serialize_motions_to_str
+from zeronineseven.hotkeys._common import KeyComboDslError
+from zeronineseven.hotkeys._common import Press, Release
 
 
 def test_parse_succeeds():
@@ -23,6 +24,19 @@ def test_parse_fails_when_unknown_key_met():
         parse_key_combo_dsl("↓omg↓wtf↓lol")
 
 
+def test_parse_many_succeeds():
+    assert parse_key_combo_dsl_many(["↓ctrl↓f", "↓↑a", "↓ctrl↓f"]) == (
+        (Press("ctrl"), Press("f")), (Press("a"), Release("a")), (Press("ctrl"), Press("f"))
+    )
+
+
+def test_parse_many_reports_offset_of_failed_combo():
+    with pytest.raises(KeyComboDslError) as e:
+        parse_key_combo_dsl_many(["↓a", "↓ctrl↓omg"])
+    assert (e.value.combo_index, e.value.offset) == (1, 5)
+    assert isinstance(e.value.__cause__, ValueError)
+
+
 def test_serialize_succeeds():
     assert serialize_motions_to_str((Press("a"), Press("b"), Release("b"), Press("shift"), Release("shift"),
                                      Press("shift"), Release("shift"))) == "↓a↓↑b↓↑shift↓↑shift"
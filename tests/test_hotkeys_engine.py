@@ -0,0 +1,51 @@
+from zeronineseven.hotkeys._common import canonical_hash, canonicalize_motions, normalize_action, \
+    parse_key_combo_dsl, parse_key_combo_dsl_packed
+from zeronineseven.hotkeys._engine import ComboEngine, Matched, Mismatched, ReadyForNextCombo
+from zeronineseven.hotkeys._replay import replay, synthesize_session
+
+
+def _feed(combo: str, entered: str, chords: bool = False):
+    events = []
+    engine = ComboEngine(events.append, chords=chords)
+    engine.expect(parse_key_combo_dsl(combo))
+    for m in parse_key_combo_dsl(entered):
+        engine.feed(m)
+    return events, engine
+
+
+def test_engine_waits_for_release_after_match():
+    events, engine = _feed("↓ctrl↓f", "↓ctrl↓f↑f")
+    assert events[2:] == [Matched(parse_key_combo_dsl("↓ctrl↓f"))] and not engine.is_idle
+    engine.feed(parse_key_combo_dsl("↓ctrl↑ctrl")[1])
+    assert events[-1] is ReadyForNextCombo and engine.is_idle
+
+
+def test_engine_reports_mismatch_and_drops_motions_while_idle():
+    events, engine = _feed("↓↑a", "↓↑b↓↑c")
+    assert events == [*parse_key_combo_dsl("↓b"), Mismatched(parse_key_combo_dsl("↓↑a"), parse_key_combo_dsl("↓b")),
+                      ReadyForNextCombo]
+
+
+def test_engine_chord_tolerance():
+    expected = parse_key_combo_dsl("↓ctrl↓shift↓f")
+    assert _feed("↓ctrl↓shift↓f", "↓shift↓ctrl↓f")[0][1] == Mismatched(expected, parse_key_combo_dsl("↓shift"))
+    assert _feed("↓ctrl↓shift↓f", "↓shift↓ctrl↓f", chords=True)[0][3] == Matched(expected)
+    # NOTE(zeronineseven): Only modifiers held together are unordered, the rest of the combo is still strict.
+    assert isinstance(_feed("↓ctrl↓shift↓f", "↓ctrl↓f", chords=True)[0][2], Mismatched)
+    assert isinstance(_feed("↓ctrl↓↑a↓↑b", "↓ctrl↓↑b", chords=True)[0][2], Mismatched)
+
+
+def test_canonical_hash_ignores_modifier_order():
+    assert canonical_hash(parse_key_combo_dsl("↓ctrl↓shift↓f")) == canonical_hash(parse_key_combo_dsl("↓shift↓ctrl↓f"))
+    assert canonicalize_motions(parse_key_combo_dsl("↓ctrl↓↑a")) != \
+        canonicalize_motions(parse_key_combo_dsl("↓↑a↓ctrl"))
+    assert canonical_hash(list(parse_key_combo_dsl("↓alt↓ctrl↓↑j"))) == \
+           canonical_hash(parse_key_combo_dsl_packed("↓ctrl↓alt↓↑j"))
+
+
+def test_replay_of_synthetic_session():
+    actions = [normalize_action(("test",), combo, "") for combo in ("↓ctrl↓f", "↓↑a", "↓↑shift↓shift", "↓alt↓shift↓j")]
+    schedule, motions = synthesize_session(actions, 1000, error_rate=0.1)
+    stats = replay(schedule, motions)
+    assert stats.combos == 1000 and 50 < stats.mismatched < 150
+    assert replay(*synthesize_session(actions, 1000, error_rate=0)).matched == 1000
@@ -0,0 +1,27 @@
+import os
+
+from zeronineseven.hotkeys._common import normalize_action
+from zeronineseven.hotkeys._importers import JetBrainsKeymapImporter, import_vscode_keybindings
+
+_data = os.path.join(os.path.dirname(__file__), "data")
+
+
+def test_jetbrains_keymap_inherits_and_overrides_parent():
+    importer = JetBrainsKeymapImporter([_data], contexts=lambda action_id: ("PyCharm",))
+    actions = list(importer.import_file(os.path.join(_data, "child.xml")))
+    assert actions == [
+        normalize_action(("PyCharm",), "↓ctrl↓shift↓r", "Replace"),
+        normalize_action(("PyCharm",), "↓ctrl↓f", "Find"),
+        normalize_action(("PyCharm",), "↓ctrl↓↑k↑ctrl↓ctrl↓c", "CommentLine"),
+    ]
+    assert importer.missing_parents == {"$default"} and importer.skipped == 1
+
+
+def test_vscode_keybindings_remove_defaults():
+    actions = list(import_vscode_keybindings(os.path.join(_data, "keybindings.json"),
+                                             os.path.join(_data, "defaults.json"),
+                                             contexts=lambda when: ("VS Code", when or "global")))
+    assert actions == [
+        normalize_action(("VS Code", "global"), "↓ctrl↓shift↓f12", "workbench.action.maximizeEditor"),
+        normalize_action(("VS Code", "editorTextFocus"), "↓ctrl↓↑k↑ctrl↓ctrl↓c", "editor.action.addCommentLine"),
+    ]
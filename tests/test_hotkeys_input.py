@@ -0,0 +1,53 @@
+import asyncio
+import os
+import struct
+
+from zeronineseven.hotkeys._common import parse_key_combo_dsl
+from zeronineseven.hotkeys._input import EvdevBackend, decode_evdev_events, read_evdev_dump
+
+_INPUT_EVENT = struct.Struct("@llHHi")
+_EV_SYN, _EV_KEY, _EV_MSC = 0, 1, 4
+_KEY_LEFTBRACE, _KEY_RIGHTBRACE, _KEY_LEFTCTRL, _KEY_RIGHTSHIFT, _KEY_F, _KEY_VOLUMEUP = 26, 27, 29, 54, 33, 115
+
+
+def _dump(*events) -> bytes:
+    return b"".join(_INPUT_EVENT.pack(12, n * 1000, type_, code, value)
+                    for n, (type_, code, value) in enumerate(events))
+
+
+_CTRL_F = _dump((_EV_MSC, 4, 0x1d), (_EV_KEY, _KEY_LEFTCTRL, 1), (_EV_SYN, 0, 0), (_EV_KEY, _KEY_F, 1),
+                (_EV_KEY, _KEY_F, 2), (_EV_KEY, _KEY_VOLUMEUP, 1), (_EV_KEY, _KEY_F, 0), (_EV_KEY, _KEY_LEFTCTRL, 0))
+
+
+def test_decode_skips_everything_but_known_key_motions():
+    decoded = list(decode_evdev_events(_CTRL_F))
+    assert [m for m, _ in decoded] == list(parse_key_combo_dsl("↓ctrl↓f↑f↑ctrl"))
+    assert [timestamp for _, timestamp in decoded] == [12_001, 12_003, 12_006, 12_007]
+    assert [m for m, _ in decode_evdev_events(_dump((_EV_KEY, _KEY_RIGHTSHIFT, 1)), sided=True)] == \
+           list(parse_key_combo_dsl("↓rshift"))
+
+
+def test_decode_reports_bracket_keys_like_qt_does():
+    assert [m for m, _ in decode_evdev_events(_dump((_EV_KEY, _KEY_LEFTBRACE, 1), (_EV_KEY, _KEY_RIGHTBRACE, 1)))] == \
+           list(parse_key_combo_dsl("↓[↓]"))
+
+
+def test_read_evdev_dump_ignores_truncated_tail(tmp_path):
+    (path := tmp_path / "dump").write_bytes(_CTRL_F + _CTRL_F[:7])
+    assert len(list(read_evdev_dump(str(path)))) == 4
+
+
+def test_evdev_backend_reads_split_records_from_pipe():
+    async def main():
+        read_fd, write_fd = os.pipe()
+        backend, received = EvdevBackend(read_fd), []
+        with backend.capturing(lambda m, timestamp: received.append(m)):
+            os.write(write_fd, _CTRL_F[:30])
+            await asyncio.sleep(0.01)
+            os.write(write_fd, _CTRL_F[30:])
+            os.close(write_fd)
+            await asyncio.wait_for(backend.eof, 1)
+        os.close(read_fd)
+        return received
+
+    assert asyncio.run(main()) == list(parse_key_combo_dsl("↓ctrl↓f↑f↑ctrl"))
@@ -0,0 +1,21 @@
+from zeronineseven.hotkeys._latency import LatencyHistogram, LatencyTracer
+
+
+def test_histogram_percentiles_are_within_precision():
+    histogram = LatencyHistogram()
+    for value in range(1, 100_001):
+        histogram.record(value * 1000)
+    assert (histogram.count, histogram.max) == (100_000, 100_000_000)
+    for p, expected in ((50, 50_000_000), (99, 99_000_000)):
+        assert expected <= histogram.percentile(p) <= expected * 1.02
+
+
+def test_tracer_follows_motions_through_every_stage():
+    tracer = LatencyTracer()
+    for timestamp in (1, 2):
+        tracer.received(timestamp)
+        tracer.emitted()
+    tracer.consumed()
+    tracer.consumed()
+    tracer.repainted()
+    assert [count for _, count, *_ in tracer.summary()] == [2, 2, 2]
@@ -0,0 +1,56 @@
+import pickle
+
+import attr
+
+from zeronineseven.hotkeys._common import PackedMotions, Press, Release, parse_key_combo_dsl, parse_key_combo_dsl_packed
+from zeronineseven.hotkeys._common import pretty_print_motions, serialization_cache_info, serialize_motions_to_str
+
+
+def test_parse_returns_flyweights():
+    assert parse_key_combo_dsl("↓ctrl↓f")[0] is parse_key_combo_dsl("↓↑ctrl")[0]
+
+
+def test_motions_are_interned():
+    assert Press("f") is parse_key_combo_dsl("↓f")[0] and Release("f") is not Press("f")
+    assert pickle.loads(pickle.dumps(Release("f12"))) is Release("f12")
+    assert attr.evolve(Press("f"), key="g") is Press("g")
+
+
+def test_packed_motions_behave_like_sequences():
+    packed = parse_key_combo_dsl_packed("↓ctrl↓shift↓↑f12")
+    assert tuple(packed) == (Press("ctrl"), Press("shift"), Press("f12"), Release("f12"))
+    assert len(packed) == 4 and packed[-1] == Release("f12")
+    assert packed[:2] == PackedMotions((Press("ctrl"), Press("shift")))
+    assert hash(packed[:2]) == hash(PackedMotions(parse_key_combo_dsl("↓ctrl↓shift")))
+    assert Release("f12") in packed and Release("ctrl") not in packed
+    assert PackedMotions.from_bytes(bytes(packed)) == packed
+
+
+def test_serialize_accepts_packed_motions():
+    for combo in ("↓a↓↑b↓↑shift↓↑shift", "↓ctrl↑ctrl↓↑a", ""):
+        motions = parse_key_combo_dsl(combo)
+        assert serialize_motions_to_str(PackedMotions(motions)) == serialize_motions_to_str(motions)
+        assert pretty_print_motions(PackedMotions(motions)) == pretty_print_motions(motions)
+
+
+def test_sequence_serializer_matches_iterator_serializer():
+    for combo in ("↓a↓↑b↓↑shift↓↑shift", "↓ctrl↓↑a↑ctrl", "↓alt↓shift↓j↑shift", ""):
+        motions = parse_key_combo_dsl(combo)
+        assert serialize_motions_to_str(iter(motions)) == serialize_motions_to_str(list(motions)) == \
+               serialize_motions_to_str(motions) == combo
+
+
+def test_pretty_printing_of_immutable_combos_is_memoized():
+    motions = parse_key_combo_dsl("↓ctrl↓alt↓↑f7")
+    before = serialization_cache_info()["pretty_print_motions"]
+    assert pretty_print_motions(motions) == pretty_print_motions(motions[:]) == "↓ctrl·↓alt·↓↑f7"
+    after = serialization_cache_info()["pretty_print_motions"]
+    assert after.hits > before.hits
+
+
+def test_packed_motions_are_interchangeable_with_tuples():
+    motions = parse_key_combo_dsl("↓ctrl↓shift↓↑f12")
+    packed = PackedMotions(motions)
+    assert packed == motions and motions == packed and packed != list(motions)
+    assert hash(packed) == hash(motions) and {motions: 1}[packed] == 1
+    assert packed[:2] == motions[:2] and packed != motions[:2]
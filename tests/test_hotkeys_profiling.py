@@ -0,0 +1,63 @@
+import asyncio
+import gc
+import logging
+import threading
+import time
+
+from zeronineseven.hotkeys._profiling import LoopProfiler
+
+
+def test_profiler_attributes_lag_to_slow_coroutine(caplog):
+    async def hog():
+        await asyncio.sleep(0)
+        time.sleep(0.05)
+
+    async def main():
+        profiler, queue = LoopProfiler(interval=0.01, slow_callback=0.03), asyncio.Queue()
+        with profiler.installed(asyncio.get_running_loop()):
+            profiler.watch("test", queue.qsize)
+            for n in range(3):
+                queue.put_nowait(n)
+            await asyncio.create_task(hog())
+            await asyncio.sleep(0.05)
+        return profiler
+
+    original_run = asyncio.Handle._run
+    with caplog.at_level(logging.WARNING, logger="zeronineseven.hotkeys"):
+        profiler = asyncio.run(main())
+    assert profiler.slow_callbacks >= 1 and profiler.tasks_created >= 1 and profiler.depths["test"] == 3
+    assert profiler.lag.max >= 20_000_000 and "hog" in caplog.text
+    assert asyncio.Handle._run is original_run
+
+
+def test_profiler_leaves_other_loops_alone():
+    def hog():
+        time.sleep(0.05)
+
+    def other():
+        loop = asyncio.new_event_loop()
+        loop.call_soon(hog)
+        loop.call_soon(loop.stop)
+        loop.run_forever()
+        loop.close()
+
+    async def main():
+        profiler = LoopProfiler(slow_callback=0.03)
+        with profiler.installed(asyncio.get_running_loop()):
+            thread = threading.Thread(target=other)
+            thread.start()
+            await asyncio.get_running_loop().run_in_executor(None, thread.join)
+        return profiler
+
+    assert asyncio.run(main()).slow_callbacks == 0
+
+
+def test_profiler_is_uninstalled_along_with_an_abandoned_loop():
+    original_run, loop = asyncio.Handle._run, asyncio.new_event_loop()
+    installed = LoopProfiler().installed(loop)
+    installed.__enter__()
+    assert asyncio.Handle._run is not original_run
+    loop.close()
+    del loop, installed
+    gc.collect()
+    assert asyncio.Handle._run is original_run
@@ -0,0 +1,44 @@
+import attr
+import pytest
+
+Qt = pytest.importorskip("PyQt5.QtCore").Qt
+qt_keys = pytest.importorskip("zeronineseven.hotkeys._qt_keys")
+
+
+@attr.frozen
+class _Event:
+    qt_key: int
+    text_: str = ""
+    scan_code: int = 0
+
+    def key(self) -> int:
+        return self.qt_key
+
+    def text(self) -> str:
+        return self.text_
+
+    def nativeScanCode(self) -> int:
+        return self.scan_code
+
+
+def test_key_translates_table_and_known_text():
+    keys = qt_keys.QtKeyTranslator("xcb")
+    assert keys.key(_Event(Qt.Key_Control)) == "ctrl"
+    assert keys.key(_Event(Qt.Key_F12)) == "f12"
+    assert keys.key(_Event(0, "J")) == "j"
+    assert (keys.key(_Event(Qt.Key_BracketLeft, "[")), keys.key(_Event(Qt.Key_BraceLeft, "{"))) == ("[", "{")
+
+
+def test_key_rejects_text_outside_of_key_set():
+    keys = qt_keys.QtKeyTranslator("xcb")
+    assert keys.key(_Event(0, "ё")) is None
+    assert keys.key(_Event(0, "")) is None
+    assert keys.sided_key(_Event(0, "~")) is None
+
+
+def test_sided_key_reads_native_scan_codes():
+    keys = qt_keys.QtKeyTranslator("xcb")
+    assert keys.sided_key(_Event(Qt.Key_Shift, scan_code=50)) == "lshift"
+    assert keys.sided_key(_Event(Qt.Key_Control, scan_code=105)) == "rctrl"
+    assert keys.sided_key(_Event(Qt.Key_Shift, scan_code=999)) == "shift"
+    assert keys.sided_key(_Event(Qt.Key_A, "a")) == "a"
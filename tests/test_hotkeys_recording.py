@@ -0,0 +1,28 @@
+from zeronineseven.hotkeys._common import Press, normalize_action
+from zeronineseven.hotkeys._recording import action_fingerprint, RecordKind, SessionLog, SessionRecorder
+
+
+def test_recording_round_trip(tmp_path):
+    action = normalize_action(("ide",), "↓ctrl↓f", "Find.")
+    for _ in range(2):
+        with SessionRecorder(tmp_path / "session.log", buffer_size=32) as recorder:
+            recorder.expected(action)
+            for m in action.combo:
+                recorder.motion(m)
+            recorder.matched(action)
+    with SessionLog(tmp_path / "session.log") as log:
+        assert len(log) == 10
+        assert [r.kind for r in log][:5] == [RecordKind.SESSION, RecordKind.EXPECTED, RecordKind.MOTION,
+                                             RecordKind.MOTION, RecordKind.MATCHED]
+        assert log[-1].payload == action_fingerprint(action)
+        assert tuple(log.motions()) == action.combo * 2
+        timestamps = [r.timestamp_ns for r in log]
+        assert timestamps[:5] == sorted(timestamps[:5])
+
+
+def test_motions_of_unknown_keys_are_skipped(tmp_path):
+    with SessionRecorder(tmp_path / "session.log") as recorder:
+        recorder.motion(Press("ё"))
+        recorder.motion(Press("a"))
+    with SessionLog(tmp_path / "session.log") as log:
+        assert tuple(log.motions()) == (Press("a"),)
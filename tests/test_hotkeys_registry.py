@@ -0,0 +1,12 @@
+from zeronineseven.hotkeys._common import normalize_action
+from zeronineseven.hotkeys._registry import ControlsRegistry
+
+
+def test_bindings_are_shared_across_contexts():
+    registry = ControlsRegistry()
+    find = [registry.add(context, "↓ctrl↓f", "Find.") for context in (("a",), ("b",), ("c",))]
+    registry.add(("a",), "↓ctrl↓f", "Scroll.")
+    assert find[0].combo is find[2].combo and find[0].description is find[2].description
+    assert tuple(registry) == (*find, normalize_action(("a",), "↓ctrl↓f", "Scroll."))
+    assert registry.contexts("↓ctrl↓f", "Find.") == (("a",), ("b",), ("c",))
+    assert registry.dedup_ratio == 2.0
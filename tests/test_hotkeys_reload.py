@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from zeronineseven.hotkeys._common import normalize_action, parse_key_combo_dsl
+from zeronineseven.hotkeys._reload import DeckReloader, DeckWatcher, diff_decks
+from zeronineseven.hotkeys._scheduler import SpacedRepetitionScheduler
+from zeronineseven.hotkeys._trie import ComboTrie
+
+_old = (
+    normalize_action(("ide",), "↓ctrl↓f", "Find."),
+    normalize_action(("ide",), "↓ctrl↓r", "Replace."),
+    normalize_action(("ide",), "↓↑f6", "Rename."),
+)
+_new = (
+    normalize_action(("ide",), "↓ctrl↓f", "Find."),
+    normalize_action(("ide",), "↓ctrl↓h", "Replace."),
+    normalize_action(("ide",), "↓ctrl↓shift↓f", "Find in files."),
+)
+
+
+def test_diff_and_incremental_updates():
+    diff = diff_decks(_old, _new)
+    assert (diff.added, diff.removed) == (_new[1:], _old[1:]) and diff.changed == {_old[1]: _new[1]}
+    trie, scheduler = ComboTrie.build(_old), SpacedRepetitionScheduler(_old, seed=0)
+    for action in diff.removed:
+        trie.discard(action)
+    for action in diff.added:
+        trie.add(action)
+    scheduler.update(diff.added, diff.removed)
+    rebuilt = ComboTrie.build(_new)
+    for combo in ("↓ctrl", "↓ctrl↓h", "↓ctrl↓r", "↓↑f6", "↓ctrl↓shift↓f"):
+        ms = parse_key_combo_dsl(combo)
+        incremental, expected = trie.walk(ms), rebuilt.walk(ms)
+        assert (incremental.possible, incremental.exact, incremental.is_dead_end) == \
+               (expected.possible, expected.exact, expected.is_dead_end)
+    assert trie.size == 3 and trie.exact_chord(_new[2].combo) == {("ide",): (_new[2],)}
+    assert {scheduler.next() for _ in range(3)} == set(_new) and scheduler.next() is None
+
+
+@pytest.mark.parametrize("use_inotify", (True, False))
+def test_watcher_notices_replaced_files(tmp_path, use_inotify):
+    (deck := tmp_path / "deck.py").write_text("all_controls = ()\n")
+
+    async def main():
+        changed = asyncio.Event()
+        watcher = DeckWatcher({"deck": str(deck)}, debounce=0.01, poll_interval=0.01, use_inotify=use_inotify)
+        names = []
+        with watcher.watching(lambda name: (names.append(name), changed.set())):
+            await asyncio.sleep(0.05)
+            (tmp_path / "other.py").write_text("")
+            (tmp_path / "deck.py.tmp").write_text("all_controls = ((),)\n")
+            (tmp_path / "deck.py.tmp").replace(deck)
+            await asyncio.wait_for(changed.wait(), 2)
+            await asyncio.sleep(0.05)
+        return watcher.backend, names
+
+    backend, names = asyncio.run(main())
+    assert names == ["deck"] and backend == ("inotify" if use_inotify else "polling")
+
+
+def test_reloader_keeps_last_good_deck(tmp_path, monkeypatch, caplog):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    deck = tmp_path / "hot_reloaded_deck.py"
+    source = "from zeronineseven.hotkeys._common import normalize_action\nall_controls = ({})\n"
+    deck.write_text(source.format('normalize_action(("ide",), "↓ctrl↓r", "Replace."),'))
+    reloader, diffs = DeckReloader(["hot_reloaded_deck"]), []
+    reloader.changes.subscribe(diffs.append)
+    deck.write_text(source.format('normalize_action(("ide",), "↓ctrl↓shift↓h", "Replace."),'))
+    replaced = normalize_action(("ide",), "↓ctrl↓shift↓h", "Replace.")
+    assert reloader.reload("hot_reloaded_deck").changed == {_old[1]: replaced}
+    deck.write_text(source.format("oops"))
+    assert reloader.reload("hot_reloaded_deck") is None and "Failed to reload" in caplog.text
+    assert len(diffs) == 1 and reloader.actions == (diffs[0].added[0],)
@@ -0,0 +1,19 @@
+import asyncio
+
+from zeronineseven.hotkeys._render import RenderScheduler
+
+
+def test_updates_within_a_frame_are_coalesced():
+    async def main():
+        rendered, calls, echoed = [], [], []
+        scheduler = RenderScheduler(frame_interval=0.01)
+        for text in ("a", "ab", "abc"):
+            scheduler.set_lazy(rendered.append, lambda t: calls.append(t) or t, text)
+        scheduler.set(echoed.append, "never rendered")
+        scheduler.set(echoed.append, "rendered")
+        await asyncio.sleep(0.05)
+        return rendered, calls, echoed, scheduler
+
+    rendered, calls, echoed, scheduler = asyncio.run(main())
+    assert rendered == calls == ["abc"] and echoed == ["rendered"]
+    assert (scheduler.renders, scheduler.coalesced) == (2, 3)
@@ -0,0 +1,46 @@
+from zeronineseven.hotkeys._common import normalize_action
+from zeronineseven.hotkeys._scheduler import SpacedRepetitionScheduler
+
+_actions = [normalize_action(("ide",), f"↓ctrl↓{k}", f"Action {k}.") for k in "abcdefgh"]
+
+
+def test_mistakes_come_back_before_mastered_actions():
+    now = [0.0]
+    scheduler = SpacedRepetitionScheduler(_actions, clock=lambda: now[0], seed=0)
+    first, second = scheduler.next(), scheduler.next()
+    scheduler.review(first, matched=True)
+    scheduler.review(second, matched=False)
+    rest = [scheduler.next() for _ in range(len(_actions) - 2)]
+    assert set(rest) == set(_actions) - {first, second}
+    assert scheduler.next() == second and scheduler.next() == first and scheduler.next() is None
+
+
+def test_state_survives_in_journal(tmp_path):
+    with SpacedRepetitionScheduler(_actions, tmp_path / "journal") as scheduler:
+        card = scheduler.review(_actions[3], matched=True)
+    with SpacedRepetitionScheduler(_actions, tmp_path / "journal") as scheduler:
+        assert scheduler.card(_actions[3]) == card
+
+
+def test_mismatched_card_jumps_the_queue_once_due():
+    now = [0.0]
+    scheduler = SpacedRepetitionScheduler(_actions, clock=lambda: now[0], relearn_interval=60.0, seed=0)
+    missed = scheduler.next()
+    scheduler.review(missed, matched=False)
+    assert scheduler.next() != missed
+    now[0] = 61.0
+    assert scheduler.next() == missed
+
+
+def test_compaction_keeps_cards_of_other_decks(tmp_path):
+    journal = tmp_path / "journal"
+    with SpacedRepetitionScheduler(_actions[:4], journal) as scheduler:
+        other = scheduler.review(_actions[0], matched=True)
+    with SpacedRepetitionScheduler(_actions[4:], journal) as scheduler:
+        for _ in range(1200):
+            scheduler.review(_actions[5], matched=True)
+    with SpacedRepetitionScheduler(_actions[4:], journal):
+        pass
+    assert len(journal.read_text().splitlines()) == 2
+    with SpacedRepetitionScheduler(_actions[:4], journal) as scheduler:
+        assert scheduler.card(_actions[0]) == other
@@ -0,0 +1,59 @@
+from zeronineseven.hotkeys._common import normalize_action
+from zeronineseven.hotkeys import _search
+from zeronineseven.hotkeys._search import ShortcutIndex
+
+_actions = (
+    normalize_action(("pycharm", "editor"), "↓shift↓↑f6↑shift", "Rename."),
+    normalize_action(("pycharm", "editor"), "↓ctrl↓shift↓↑f6↑shift↑ctrl", "Rename file."),
+    normalize_action(("pycharm", "editor"), "↓ctrl↓↑r↑ctrl", "Replace in current file."),
+    normalize_action(("edge",), "↓ctrl↓↑f↑ctrl", "Find in page."),
+    normalize_action(("edge",), "↓ctrl↓shift↓↑t↑shift↑ctrl", "Reopen closed tab."),
+)
+
+
+def test_search_ranks_exact_words_before_prefixes_and_contexts():
+    index = ShortcutIndex.build(_actions)
+    assert index.search("rename") == _actions[:2]
+    assert index.search("re") == (_actions[0], _actions[1], _actions[4], _actions[2])
+    assert index.search("file re") == (_actions[1], _actions[2])
+    assert index.search("edge f") == (_actions[3],)
+    assert index.search("pycharm") == (_actions[0], _actions[1], _actions[2])
+    assert index.search("  ") == () and index.search("nothing") == ()
+
+
+def test_reverse_key_index():
+    index = ShortcutIndex.build(_actions)
+    assert set(index.with_keys({"ctrl", "shift"})) == {_actions[1], _actions[4]}
+    assert index.with_keys({"shift", "f6"}, exact=True) == (_actions[0],)
+
+
+def test_short_prefixes_and_bounded_prefix_memo(monkeypatch):
+    monkeypatch.setattr(_search, "_PREFIX_MEMO_SIZE", 2)
+    index = ShortcutIndex.build(_actions)
+    assert index.search("r") == (_actions[0], _actions[1], _actions[4], _actions[2])
+    assert index.search("fi") == (_actions[1], _actions[3], _actions[2])
+    for query in "ren", "rep", "reo", "rename":
+        index.search(query)
+    assert index.search("rep") == (_actions[2],)
+
+
+def test_incremental_updates_match_a_rebuilt_index():
+    index = ShortcutIndex.build(_actions[1:])
+    added = normalize_action(("edge",), "↓ctrl↓↑h↑ctrl", "Recent history.")
+    for action in _actions[0], added:
+        index.add(action)
+    index.discard(_actions[2])
+    rebuilt = ShortcutIndex.build((*_actions[:2], *_actions[3:], added))
+    for query in "re", "r", "rename", "file re", "edge", "hist", "replace":
+        assert index.search(query) == rebuilt.search(query)
+    assert index.with_keys({"ctrl"}) == rebuilt.with_keys({"ctrl"}) and len(index) == len(rebuilt) == 5
+    assert index.with_keys({"ctrl", "r"}, exact=True) == ()
+
+
+def test_discard_clears_prefixes_shared_by_words_of_one_action():
+    shared = normalize_action(("edge",), "↓ctrl↓↑e↑ctrl", "Zoom zone zoom.")
+    index = ShortcutIndex.build((*_actions, shared))
+    index.discard(shared)
+    rebuilt = ShortcutIndex.build(_actions)
+    for query in "z", "zo", "zoom", "re":
+        assert index.search(query) == rebuilt.search(query)
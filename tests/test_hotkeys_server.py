@@ -0,0 +1,32 @@
+import asyncio
+import random
+
+from zeronineseven.hotkeys._common import normalize_action, parse_key_combo_dsl
+from zeronineseven.hotkeys._replay import synthesize_attempt
+from zeronineseven.hotkeys._server import EventKind, TrainingClient, TrainingServer, deck_fingerprint
+
+_actions = (
+    normalize_action(("test",), "↓ctrl↓f", "Find."),
+    normalize_action(("test",), "↓↑a", "A."),
+)
+
+
+def test_server_grades_every_trainee(tmp_path):
+    async def main():
+        server, path = TrainingServer(_actions), str(tmp_path / "socket")
+        async with await server.serve_unix(path):
+            alice, bob = await TrainingClient.open_unix(path, "alice"), await TrainingClient.open_unix(path, "bob")
+            assert (alice.deck_size, alice.fingerprint) == (2, deck_fingerprint(_actions))
+            results = []
+            for client, motions in ((alice, None), (bob, parse_key_combo_dsl("↓↑esc")), (alice, None)):
+                kind, index = await client.next_event()
+                assert kind is EventKind.EXPECTED
+                await client.send(motions or synthesize_attempt(_actions[index].combo, random.Random(), 0))
+                results.append((await client.next_event())[0])
+            for client in (alice, bob):
+                await client.close()
+        return server, results
+
+    server, results = asyncio.run(main())
+    assert results == [EventKind.MATCHED, EventKind.MISMATCHED, EventKind.MATCHED]
+    assert {name: (s.matched, s.mismatched) for name, s in server.scores.items()} == {"alice": (2, 0), "bob": (0, 1)}
@@ -0,0 +1,64 @@
+import sqlite3
+
+import pytest
+
+from zeronineseven.hotkeys._common import normalize_action
+from zeronineseven.hotkeys._recording import _legacy_action_fingerprint
+from zeronineseven.hotkeys._stats import _SCHEMA, ComboStats, StatsStore
+
+_find = normalize_action(("ide", "editor"), "↓ctrl↓f", "Find.")
+_scroll = normalize_action(("ide", "editor"), "↓ctrl↓d", "Scroll.")
+
+
+def test_aggregates_are_updated_incrementally_and_persisted(tmp_path):
+    with StatsStore(tmp_path / "stats.sqlite3", alpha=0.5) as store:
+        store.attempt(_find, True, 1.0, 2.0)
+        store.attempt(_find, False, 3.0, 4.0)
+        store.attempt(_scroll, True, 1.0, 1.0)
+        assert store.stats(_find) == ComboStats(2, 1, 0.5, 2.0, 3.0)
+    with StatsStore(tmp_path / "stats.sqlite3", alpha=0.5) as store:
+        assert store.stats(_find) == ComboStats(2, 1, 0.5, 2.0, 3.0)
+        assert store.context_stats()[("ide", "editor")].attempts == 3
+
+
+def test_stats_under_legacy_fingerprints_are_carried_over(tmp_path):
+    with sqlite3.connect(tmp_path / "stats.sqlite3") as connection:
+        connection.executescript(_SCHEMA)
+        connection.execute("INSERT INTO combo_stats VALUES (?, ?, 4, 1, 0.75, 1.0, 2.0)",
+                           (_legacy_action_fingerprint(_find), "ide/editor"))
+    connection.close()
+    with StatsStore(tmp_path / "stats.sqlite3", alpha=0.5) as store:
+        assert store.stats(_find) == ComboStats(4, 1, 0.75, 1.0, 2.0)
+        assert store.attempt(_find, True, 1.0, 2.0).attempts == 5
+    with StatsStore(tmp_path / "stats.sqlite3", alpha=0.5) as store:
+        assert store.stats(_find).attempts == 5
+
+
+def test_contexts_containing_slashes_round_trip(tmp_path):
+    io = normalize_action(("I/O", "files"), "↓ctrl↓o", "Open.")
+    with StatsStore(tmp_path / "stats.sqlite3") as store:
+        store.attempt(io, True, 1.0, 2.0)
+    with StatsStore(tmp_path / "stats.sqlite3") as store:
+        assert store.context_stats().keys() == {("I/O", "files")}
+
+
+def test_legacy_contexts_are_migrated(tmp_path):
+    with sqlite3.connect(tmp_path / "stats.sqlite3") as connection:
+        connection.executescript(_SCHEMA)
+        connection.execute("INSERT INTO context_stats VALUES ('ide/editor', 4, 1, 0.75, 1.0, 2.0)")
+    connection.close()
+    with StatsStore(tmp_path / "stats.sqlite3") as store:
+        assert store.attempt(_find, True, 1.0, 2.0) is store.stats(_find)
+        assert store.context_stats()[("ide", "editor")].attempts == 5
+    with StatsStore(tmp_path / "stats.sqlite3") as store:
+        assert store.context_stats().keys() == {("ide", "editor")}
+
+
+def test_write_failures_are_raised_on_close(tmp_path):
+    store = StatsStore(tmp_path / "stats.sqlite3")
+    with sqlite3.connect(tmp_path / "stats.sqlite3") as connection:
+        connection.execute("DROP TABLE attempts")
+    connection.close()
+    store.attempt(_find, True, 1.0, 2.0)
+    with pytest.raises(RuntimeError, match="1 attempt"):
+        store.close()
@@ -0,0 +1,95 @@
+import asyncio
+import collections
+import contextlib
+import os
+import re
+
+import attr
+import pytest
+
+from zeronineseven.hotkeys._common import Press, Release, normalize_action
+from zeronineseven.hotkeys._dispatch import Dispatcher
+from zeronineseven.hotkeys._reload import diff_decks
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+QApplication = pytest.importorskip("PyQt5.QtWidgets").QApplication
+pytest.importorskip("qasync")
+trainer = pytest.importorskip("zeronineseven.hotkeys.__main__")
+_app = QApplication.instance() or QApplication([])
+
+_find = normalize_action(("ide",), "↓ctrl↓shift↓f", "Find.")
+_changed_find = normalize_action(("ide",), "↓ctrl↓alt↓f", "Find.")
+_rename = normalize_action(("ide",), "↓↑f6", "Rename.")
+
+
+@attr.mutable
+class _Backend:
+    sink: object = None
+
+    @contextlib.contextmanager
+    def capturing(self, sink):
+        self.sink = sink
+        yield
+
+    def type(self, motions: str) -> None:
+        # NOTE(zeronineseven): Unlike the combo DSL, releases of keys pressed in an earlier call are fine here.
+        for arrow, key in re.findall(r"([↓↑])(\w+)", motions):
+            self.sink(Press(key) if arrow == "↓" else Release(key), 0)
+
+
+@attr.frozen
+class _Reloader:
+    changes: Dispatcher = attr.ib(factory=Dispatcher)
+
+
+@attr.frozen
+class _Stats:
+    attempts: list = attr.ib(factory=list)
+
+    def attempt(self, action, matched, first_press, complete):
+        self.attempts.append((action, matched))
+
+
+def _train(steps):
+    backend, reloader, stats = _Backend(), _Reloader(), _Stats()
+
+    async def main():
+        async with trainer._Gui.running(3, trainer.RenderScheduler(), stats=stats, backend=backend,
+                                        reloader=reloader, combos=collections.deque([_rename, _find])) as gui:
+            for step in steps:
+                step(backend, reloader)
+                # NOTE(zeronineseven): Long enough for the feedback of a match to go away.
+                await asyncio.sleep(0.15)
+            return gui.done.done()
+
+    return asyncio.run(main()), stats.attempts
+
+
+def _reload(backend, reloader):
+    reloader.changes.publish(diff_decks((_find, _rename), (_changed_find, _rename)))
+
+
+def test_reload_while_releasing_a_graded_combo_keeps_its_grade():
+    done, attempts = _train([lambda backend, _: backend.type("↓ctrl↓shift↓f"), _reload,
+                             lambda backend, _: backend.type("↑f↑shift↑ctrl"),
+                             lambda backend, _: backend.type("↓f6↑f6")])
+    assert attempts == [(_find, True), (_rename, True)] and done
+
+
+def test_reload_while_keys_are_held_restarts_the_combo_once_released():
+    done, attempts = _train([lambda backend, _: backend.type("↓ctrl"), _reload,
+                             lambda backend, _: backend.type("↓shift↓f↑f↑shift↑ctrl"),
+                             lambda backend, _: backend.type("↓ctrl↓alt↓f↑f↑alt↑ctrl")])
+    assert attempts == [(_changed_find, True)] and not done
+
+
+def test_free_recall_ignores_releases_of_keys_pressed_before_it_started():
+    backend = _Backend()
+
+    async def main():
+        async with trainer._FreeRecallGui.running((_find, _rename), trainer.RenderScheduler(), backend=backend):
+            backend.type("↑alt↓ctrl↓shift↓f")
+            await asyncio.sleep(0.05)
+            return [w.text() for w in _app.allWidgets() if isinstance(w, trainer.QLabel) and w.isVisible()]
+
+    assert any(text.endswith("Find.") for text in asyncio.run(main()))
@@ -0,0 +1,44 @@
+from zeronineseven.hotkeys._common import normalize_action, parse_key_combo_dsl
+from zeronineseven.hotkeys._trie import ComboTrie
+
+_actions = (
+    normalize_action(("ide", "editor"), "↓ctrl↓f", "Find."),
+    normalize_action(("ide", "editor"), "↓ctrl↓shift↓f", "Find in files."),
+    normalize_action(("browser",), "↓ctrl↓f", "Find in page."),
+    normalize_action(("browser",), "↓j", "Scroll down."),
+)
+
+
+def test_matcher_narrows_possible_actions():
+    matcher = ComboTrie.build(_actions).matcher()
+    for m in parse_key_combo_dsl("↓ctrl"):
+        matcher.step(m)
+    assert matcher.possible == set(_actions[:3]) and not matcher.exact
+    for m in parse_key_combo_dsl("↓f"):
+        matcher.step(m)
+    assert matcher.possible == {_actions[0], _actions[2]}
+    assert matcher.exact_in(("browser",)) == (_actions[2],)
+
+
+def test_matcher_reaches_dead_end_and_resets():
+    matcher = ComboTrie.build(_actions).walk(parse_key_combo_dsl("↓ctrl↓j"))
+    assert matcher.is_dead_end and not matcher.possible
+    assert matcher.reset().possible == set(_actions)
+
+
+def test_exact_chord_ignores_modifier_order():
+    trie = ComboTrie.build(_actions)
+    assert trie.exact_chord(parse_key_combo_dsl("↓shift↓ctrl↓f")) == \
+        trie.walk(parse_key_combo_dsl("↓ctrl↓shift↓f")).exact
+    assert not trie.exact_chord(parse_key_combo_dsl("↓f↓ctrl"))
+
+
+def test_live_matchers_follow_incremental_updates():
+    trie = ComboTrie.build(_actions)
+    matcher = trie.walk(parse_key_combo_dsl("↓ctrl"))
+    added = normalize_action(("browser",), "↓ctrl↓h", "History.")
+    trie.add(added)
+    assert matcher.possible == {*_actions[:3], added} and trie.size == 5
+    trie.discard(_actions[1])
+    assert matcher.possible == {_actions[0], _actions[2], added}
+    assert trie.walk(parse_key_combo_dsl("↓ctrl↓shift")).is_dead_end
@@ -1,10 +1,11 @@
-import enum
-from enum import Enum
-from itertools import chain
-
-from ssost.hotkeys.pycharm import all_controls as pycharm_controls
-from ssost.hotkeys.edge import all_controls as edge_controls
-
 __all__ = "all_controls",
 
-all_controls = (*pycharm_controls, *edge_controls)
+
+def __getattr__(name: str):
+    # NOTE(zeronineseven): Decks are loaded on first access only, so that importing the package (e.g. just for the
+    #                      parser) never pays for parsing every deck.
+    if name == "all_controls":
+        from ._decks import load_decks
+        value = globals()["all_controls"] = load_decks()
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,193 +1,159 @@
+import argparse
 import asyncio
 import contextlib
-import itertools
+import functools
+import logging
+import logging.handlers
+import os
+import queue
 import random
-from asyncio.queues import Queue
+import signal
+import time
 from collections import deque
-from contextlib import AsyncExitStack
-from typing import NoReturn, Callable, Awaitable, AsyncIterator, Union, Deque
+from typing import Callable, Awaitable, Iterator, Deque, Sequence, Optional
 
 import attr
 import qasync
-from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QKeyEvent
 from PyQt5.QtWidgets import QApplication, QLabel, QVBoxLayout, QWidget, QLineEdit
 
-from zeronineseven.hotkeys import all_controls
+from ._qt_keys import QtKeyTranslator
 from ._common import Press, Release, Motion, Motions, Key, pretty_print_motion, pretty_print_motions, \
-    NormalizedAction
+    NormalizedAction, pretty_print_context, serialization_cache_info
+from ._decks import DECKS, load_decks
+from ._dispatch import Dispatcher
+from ._engine import ComboEngine, Matched, Mismatched, ReadyForNextCombo
+from ._input import EvdevBackend, InputBackend, MotionSink
+from ._latency import LatencyTracer
+from ._profiling import LoopProfiler
+from ._reload import DeckDiff, DeckReloader
+from ._recording import SessionRecorder
+from ._render import RenderScheduler
+from ._scheduler import SpacedRepetitionScheduler
+from ._search import ShortcutIndex
+from ._stats import StatsStore
+from ._trie import ComboTrie
 
+_log = logging.getLogger("zeronineseven.hotkeys")
 
-def _extract_key(event: QKeyEvent) -> Key:
-    # FIXME(zeronineseven): Distinguish left/right shift and similar keys.
-    #                       * https://stackoverflow.com/questions/44813630/detecting-the-right-shift-key-in-qt
-    try:
-        key = {
-            Qt.Key_Escape: "esc",
-            Qt.Key_Enter: "enter",
-            Qt.Key_Control: "ctrl",
-            Qt.Key_Alt: "alt",
-            Qt.Key_Shift: "shift",
-            Qt.Key_Down: "down",
-            Qt.Key_Up: "up",
-            Qt.Key_Left: "left",
-            Qt.Key_Right: "right",
-            Qt.Key_Tab: "tab",
-            Qt.Key_F1: "f1",
-            Qt.Key_F2: "f2",
-            Qt.Key_F3: "f3",
-            Qt.Key_F4: "f4",
-            Qt.Key_F5: "f5",
-            Qt.Key_F6: "f6",
-            Qt.Key_F7: "f7",
-            Qt.Key_F8: "f8",
-            Qt.Key_F9: "f9",
-            Qt.Key_F10: "f10",
-            Qt.Key_A: "a",
-            Qt.Key_B: "b",
-            Qt.Key_C: "c",
-            Qt.Key_D: "d",
-            Qt.Key_E: "e",
-            Qt.Key_F: "f",
-            Qt.Key_G: "g",
-            Qt.Key_H: "h",
-            Qt.Key_I: "i",
-            Qt.Key_J: "j",
-            Qt.Key_K: "k",
-            Qt.Key_L: "l",
-            Qt.Key_M: "m",
-            Qt.Key_N: "n",
-            Qt.Key_O: "o",
-            Qt.Key_P: "p",
-            Qt.Key_Q: "q",
-            Qt.Key_R: "r",
-            Qt.Key_S: "s",
-            Qt.Key_T: "t",
-            Qt.Key_U: "u",
-            Qt.Key_V: "v",
-            Qt.Key_W: "w",
-            Qt.Key_X: "x",
-            Qt.Key_Y: "y",
-            Qt.Key_Z: "z",
-        }[event.key()]
-    except KeyError:
-        key = event.text().lower()
-    try:
-        key = {
-            "\t": "tab",
-            "\r": "enter",
-            " ": "space",
-        }[key]
-    except KeyError:
-        pass
-    return key
+
+_keys = QtKeyTranslator()
+_extract_key: Callable[[QKeyEvent], Optional[Key]] = _keys.key
+
+# NOTE(zeronineseven): Every use is guarded by `if __debug__ and ...`, so `python -O` compiles tracing out entirely.
+_tracer: Optional[LatencyTracer] = None
 
 
 class _MotionsInput(QLineEdit):
-    def __init__(self, q: Queue, *args, **kwargs):
+    def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.__q = q
+        self.__sink: Optional[MotionSink] = None
+
+    @contextlib.contextmanager
+    def capturing(self, sink: MotionSink) -> Iterator[None]:
+        self.__sink = sink
+        self.grabKeyboard()
+        try:
+            yield
+        finally:
+            self.releaseKeyboard()
+            self.__sink = None
 
     def keyReleaseEvent(self, event: QKeyEvent):
         if event.isAutoRepeat():
             return
-        self.__q.put_nowait(Release(_extract_key(event)))
+        key = _extract_key(event)
+        if key is not None:
+            self.__dispatch(Release(key), event)
         # super().keyReleaseEvent(event)
 
     def keyPressEvent(self, event: QKeyEvent):
         if event.isAutoRepeat():
             return
-        self.__q.put_nowait(Press(_extract_key(event)))
+        key = _extract_key(event)
+        if key is not None:
+            self.__dispatch(Press(key), event)
         # super().keyPressEvent(event)
 
-
-def _flush_queue(q: Queue) -> Queue:
-    while not q.empty():
-        q.get_nowait()
-    return q
+    def __dispatch(self, m: Motion, event: QKeyEvent) -> None:
+        if self.__sink is None:
+            return
+        # NOTE(zeronineseven): Motions are processed right here on Qt's stack, so nothing may escape back into it.
+        try:
+            self.__sink(m, event.timestamp())
+        except Exception as e:
+            asyncio.get_event_loop().call_exception_handler({"message": "Failed to dispatch a motion",
+                                                             "exception": e})
 
 
 @attr.mutable
 class _ComboInput:
-    @attr.frozen
-    class Matched:
-        combo: Motions
-
-    @attr.frozen
-    class Mismatched:
-        expected: Motions
-        entered: Motions
-
-    ReadyForNextCombo = object()
+    Matched = Matched
+    Mismatched = Mismatched
+    ReadyForNextCombo = ReadyForNextCombo
 
     @classmethod
-    @contextlib.asynccontextmanager
-    async def exists(cls, get_next_combo: Callable[[], Awaitable[NormalizedAction]]) -> AsyncIterator["_ComboInput"]:
+    @contextlib.contextmanager
+    def exists(cls, renderer: RenderScheduler, chords: bool = False,
+               backend: Optional[InputBackend] = None) -> Iterator["_ComboInput"]:
         # TODO(zeronineseven): Disable event compression for all platforms
-        widget = _MotionsInput(motions := Queue())
-        widget.setReadOnly(True)
-        widget.setDisabled(True)
-
-        async def process_motions() -> NoReturn:
-            while True:
-                expected_combo, entered_combo = await get_next_combo(), deque()
-                expected_len = len(expected_combo)
-
-                _flush_queue(motions)
-                self.currently_entered = tuple()
-                widget.setText("")
-
-                widget.setDisabled(False)
-                pressed: int = 0
-                for n in itertools.count():
-                    m = await motions.get()
-                    print(pretty_print_motion(m))
-                    entered_combo.append(m)
-                    widget.setText(pretty_print_motions(entered_combo))
-                    self.currently_entered = currently_entered = tuple(entered_combo)
-                    pressed += 1 if isinstance(m, Press) else -1
-                    events.put_nowait(m)
-                    if entered_combo[n] != expected_combo[n] or len(entered_combo) > expected_len:
-                        events.put_nowait(cls.Mismatched(expected_combo, currently_entered))
-                        break
-                    elif len(entered_combo) == expected_len:
-                        events.put_nowait(cls.Matched(expected_combo))
-                        break
-                # NOTE(zeronineseven): Wait until all pressed keys are released to avoid leaking them to next task.
-                while pressed > 0:
-                    pressed += 1 if isinstance(await motions.get(), Press) else -1
-                events.put_nowait(self.ReadyForNextCombo)
-
+        def feed(m: Motion, timestamp: int) -> None:
+            if __debug__ and _tracer is not None:
+                _tracer.received(timestamp)
+            if _log.isEnabledFor(logging.INFO):
+                _log.info(pretty_print_motion(m))
+            engine.feed(m)
+
+        def on_event(event) -> None:
+            if isinstance(event, (Press, Release)):
+                self.currently_entered = tuple(engine.entered)
+                renderer.set_lazy(widget.setText, pretty_print_motions, self.currently_entered)
+                if __debug__ and _tracer is not None:
+                    _tracer.emitted()
+            elif event is ReadyForNextCombo:
                 widget.setDisabled(True)
+            self.events.publish(event)
 
-        async with AsyncExitStack() as acm:
-            acm: AsyncExitStack
-
-            widget.grabKeyboard()
-            acm.callback(widget.releaseKeyboard)
-
-            acm.callback(asyncio.create_task(process_motions()).cancel)
+        widget = _MotionsInput()
+        widget.setReadOnly(True)
+        widget.setDisabled(True)
+        engine = ComboEngine(on_event, chords=chords)
 
-            self = cls(widget, events := Queue(), tuple())
+        with (backend or widget).capturing(feed):
+            self = cls(widget, engine, renderer, Dispatcher(), tuple())
             yield self
 
+    def expect(self, combo: Motions) -> None:
+        self.currently_entered = tuple()
+        self.renderer.set(self.widget.setText, "")
+        self.engine.expect(combo)
+        self.widget.setDisabled(False)
+
     widget: QWidget
-    events: Queue[Union[Motion, Matched, Mismatched]]
+    engine: ComboEngine
+    renderer: RenderScheduler
+    events: Dispatcher
     currently_entered: Motions
 
 
 def _handle_exception(loop, context):
-    # msg = context.get("exception", context["message"])
-    # logging.error(f"Caught exception: {msg}")
-    # logging.info("Shutting down...")
-    asyncio.get_event_loop().stop()
+    _log.error("%s, shutting down...", context["message"], exc_info=context.get("exception"))
+    loop.stop()
 
 
 @attr.frozen
 class _Gui:
     @classmethod
     @contextlib.asynccontextmanager
-    async def running(cls, combos: Deque[NormalizedAction]):
+    async def running(cls, session_length: int, renderer: RenderScheduler,
+                      recorder: Optional[SessionRecorder] = None,
+                      scheduler: Optional[SpacedRepetitionScheduler] = None,
+                      stats: Optional[StatsStore] = None, chords: bool = False,
+                      backend: Optional[InputBackend] = None, reloader: Optional[DeckReloader] = None,
+                      combos: Optional[Deque[NormalizedAction]] = None):
+        # NOTE(zeronineseven): Without fixed `combos` every next one is pulled from the scheduler only once the
+        #                      previous one got reviewed, so that mismatched combos come back within the session.
+        assert combos is not None or scheduler is not None
         window = QWidget()
         layout = QVBoxLayout()
 
@@ -197,73 +163,387 @@ class _Gui:
         currently_entered_label = QLabel("")
         layout.addWidget(currently_entered_label)
 
-        unprocessed_combos = Queue()
-        async with AsyncExitStack() as acm:
-            acm: AsyncExitStack
-
-            combo_input: _ComboInput = await acm.enter_async_context(
-                _ComboInput.exists(unprocessed_combos.get)
-            )
-
-            async def lifecycle() -> NoReturn:
-                try:
-                    while len(combos) != 0:
-                        try:
-                            current_action = combos.pop()
-                        except IndexError:
-                            break
-                        current_combo = current_action.combo
-                        description_label.setText(current_action.description)
-                        currently_entered_label.setText("")
-                        currently_entered_label.setStyleSheet("")
-                        unprocessed_combos.put_nowait(current_combo)
-                        pressed: int = 0
-                        while True:
-                            event = await combo_input.events.get()
-                            if isinstance(event, Press):
-                                pressed += 1
-                            elif isinstance(event, Release):
-                                pressed -= 1
-                            else:
-                                break
-                            currently_entered_label.setText(
-                                pretty_print_motions(current_combo[:len(combo_input.currently_entered)])
-                            )
-                        assert isinstance(event, (_ComboInput.Matched, _ComboInput.Mismatched))
-                        currently_entered_label.setText(pretty_print_motions(current_combo))
-                        if isinstance(event, _ComboInput.Matched):
-                            currently_entered_label.setStyleSheet("background-color: green")
-                            wait_for = 0.1
-                        else:
-                            currently_entered_label.setStyleSheet("background-color: red")
-                            wait_for = 0.5
-                        event, _ = await asyncio.gather(combo_input.events.get(),
-                                                        asyncio.create_task(asyncio.sleep(wait_for)))
-                        assert event is _ComboInput.ReadyForNextCombo
-                except Exception as e:
-                    raise e
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+        # NOTE(zeronineseven): Everything below runs synchronously as motions get dispatched, the event loop is
+        #                      only involved to hold the feedback on screen for a while.
+        current_action: Optional[NormalizedAction] = None
+        remaining = session_length
+        shown_at = first_pressed_at = feedback_until = 0.0
+        pending_next: Optional[asyncio.TimerHandle] = None
+        # NOTE(zeronineseven): Set when the combo being entered got removed from the deck while some of its keys were
+        #                      held. Its attempt then goes ungraded, and `replacement` is shown once they are released.
+        superseded = False
+        replacement: Optional[NormalizedAction] = None
+
+        def next_combo() -> None:
+            nonlocal current_action, shown_at, first_pressed_at, pending_next, remaining
+            pending_next = None
+            current_action = None
+            if remaining > 0:
+                current_action = scheduler.next() if combos is None else combos.pop() if combos else None
+            if current_action is None:
+                if not done.done():
+                    done.set_result(None)
+                return
+            remaining -= 1
+            renderer.set(description_label.setText, current_action.description)
+            renderer.set(currently_entered_label.setText, "")
+            renderer.set(currently_entered_label.setStyleSheet, "")
+            if recorder is not None:
+                recorder.expected(current_action)
+            shown_at, first_pressed_at = time.monotonic(), None
+            combo_input.expect(current_action.combo)
+
+        def show(action: Optional[NormalizedAction]) -> None:
+            nonlocal current_action, superseded, replacement
+            superseded, replacement = False, None
+            if action is None:
+                next_combo()
+                return
+            current_action = action
+            renderer.set(currently_entered_label.setText, "")
+            renderer.set(currently_entered_label.setStyleSheet, "")
+            combo_input.expect(action.combo)
+
+        def on_deck_changed(diff: DeckDiff) -> None:
+            # NOTE(zeronineseven): Runs in one go between two key events, so the session never sees half a deck.
+            nonlocal superseded, replacement
+            removed = frozenset(diff.removed)
+            if combos is not None:
+                kept = [diff.changed.get(a, a) for a in combos if a not in removed or a in diff.changed]
+                combos.clear()
+                combos.extend(kept)
+            if scheduler is not None:
+                scheduler.update(diff.added, diff.removed)
+            if superseded:
+                if replacement in removed:
+                    replacement = diff.changed.get(replacement)
+                return
+            # NOTE(zeronineseven): An already graded combo is left alone, even while its keys are still being
+            #                      released, the one being entered starts over. Restarting it while keys are held
+            #                      would have their releases mismatch the new combo, so that waits for them.
+            if current_action not in removed or not combo_input.engine.is_entering or done.done():
+                return
+            if combo_input.engine.pressed > 0:
+                superseded, replacement = True, diff.changed.get(current_action)
+                return
+            show(diff.changed.get(current_action))
+
+        def cancel_pending_next() -> None:
+            if pending_next is not None:
+                pending_next.cancel()
+
+        def on_event(event) -> None:
+            nonlocal first_pressed_at, feedback_until, pending_next
+            if isinstance(event, (Press, Release)):
+                if first_pressed_at is None:
+                    first_pressed_at = time.monotonic()
+                if recorder is not None:
+                    recorder.motion(event)
+                if __debug__ and _tracer is not None:
+                    _tracer.consumed()
+                renderer.set_lazy(currently_entered_label.setText, pretty_print_motions,
+                                  current_action.combo[:len(combo_input.currently_entered)])
+            elif event is ReadyForNextCombo:
+                delay = feedback_until - loop.time()
+                then = functools.partial(show, replacement) if superseded else next_combo
+                if delay > 0:
+                    pending_next = loop.call_later(delay, then)
+                else:
+                    then()
+            else:
+                assert isinstance(event, (_ComboInput.Matched, _ComboInput.Mismatched))
+                matched = isinstance(event, _ComboInput.Matched)
+                if superseded:
+                    renderer.set_lazy(currently_entered_label.setText, pretty_print_motions, current_action.combo)
+                    return
+                if stats is not None:
+                    completed_at = time.monotonic()
+                    stats.attempt(current_action, matched,
+                                  (first_pressed_at or completed_at) - shown_at, completed_at - shown_at)
+                renderer.set_lazy(currently_entered_label.setText, pretty_print_motions, current_action.combo)
+                if matched:
+                    renderer.set(currently_entered_label.setStyleSheet, "background-color: green")
+                    feedback_until = loop.time() + 0.1
+                    if recorder is not None:
+                        recorder.matched(current_action)
+                else:
+                    renderer.set(currently_entered_label.setStyleSheet, "background-color: red")
+                    feedback_until = loop.time() + 0.5
+                    if recorder is not None:
+                        recorder.mismatched(current_action)
+                if scheduler is not None:
+                    scheduler.review(current_action, matched=matched)
+
+        with contextlib.ExitStack() as stack:
+            combo_input: _ComboInput = stack.enter_context(_ComboInput.exists(renderer, chords, backend))
+            stack.callback(combo_input.events.subscribe(on_event))
+            stack.callback(cancel_pending_next)
+            if reloader is not None:
+                stack.callback(reloader.changes.subscribe(on_deck_changed))
 
             layout.addWidget(combo_input.widget)
             window.setLayout(layout)
             window.show()
 
-            lifecycle_task = asyncio.create_task(lifecycle())
+            next_combo()
 
-            QApplication.instance().aboutToQuit.connect(lifecycle_task.cancel)
+            QApplication.instance().aboutToQuit.connect(done.cancel)
 
-            yield cls(asyncio.shield(lifecycle_task))
+            yield cls(done)
 
     done: Awaitable[None]
 
 
-async def _main():
-    loop = asyncio.get_event_loop()
-    loop.set_exception_handler(_handle_exception)
-    loop.set_debug(__debug__)
+@attr.frozen
+class _FreeRecallGui:
+    @classmethod
+    @contextlib.asynccontextmanager
+    async def running(cls, actions: Sequence[NormalizedAction], renderer: RenderScheduler, chords: bool = False,
+                      backend: Optional[InputBackend] = None, reloader: Optional[DeckReloader] = None):
+        trie = ComboTrie.build(actions)
 
-    async with _Gui.running(random.sample(all_controls, min(15, len(all_controls)))) as gui:
-        await gui.done
-        print("Victory!")
+        window = QWidget()
+        layout = QVBoxLayout()
 
+        currently_entered_label = QLabel("")
+        layout.addWidget(currently_entered_label)
 
-qasync.run(_main())
+        matches_label = QLabel("Press any shortcut.")
+        layout.addWidget(matches_label)
+
+        matcher, entered_combo, held = trie.matcher(), deque(), set()
+
+        def recall(m: Motion, timestamp: int) -> None:
+            if __debug__ and _tracer is not None:
+                _tracer.received(timestamp)
+                _tracer.rendering()
+            # NOTE(zeronineseven): The first press after all keys were released starts a new shortcut. Releases of
+            #                      keys that were never seen pressed, e.g. held while the window opened, are ignored.
+            if isinstance(m, Press):
+                if not held:
+                    matcher.reset()
+                    entered_combo.clear()
+                held.add(m.key)
+            elif m.key in held:
+                held.remove(m.key)
+            else:
+                return
+            entered_combo.append(m)
+            matcher.step(m)
+            renderer.set_lazy(currently_entered_label.setText, pretty_print_motions, tuple(entered_combo))
+            exact = trie.exact_chord(entered_combo) if chords else matcher.exact
+            if exact:
+                renderer.set(matches_label.setText,
+                             "\n".join(f"{pretty_print_context(context)}: {action.description}"
+                                       for context, actions_ in exact.items()
+                                       for action in actions_))
+            elif isinstance(m, Release):
+                # NOTE(zeronineseven): Releasing the keys of a recognised shortcut walks past it, its name stays on
+                #                      screen until the next press starts another shortcut.
+                return
+            elif matcher.is_dead_end:
+                renderer.set(matches_label.setText, "No such shortcut.")
+            else:
+                renderer.set(matches_label.setText, f"{len(matcher.possible)} shortcut(s) start like this.")
+
+        def on_deck_changed(diff: DeckDiff) -> None:
+            for action in diff.removed:
+                trie.discard(action)
+            for action in diff.added:
+                trie.add(action)
+            # NOTE(zeronineseven): The matcher may sit on a node that was just pruned, the current shortcut is dropped.
+            matcher.reset()
+            entered_combo.clear()
+
+        widget = _MotionsInput()
+        widget.setReadOnly(True)
+
+        done = asyncio.get_running_loop().create_future()
+        with contextlib.ExitStack() as stack:
+            layout.addWidget(widget)
+            window.setLayout(layout)
+            window.show()
+
+            stack.enter_context((backend or widget).capturing(recall))
+            if reloader is not None:
+                stack.callback(reloader.changes.subscribe(on_deck_changed))
+
+            QApplication.instance().aboutToQuit.connect(done.cancel)
+
+            yield cls(done)
+
+    done: Awaitable[None]
+
+
+@attr.frozen
+class _SearchGui:
+    @classmethod
+    @contextlib.asynccontextmanager
+    async def running(cls, actions: Sequence[NormalizedAction], renderer: RenderScheduler,
+                      reloader: Optional[DeckReloader] = None):
+        index = ShortcutIndex.build(actions)
+
+        window = QWidget()
+        layout = QVBoxLayout()
+
+        query_input = QLineEdit()
+        query_input.setPlaceholderText(f"Search {len(index)} shortcuts...")
+        layout.addWidget(query_input)
+
+        results_label = QLabel("")
+        layout.addWidget(results_label)
+
+        def render_results(query: str) -> str:
+            return "\n".join(f"{pretty_print_context(action.context)}: {action.description} "
+                             f"{pretty_print_motions(action.combo)}"
+                             for action in index.search(query))
+
+        def on_deck_changed(diff: DeckDiff) -> None:
+            for action in diff.removed:
+                index.discard(action)
+            for action in diff.added:
+                index.add(action)
+            query_input.setPlaceholderText(f"Search {len(index)} shortcuts...")
+            renderer.set_lazy(results_label.setText, render_results, query_input.text())
+
+        # NOTE(zeronineseven): Lazy, so that a burst of keystrokes within a frame runs a single query.
+        query_input.textChanged.connect(lambda query: renderer.set_lazy(results_label.setText, render_results, query))
+        unsubscribe = reloader.changes.subscribe(on_deck_changed) if reloader is not None else lambda: None
+
+        window.setLayout(layout)
+        window.show()
+        query_input.setFocus()
+
+        done = asyncio.get_running_loop().create_future()
+        QApplication.instance().aboutToQuit.connect(done.cancel)
+        try:
+            yield cls(done)
+        finally:
+            unsubscribe()
+
+    done: Awaitable[None]
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m zeronineseven.hotkeys")
+    parser.add_argument("--deck", dest="decks", action="append", metavar="DECK",
+                        help=f"train on the given deck only, one of {', '.join(DECKS)} or a compiled .deck file; "
+                             f"may be repeated (default: all of them)")
+    parser.add_argument("--free-recall", action="store_true",
+                        help="press any shortcut and get it named instead of drilling random ones")
+    parser.add_argument("--search", action="store_true",
+                        help="look shortcuts up by their description or context as you type")
+    parser.add_argument("--watch", action="store_true",
+                        help="reload the decks whenever their sources change, without restarting")
+    parser.add_argument("--chords", action="store_true",
+                        help="accept modifiers held together in any order, e.g. shift+ctrl+f for ctrl+shift+f")
+    parser.add_argument("--sided", action="store_true",
+                        help="tell left and right modifiers apart, for decks bound to e.g. lshift or rctrl")
+    parser.add_argument("--evdev", metavar="DEVICE",
+                        help="read keys straight from the given Linux input device, "
+                             "e.g. /dev/input/by-id/...-event-kbd, instead of through Qt")
+    parser.add_argument("--echo", action="store_true", help="echo every key motion to the console")
+    parser.add_argument("--schedule", metavar="PATH",
+                        default=os.path.join(os.path.expanduser("~"), ".zeronineseven-hotkeys", "schedule"),
+                        help="spaced repetition journal to pick the combos from (default: %(default)s)")
+    parser.add_argument("--stats", metavar="PATH",
+                        default=os.path.join(os.path.expanduser("~"), ".zeronineseven-hotkeys", "stats.sqlite3"),
+                        help="SQLite database to keep per-combo statistics in (default: %(default)s)")
+    parser.add_argument("--random", action="store_true", help="pick random combos instead of scheduling them")
+    parser.add_argument("--combos", type=int, default=15, help="number of combos per session (default: %(default)s)")
+    parser.add_argument("--record", metavar="PATH", help="append the session to the given binary recording")
+    parser.add_argument("--mode", choices=("production", "debug", "profile"), default="production",
+                        help="debug turns on asyncio's debug mode, profile samples event loop lag, names slow "
+                             "callbacks and counts created tasks and queue depths (default: %(default)s)")
+    parser.add_argument("--latency", action="store_true",
+                        help="trace per-stage keystroke latency and print it on exit or on SIGUSR1 "
+                             "(not available under `python -O`)")
+    return parser.parse_args()
+
+
+@contextlib.contextmanager
+def _console_echo(enabled: bool):
+    if not enabled:
+        yield
+        return
+    # NOTE(zeronineseven): Console writes happen on the listener's thread, never on the event loop.
+    records = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(records, logging.StreamHandler())
+    handler = logging.handlers.QueueHandler(records)
+    _log.addHandler(handler)
+    _log.setLevel(logging.INFO)
+    listener.start()
+    try:
+        yield
+    finally:
+        _log.removeHandler(handler)
+        listener.stop()
+
+
+async def _main(args: argparse.Namespace):
+    global _tracer, _extract_key
+    loop = asyncio.get_event_loop()
+    loop.set_exception_handler(_handle_exception)
+    # NOTE(zeronineseven): asyncio's debug mode costs on every callback, so it is strictly opt-in.
+    loop.set_debug(args.mode == "debug")
+
+    reloader = DeckReloader(args.decks or DECKS) if args.watch else None
+    all_controls = reloader.actions if reloader is not None else load_decks(args.decks or DECKS)
+    if args.sided:
+        _extract_key = _keys.sided_key
+    backend = EvdevBackend(args.evdev, args.sided) if args.evdev else None
+    renderer = RenderScheduler(1 / (QApplication.instance().primaryScreen().refreshRate() or 60))
+    reports = []
+    if __debug__ and args.latency:
+        _tracer = LatencyTracer()
+        renderer.on_flush = _tracer.repainted
+        reports.append(_tracer.report)
+    profiler = LoopProfiler() if args.mode == "profile" else None
+    if profiler is not None:
+        profiler.watch("render", lambda: renderer.pending)
+        reports.append(profiler.report)
+    if reports and hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, lambda *_: print("\n".join(report() for report in reports)))
+    try:
+        with _console_echo(args.echo), \
+                profiler.installed(loop) if profiler is not None else contextlib.nullcontext(), \
+                reloader.watcher().watching(reloader.reload) if reloader is not None else contextlib.nullcontext():
+            if args.search:
+                async with _SearchGui.running(all_controls, renderer, reloader) as gui:
+                    await gui.done
+                return
+
+            if args.free_recall:
+                async with _FreeRecallGui.running(all_controls, renderer, args.chords, backend, reloader) as gui:
+                    await gui.done
+                return
+
+            with contextlib.ExitStack() as stack:
+                recorder = stack.enter_context(SessionRecorder(args.record)) if args.record else None
+                if args.random:
+                    scheduler, combos = None, deque(random.sample(all_controls, min(args.combos, len(all_controls))))
+                else:
+                    scheduler = stack.enter_context(SpacedRepetitionScheduler(all_controls, args.schedule))
+                    combos = None
+                stats = stack.enter_context(StatsStore(args.stats))
+                if profiler is not None:
+                    profiler.watch("stats", lambda: stats.pending)
+                async with _Gui.running(args.combos, renderer, recorder, scheduler, stats, args.chords,
+                                        backend, reloader, combos) as gui:
+                    await gui.done
+                    print("Victory!")
+                for context, context_stats in sorted(stats.context_stats().items()):
+                    print(f"{pretty_print_context(context)}: {context_stats.attempts} attempts, "
+                          f"{context_stats.accuracy:.0%} recent accuracy, {context_stats.complete:.2f}s per combo")
+    finally:
+        print(f"Rendered {renderer.renders} updates, coalesced {renderer.coalesced} redundant ones.")
+        for name, info in serialization_cache_info().items():
+            print(f"{name}: {info.hits} cache hits, {info.misses} misses.")
+        for report in reports:
+            print(report())
+
+
+if __name__ == "__main__":
+    qasync.run(_main(_parse_args()))
@@ -0,0 +1,132 @@
+from typing import Iterable, Mapping, Sequence, Tuple
+
+import attr
+import numpy as np
+
+from ._common import KEY_IDS, KEYS_BY_ID, MODIFIER_KEYS, NormalizedAction, pack_motions
+from ._recording import RecordKind, SessionLog, action_fingerprint
+
+__all__ = "DeckArrays", "RECORD_DTYPE", "deck_arrays", "error_rate_by_key", "expensive_bindings", \
+          "inter_press_latencies", "key_heatmap", "latency_percentiles_by_key", "modifier_cooccurrence", \
+          "session_arrays", "session_key_heatmap"
+
+# NOTE(zeronineseven): Mirrors `_recording._RECORD`, so that logs are viewed in place rather than unpacked.
+RECORD_DTYPE = np.dtype({"names": ["timestamp_ns", "kind", "motion_id", "reserved", "payload"],
+                         "formats": ["<u8", "u1", "u1", "<u2", "<i8"], "offsets": [0, 8, 9, 10, 16],
+                         "itemsize": 24})
+_KEYS = len(KEYS_BY_ID)
+_MODIFIER_IDS = np.array(sorted(KEY_IDS[k] for k in MODIFIER_KEYS))
+
+# NOTE(zeronineseven): Rough effort of reaching a key from the home row; the rest of the keys cost 1.5.
+_KEY_EFFORT: Mapping[str, float] = {
+    **{k: 1.0 for k in "asdfghjkl"},
+    **{k: 1.0 for k in ("ctrl", "alt", "shift", "lshift", "rshift", "lctrl", "rctrl", "lalt", "ralt", "space")},
+    **{k: 2.0 for k in "1234567890"},
+    **{k: 2.0 for k in ("esc", "insert", "up", "down", "left", "right", "\\", "{", "}")},
+    **{f"f{n}": 2.5 for n in range(1, 13)},
+}
+_EFFORT = np.array([_KEY_EFFORT.get(k, 1.5) for k in KEYS_BY_ID])
+
+
+@attr.frozen
+class DeckArrays:
+    # NOTE(zeronineseven): Combos are flattened into one array of motion ids, the combo `i` spanning
+    #                      `motion_ids[offsets[i]:offsets[i + 1]]`; `key_matrix[i, k]` tells whether it uses key `k`.
+    actions: Tuple[NormalizedAction, ...]
+    motion_ids: np.ndarray
+    offsets: np.ndarray
+    key_matrix: np.ndarray
+    fingerprints: np.ndarray
+
+
+def deck_arrays(actions: Iterable[NormalizedAction]) -> DeckArrays:
+    actions = tuple(actions)
+    motion_ids = np.frombuffer(b"".join(bytes(pack_motions(a.combo)) for a in actions), dtype=np.uint8)
+    lengths = np.fromiter((len(a.combo) for a in actions), dtype=np.int64, count=len(actions))
+    offsets = np.zeros(len(actions) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    key_matrix = np.zeros((len(actions), _KEYS), dtype=bool)
+    key_matrix[np.repeat(np.arange(len(actions)), lengths), motion_ids >> 1] = True
+    fingerprints = np.fromiter((action_fingerprint(a) for a in actions), dtype=np.int64, count=len(actions))
+    return DeckArrays(actions, motion_ids, offsets, key_matrix, fingerprints)
+
+
+def session_arrays(logs: Iterable[SessionLog]) -> np.ndarray:
+    return np.concatenate([np.frombuffer(log.raw(), dtype=RECORD_DTYPE) for log in logs] or
+                          [np.empty(0, dtype=RECORD_DTYPE)])
+
+
+def key_heatmap(deck: DeckArrays) -> np.ndarray:
+    return deck.key_matrix.sum(axis=0)
+
+
+def session_key_heatmap(records: np.ndarray) -> np.ndarray:
+    presses = records["motion_id"][(records["kind"] == RecordKind.MOTION) & (records["motion_id"] & 1 == 0)]
+    return np.bincount(presses >> 1, minlength=_KEYS)
+
+
+def modifier_cooccurrence(deck: DeckArrays) -> Tuple[Tuple[str, ...], np.ndarray]:
+    used = deck.key_matrix[:, _MODIFIER_IDS].astype(np.int64)
+    return tuple(KEYS_BY_ID[i] for i in _MODIFIER_IDS), used.T @ used
+
+
+def inter_press_latencies(records: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # NOTE(zeronineseven): Time from the previous press to every press of a key, within the same attempt only, so
+    #                      that the time spent reading the next combo never counts. Every session, and so every
+    #                      log given to `session_arrays`, opens with a SESSION record, which starts an attempt too:
+    #                      presses before its first EXPECTED must not be timed against the previous session's clock.
+    attempt = np.cumsum((records["kind"] == RecordKind.EXPECTED) | (records["kind"] == RecordKind.SESSION))
+    is_press = (records["kind"] == RecordKind.MOTION) & (records["motion_id"] & 1 == 0)
+    keys, timestamps, attempt = records["motion_id"][is_press] >> 1, \
+        records["timestamp_ns"][is_press].astype(np.int64), attempt[is_press]
+    same_attempt = attempt[1:] == attempt[:-1]
+    return keys[1:][same_attempt], (timestamps[1:] - timestamps[:-1])[same_attempt]
+
+
+def latency_percentiles_by_key(keys: np.ndarray, latencies: np.ndarray,
+                               percentiles: Sequence[float] = (50, 90, 99)) -> np.ndarray:
+    # NOTE(zeronineseven): One sort for every key at once: each key's latencies end up as a sorted segment, and the
+    #                      percentiles are picked from every segment by index. Keys never pressed get NaN.
+    order = np.lexsort((latencies, keys))
+    keys, latencies = keys[order], latencies[order]
+    starts = np.searchsorted(keys, np.arange(_KEYS), side="left")
+    counts = np.searchsorted(keys, np.arange(_KEYS), side="right") - starts
+    result = np.full((_KEYS, len(percentiles)), np.nan)
+    present = counts > 0
+    for column, p in enumerate(percentiles):
+        picked = starts[present] + np.floor((counts[present] - 1) * p / 100).astype(np.int64)
+        result[present, column] = latencies[picked]
+    return result
+
+
+def error_rate_by_key(deck: DeckArrays, records: np.ndarray) -> np.ndarray:
+    # NOTE(zeronineseven): Every outcome is attributed to all the keys of the expected combo. Outcomes for actions
+    #                      missing from the deck are ignored.
+    if not deck.actions:
+        return np.full(_KEYS, np.nan)
+    outcomes = records[np.isin(records["kind"], (RecordKind.MATCHED, RecordKind.MISMATCHED))]
+    order = np.argsort(deck.fingerprints)
+    rows = np.searchsorted(deck.fingerprints, outcomes["payload"], sorter=order)
+    rows = np.minimum(rows, len(order) - 1)
+    known = deck.fingerprints[order[rows]] == outcomes["payload"]
+    used = deck.key_matrix[order[rows[known]]]
+    failed = outcomes["kind"][known] == RecordKind.MISMATCHED
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return used[failed].sum(axis=0) / used.sum(axis=0)
+
+
+def expensive_bindings(deck: DeckArrays, top: int = 20) -> Tuple[Tuple[NormalizedAction, float], ...]:
+    # NOTE(zeronineseven): Cost is the effort of reaching every key plus the most keys held down at once, which
+    #                      is computed as a running sum of +1 for presses and -1 for releases within every combo.
+    if not deck.actions:
+        return ()
+    steps = 1 - 2 * (deck.motion_ids & 1).astype(np.int64)
+    held = np.cumsum(steps)
+    starts = deck.offsets[:-1]
+    baseline = np.concatenate(([0], held))[starts]
+    combo_of_motion = np.repeat(np.arange(len(deck.actions)), np.diff(deck.offsets))
+    max_held = np.zeros(len(deck.actions), dtype=np.int64)
+    np.maximum.at(max_held, combo_of_motion, held - baseline[combo_of_motion])
+    cost = deck.key_matrix @ _EFFORT + max_held
+    ranked = np.argsort(-cost, kind="stable")[:top]
+    return tuple((deck.actions[i], float(cost[i])) for i in ranked)
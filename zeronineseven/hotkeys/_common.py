@@ -1,12 +1,16 @@
+import collections.abc
+import functools
 import itertools
+import re
 import typing
 from collections import deque
-from typing import Literal, Union, Tuple, Sequence, FrozenSet, Iterable, Iterator, NamedTuple
+from types import MappingProxyType
+from typing import Dict, Literal, Union, Tuple, Sequence, FrozenSet, Iterable, Iterator, NamedTuple, List, Mapping
 
 from attr import frozen
 from typing_extensions import TypeAlias
 
-__all__ = "Key", "Action", "Motions", "Motion", "get_combo_keys", "normalize_action", "NormalizedAction", "parse_key_combo_dsl", "parse_key_combo_dsl_iter", "Press", "pretty_print_motions", "pretty_print_context", "pretty_print_motion", "Release", "serialize_motions_to_str", "serialize_motions_to_str_iter"
+__all__ = "Key", "KEY_IDS", "KEYS_BY_ID", "Action", "canonical_hash", "canonicalize_motions", "CanonicalMotions", "MODIFIER_KEYS", "Motions", "Motion", "motion_from_id", "motion_to_id", "get_combo_keys", "KeyComboDslError", "normalize_action", "NormalizedAction", "parse_key_combo_dsl", "parse_key_combo_dsl_iter", "parse_key_combo_dsl_many", "parse_key_combo_dsl_packed", "pack_motions", "PackedMotions", "Press", "pretty_print_motions", "pretty_print_context", "pretty_print_motion", "Release", "serialization_cache_info", "serialize_motions_to_str", "serialize_motions_to_str_iter", "SIDED_TO_GENERIC"
 
 Key = Literal[
     "esc",
@@ -70,16 +74,52 @@ Key = Literal[
     "f10",
     "f11",
     "f12",
+    "space",
+    "0",
+    "lshift",
+    "rshift",
+    "lctrl",
+    "rctrl",
+    "lalt",
+    "ralt",
+    "[",
+    "]",
 ]
 
 
-@frozen
+# NOTE(zeronineseven): Interned: constructing a motion always returns the one shared instance for its key, so that
+#                      motions hash and compare by identity at C speed. Hashing a combo then never runs Python code
+#                      per motion, which is what makes the serialization caches' hits cheap.
+_INTERNED: Dict[Tuple[type, str], "Motion"] = {}
+
+
+def _interned(cls: type, key: str) -> "Motion":
+    try:
+        return _INTERNED[cls, key]
+    except KeyError:
+        m = _INTERNED[cls, key] = object.__new__(cls)
+        return m
+
+
+@frozen(eq=False)
 class Press:
+    def __new__(cls, key: Key) -> "Press":
+        return _interned(cls, key)
+
+    def __reduce__(self):
+        return Press, (self.key,)
+
     key: Key
 
 
-@frozen
+@frozen(eq=False)
 class Release:
+    def __new__(cls, key: Key) -> "Release":
+        return _interned(cls, key)
+
+    def __reduce__(self):
+        return Release, (self.key,)
+
     key: Key
 
 
@@ -94,49 +134,174 @@ class NormalizedAction(NamedTuple):
     description: str
 
 
+# NOTE(zeronineseven): Ids follow the order of the `Key` literal, so new keys must only ever be appended to it
+#                      to keep already packed motions and recorded files readable.
+KEYS_BY_ID: Tuple[Key, ...] = typing.get_args(Key)
+KEY_IDS: Mapping[Key, int] = MappingProxyType({k: i for i, k in enumerate(KEYS_BY_ID)})
+_KEYS: FrozenSet[Key] = frozenset(KEYS_BY_ID)
+
+# NOTE(zeronineseven): Flyweights: every motion id maps to the single shared instance. Press of the key `n` gets
+#                      id `2 * n` and its release gets `2 * n + 1`.
+_MOTIONS: Tuple[Motion, ...] = tuple(m for k in KEYS_BY_ID for m in (Press(k), Release(k)))
+_MOTION_IDS: Mapping[Motion, int] = MappingProxyType({m: i for i, m in enumerate(_MOTIONS)})
+_PRESSES: Mapping[Key, Press] = MappingProxyType({m.key: m for m in _MOTIONS[0::2]})
+_RELEASES: Mapping[Key, Release] = MappingProxyType({m.key: m for m in _MOTIONS[1::2]})
+
+
+def motion_to_id(m: Motion) -> int:
+    return _MOTION_IDS[m]
+
+
+def motion_from_id(i: int) -> Motion:
+    return _MOTIONS[i]
+
+
+class PackedMotions(collections.abc.Sequence):
+    # NOTE(zeronineseven): Equal to, and hashed like, the tuple of the same motions, so that packed and tuple combos
+    #                      are interchangeable as actions, dict keys and cache keys. Motions are interned, so hashing
+    #                      that tuple runs at C speed, and it is done at most once per instance.
+    __slots__ = "_data", "_hash"
+
+    def __init__(self, ms: Iterable[Motion] = ()):
+        if isinstance(ms, PackedMotions):
+            self._data: bytes = ms._data
+        else:
+            try:
+                self._data = bytes(map(_MOTION_IDS.__getitem__, ms))
+            except KeyError as e:
+                raise ValueError(f"Not a motion: {e.args[0]!r}") from None
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "PackedMotions":
+        data = bytes(data)
+        if data and max(data) >= len(_MOTIONS):
+            raise ValueError(f"Unknown motion id {max(data)}")
+        self = cls.__new__(cls)
+        self._data = data
+        return self
+
+    def __bytes__(self) -> bytes:
+        return self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return PackedMotions.from_bytes(self._data[index])
+        return _MOTIONS[self._data[index]]
+
+    def __iter__(self) -> Iterator[Motion]:
+        return map(_MOTIONS.__getitem__, self._data)
+
+    def __contains__(self, m) -> bool:
+        try:
+            return _MOTION_IDS[m] in self._data
+        except (KeyError, TypeError):
+            return False
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, PackedMotions):
+            return self._data == other._data
+        if isinstance(other, tuple):
+            return len(other) == len(self._data) and tuple(self) == other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = hash(tuple(self))
+            return self._hash
+
+    def __repr__(self) -> str:
+        return f"PackedMotions({serialize_motions_to_str(self)!r})"
+
+
+def pack_motions(ms: Iterable[Motion]) -> PackedMotions:
+    return ms if isinstance(ms, PackedMotions) else PackedMotions(ms)
+
+
+_MOTION_TOKEN_RE = re.compile("([↓↑]*)([^↓↑]*)")
+
+
+class KeyComboDslError(ValueError):
+    def __init__(self, combo: str, combo_index: int, offset: int):
+        super().__init__(f"Invalid key combo #{combo_index} {combo!r} at offset {offset}")
+        self.combo = combo
+        self.combo_index = combo_index
+        self.offset = offset
+
+
 def _validate_key(k: str) -> Key:
-    if k not in set(typing.get_args(Key)):
+    if k not in _KEYS:
         raise ValueError(f"Unknown keyboard key '{k}'")
     return typing.cast(Key, k)
 
 
-def parse_key_combo_dsl_iter(keys_combos: str) -> Iterator[Motion]:
-    pressed, index = set(), 0
-    while index < len(keys_combos):
-        m_index = index
-        while keys_combos[m_index] in {"↓", "↑"}:
-            m_index += 1
-        k_index = m_index
+def _parse_key_combo_dsl_iter(keys_combos: str, offset: List[int]) -> Iterator[Motion]:
+    # NOTE(zeronineseven): `offset` always points at the start of the token being parsed, so that
+    #                      bulk parsing can tell exactly where an error happened.
+    pressed = set()
+    for m, k in _MOTION_TOKEN_RE.findall(keys_combos):
+        if not k:
+            if m:
+                raise IndexError("string index out of range")
+            break
         try:
-            while keys_combos[k_index] not in {"↓", "↑"}:
-                k_index += 1
-        except IndexError:
-            pass
-        m = keys_combos[index: m_index]
-        k = _validate_key(keys_combos[m_index: k_index])
-        if m == "↓↑":
-            yield Press(k)
-            yield Release(k)
-        elif m == "↑↓":
-            raise ValueError("Invalid motion '↑↓'!")
+            press = _PRESSES[k]
+        except KeyError:
+            raise ValueError(f"Unknown keyboard key '{k}'") from None
+        if m == "↓":
+            if k in pressed:
+                raise RuntimeError(f"'{k}' key should already be pressed!")
+            pressed.add(k)
+            offset[0] += 1 + len(k)
+            yield press
         elif m == "↑":
             try:
                 pressed.remove(k)
             except KeyError:
                 raise ValueError(f"'{k}' was never indicated as pressed!")
-            yield Release(k)
-        elif m == "↓":
-            if k in pressed:
-                raise RuntimeError(f"'{k}' key should already be pressed!")
-            pressed.add(k)
-            yield Press(k)
+            offset[0] += 1 + len(k)
+            yield _RELEASES[k]
+        elif m == "↓↑":
+            offset[0] += 2 + len(k)
+            yield press
+            yield _RELEASES[k]
+        elif m == "↑↓":
+            raise ValueError("Invalid motion '↑↓'!")
         elif __debug__ is True:
             raise AssertionError()
-        index = k_index
+        else:
+            offset[0] += len(m) + len(k)
+
+
+def parse_key_combo_dsl_iter(keys_combos: str) -> Iterator[Motion]:
+    return _parse_key_combo_dsl_iter(keys_combos, [0])
 
 
 def parse_key_combo_dsl(keys_combos: str) -> Motions:
-    return tuple(parse_key_combo_dsl_iter(keys_combos))
+    return tuple(_parse_key_combo_dsl_iter(keys_combos, [0]))
+
+
+def parse_key_combo_dsl_packed(keys_combos: str) -> PackedMotions:
+    return PackedMotions(_parse_key_combo_dsl_iter(keys_combos, [0]))
+
+
+def parse_key_combo_dsl_many(keys_combos: Iterable[str]) -> Tuple[Motions, ...]:
+    parsed, result = {}, []
+    for combo_index, combo in enumerate(keys_combos):
+        try:
+            motions = parsed[combo]
+        except KeyError:
+            offset = [0]
+            try:
+                motions = parsed[combo] = tuple(_parse_key_combo_dsl_iter(combo, offset))
+            except (ValueError, RuntimeError, IndexError, AssertionError) as e:
+                raise KeyComboDslError(combo, combo_index, offset[0]) from e
+        result.append(motions)
+    return tuple(result)
 
 
 def normalize_action(context: Tuple[str], combo: str, description: str) -> NormalizedAction:
@@ -180,7 +345,47 @@ class _PeekWrapper:
         return self
 
 
+_MOTION_STRS: Tuple[str, ...] = tuple(s for k in KEYS_BY_ID for s in ("↓" + k, "↑" + k))
+
+
+def _serialize_packed_motions_to_str_iter(data: bytes) -> Iterator[str]:
+    index, length = 0, len(data)
+    while index < length:
+        cur_m = data[index]
+        if cur_m & 1 == 0 and index + 1 < length and data[index + 1] == cur_m + 1:
+            index += 2
+            yield "↓↑" + KEYS_BY_ID[cur_m >> 1]
+        else:
+            index += 1
+            yield _MOTION_STRS[cur_m]
+
+
+def _serialize_motion_sequence_to_str_iter(ms: Sequence[Motion]) -> Iterator[str]:
+    index, length = 0, len(ms)
+    while index < length:
+        cur_m = ms[index]
+        if isinstance(cur_m, Press):
+            next_m = ms[index + 1] if index + 1 < length else None
+            if isinstance(next_m, Release) and next_m.key == cur_m.key:
+                index += 2
+                yield "↓↑" + cur_m.key
+            else:
+                index += 1
+                yield "↓" + cur_m.key
+        else:
+            index += 1
+            yield "↑" + cur_m.key
+
+
 def serialize_motions_to_str_iter(ms: Iterable[Motion]) -> Iterator[str]:
+    if isinstance(ms, PackedMotions):
+        yield from _serialize_packed_motions_to_str_iter(bytes(ms))
+        return
+    # NOTE(zeronineseven): Only tuples and lists get indexed directly, other sequences (e.g. deques) may not have
+    #                      constant time indexing.
+    if isinstance(ms, (tuple, list)):
+        yield from _serialize_motion_sequence_to_str_iter(ms)
+        return
     ms_iter = _PeekWrapper(iter(ms))
     for cur_m in ms_iter:
         if isinstance(cur_m, Press):
@@ -197,14 +402,37 @@ def serialize_motions_to_str_iter(ms: Iterable[Motion]) -> Iterator[str]:
             yield "↑" + cur_m.key
 
 
+@functools.lru_cache(maxsize=4096)
+def _serialize_hashable_motions_to_str(ms: Motions) -> str:
+    return "".join(serialize_motions_to_str_iter(ms))
+
+
+@functools.lru_cache(maxsize=4096)
+def _pretty_print_hashable_motions(ms: Motions) -> str:
+    return "·".join(serialize_motions_to_str_iter(ms))
+
+
 def serialize_motions_to_str(ms: Iterable[Motion]) -> str:
+    if isinstance(ms, (tuple, PackedMotions)):
+        return _serialize_hashable_motions_to_str(ms)
     return "".join(serialize_motions_to_str_iter(ms))
 
 
 def pretty_print_motions(ms: Iterable[Motion]) -> str:
+    # NOTE(zeronineseven): The trainer keeps re-rendering the very same prefixes of the current combo, so immutable
+    #                      combos are memoized and the rest is serialized every time.
+    if isinstance(ms, (tuple, PackedMotions)):
+        return _pretty_print_hashable_motions(ms)
     return "·".join(serialize_motions_to_str_iter(ms))
 
 
+def serialization_cache_info() -> Mapping[str, "functools._CacheInfo"]:
+    return {
+        "serialize_motions_to_str": _serialize_hashable_motions_to_str.cache_info(),
+        "pretty_print_motions": _pretty_print_hashable_motions.cache_info(),
+    }
+
+
 def pretty_print_motion(m: Motion) -> str:
     if isinstance(m, Press):
         return "↓" + m.key
@@ -220,3 +448,56 @@ def pretty_print_context(c: Tuple[str]) -> str:
 
 def get_combo_keys(ms: Iterable[Motion]) -> FrozenSet[Key]:
     return frozenset(m.key for m in ms)
+
+
+SIDED_TO_GENERIC: Mapping[Key, Key] = MappingProxyType({
+    "lshift": "shift",
+    "rshift": "shift",
+    "lctrl": "ctrl",
+    "rctrl": "ctrl",
+    "lalt": "alt",
+    "ralt": "alt",
+})
+
+MODIFIER_KEYS: FrozenSet[Key] = frozenset(("ctrl", "alt", "shift", "lshift", "rshift", "lctrl", "rctrl", "lalt",
+                                           "ralt"))
+
+CanonicalMotions: TypeAlias = Tuple[Union[Motion, FrozenSet[Press]], ...]
+
+
+def _canonicalize_motions_iter(ms: Iterable[Motion]) -> Iterator[Union[Motion, FrozenSet[Press]]]:
+    chord: List[Press] = []
+    for m in ms:
+        if type(m) is Press and m.key in MODIFIER_KEYS:
+            chord.append(m)
+            continue
+        if chord:
+            yield frozenset(chord)
+            chord.clear()
+        yield m
+    if chord:
+        yield frozenset(chord)
+
+
+@functools.lru_cache(maxsize=4096)
+def _canonicalize_hashable_motions(ms: Motions) -> CanonicalMotions:
+    return tuple(_canonicalize_motions_iter(ms))
+
+
+@functools.lru_cache(maxsize=4096)
+def _canonical_hash_of_hashable_motions(ms: Motions) -> int:
+    return hash(_canonicalize_hashable_motions(ms))
+
+
+def canonicalize_motions(ms: Iterable[Motion]) -> CanonicalMotions:
+    # NOTE(zeronineseven): Modifiers pressed back to back are held together, so every such run collapses into
+    #                      an unordered set: `↓ctrl↓shift↓f` and `↓shift↓ctrl↓f` share the same canonical form.
+    if isinstance(ms, (tuple, PackedMotions)):
+        return _canonicalize_hashable_motions(ms)
+    return tuple(_canonicalize_motions_iter(ms))
+
+
+def canonical_hash(ms: Iterable[Motion]) -> int:
+    if isinstance(ms, (tuple, PackedMotions)):
+        return _canonical_hash_of_hashable_motions(ms)
+    return hash(tuple(_canonicalize_motions_iter(ms)))
@@ -0,0 +1,104 @@
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+import attr
+
+from ._common import Motion, Motions, NormalizedAction, pretty_print_context, pretty_print_motions
+
+__all__ = "analyze_controls", "ControlsReport", "Duplicate", "ConflictingMeanings", "PrefixShadowing", \
+    "UnboundContext"
+
+
+@attr.frozen
+class Duplicate:
+    action: NormalizedAction
+    count: int
+
+    def __str__(self):
+        return f"{pretty_print_context(self.action.context)}: {pretty_print_motions(self.action.combo)} " \
+               f"is bound {self.count} times to '{self.action.description}'"
+
+
+@attr.frozen
+class ConflictingMeanings:
+    context: Tuple[str]
+    combo: Motions
+    descriptions: Tuple[str, ...]
+
+    def __str__(self):
+        return f"{pretty_print_context(self.context)}: {pretty_print_motions(self.combo)} means all of " + \
+               ", ".join(f"'{d}'" for d in self.descriptions)
+
+
+@attr.frozen
+class PrefixShadowing:
+    prefix: NormalizedAction
+    shadowed: NormalizedAction
+
+    def __str__(self):
+        return f"{pretty_print_context(self.prefix.context)}: {pretty_print_motions(self.prefix.combo)} " \
+               f"('{self.prefix.description}') shadows {pretty_print_motions(self.shadowed.combo)} " \
+               f"('{self.shadowed.description}')"
+
+
+@attr.frozen
+class UnboundContext:
+    context: Tuple[str]
+
+    def __str__(self):
+        return f"{pretty_print_context(self.context)}: has no controls at all"
+
+
+@attr.frozen
+class ControlsReport:
+    duplicates: Tuple[Duplicate, ...]
+    conflicts: Tuple[ConflictingMeanings, ...]
+    shadowing: Tuple[PrefixShadowing, ...]
+    unbound_contexts: Tuple[UnboundContext, ...]
+
+    def __iter__(self) -> Iterator[object]:
+        for findings in attr.astuple(self, recurse=False):
+            yield from findings
+
+    def __bool__(self):
+        return any(attr.astuple(self, recurse=False))
+
+
+@attr.mutable
+class _Node:
+    children: Dict[Motion, "_Node"] = attr.ib(factory=dict)
+    actions: List[NormalizedAction] = attr.ib(factory=list)
+
+
+def analyze_controls(controls: Iterable[NormalizedAction], contexts: Iterable[Tuple[str]] = ()) -> ControlsReport:
+    # NOTE(zeronineseven): Combos are indexed as-is and in a per context trie of motions. Prefixes are found by
+    #                      walking each combo down its trie once, without materializing any of them, so the whole
+    #                      analysis stays linear in the total length of all combos.
+    actions: Dict[NormalizedAction, int] = defaultdict(int)
+    by_combo: Dict[Tuple[Tuple[str], Motions], List[NormalizedAction]] = defaultdict(list)
+    tries: Dict[Tuple[str], _Node] = defaultdict(_Node)
+    for action in controls:
+        actions[action] += 1
+        if actions[action] == 1:
+            by_combo[action.context, tuple(action.combo)].append(action)
+    for (context, combo), actions_ in by_combo.items():
+        node = tries[context]
+        for motion in combo:
+            node = node.children.setdefault(motion, _Node())
+        node.actions = actions_
+
+    shadowing = []
+    for (context, combo), shadowed in by_combo.items():
+        node = tries[context]
+        for motion in combo[:-1]:
+            node = node.children[motion]
+            shadowing.extend(PrefixShadowing(prefix, a) for prefix in node.actions for a in shadowed)
+
+    bound_contexts = {context for context, _ in by_combo}
+    return ControlsReport(
+        duplicates=tuple(Duplicate(a, n) for a, n in actions.items() if n > 1),
+        conflicts=tuple(ConflictingMeanings(context, combo, tuple(a.description for a in actions_))
+                        for (context, combo), actions_ in by_combo.items() if len(actions_) > 1),
+        shadowing=tuple(shadowing),
+        unbound_contexts=tuple(UnboundContext(c) for c in dict.fromkeys(contexts) if c not in bound_contexts),
+    )
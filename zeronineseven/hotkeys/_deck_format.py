@@ -0,0 +1,166 @@
+import mmap
+import os
+import struct
+import sys
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple, Union, overload
+
+from ._common import KEYS_BY_ID, KEY_IDS, Motion, NormalizedAction, motion_from_id, motion_to_id
+
+__all__ = "CompiledDeck", "write_compiled_deck"
+
+_MAGIC = b"ZNSHKDCK"
+_VERSION = 1
+# NOTE(zeronineseven): Magic, version, number of keys, strings, contexts, context parts and actions, then sizes of
+#                      the string pool and of the motions blob. The sections follow in this order, all the u32
+#                      arrays first, so that every one of them stays 4-byte aligned:
+#                      * key table: string id per deck key id;
+#                      * string offsets: n_strings + 1 offsets into the string pool;
+#                      * context offsets: n_contexts + 1 offsets into the context parts;
+#                      * context parts: string id per context part;
+#                      * actions: context id, description string id, motions offset, motions length;
+#                      * string pool: UTF-8;
+#                      * motions blob: one byte per motion, `2 * deck key id` for presses and `+ 1` for releases.
+_HEADER = struct.Struct("<8sHxx7I")
+_ACTION_FIELDS = 4
+
+
+def write_compiled_deck(path: Union[str, os.PathLike], actions: Iterable[NormalizedAction]) -> int:
+    strings: Dict[str, int] = {}
+    contexts: Dict[Tuple[str, ...], int] = {}
+    context_parts: List[int] = []
+    context_offsets: List[int] = [0]
+    action_rows: List[int] = []
+    motions = bytearray()
+    combo_offsets: Dict[bytes, int] = {}
+
+    def string_id(s: str) -> int:
+        try:
+            return strings[s]
+        except KeyError:
+            strings[s] = len(strings)
+            return strings[s]
+
+    key_table = [string_id(k) for k in KEYS_BY_ID]
+    for action in actions:
+        context = tuple(action.context)
+        try:
+            context_id = contexts[context]
+        except KeyError:
+            context_id = contexts[context] = len(contexts)
+            context_parts.extend(map(string_id, context))
+            context_offsets.append(len(context_parts))
+        combo = bytes(map(motion_to_id, action.combo))
+        # NOTE(zeronineseven): Combos bound in many contexts are stored once and shared by all of their actions.
+        try:
+            combo_offset = combo_offsets[combo]
+        except KeyError:
+            combo_offset = combo_offsets[combo] = len(motions)
+            motions += combo
+        action_rows += context_id, string_id(action.description), combo_offset, len(combo)
+
+    encoded = [s.encode("utf-8") for s in strings]
+    string_offsets = [0]
+    for s in encoded:
+        string_offsets.append(string_offsets[-1] + len(s))
+    pool = b"".join(encoded)
+
+    with open(f"{path}.tmp", "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, len(key_table), len(strings), len(contexts), len(context_parts),
+                             len(action_rows) // _ACTION_FIELDS, len(pool), len(motions)))
+        for u32s in (key_table, string_offsets, context_offsets, context_parts, action_rows):
+            f.write(struct.pack(f"<{len(u32s)}I", *u32s))
+        f.write(pool)
+        f.write(motions)
+    os.replace(f"{path}.tmp", path)
+    return len(action_rows) // _ACTION_FIELDS
+
+
+class CompiledDeck(Sequence[NormalizedAction]):
+    def __init__(self, path: Union[str, os.PathLike]):
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size or header[:len(_MAGIC)] != _MAGIC:
+                raise ValueError(f"'{path}' is not a compiled deck")
+            magic, version, n_keys, n_strings, n_contexts, n_parts, n_actions, pool_size, motions_size = \
+                _HEADER.unpack(header)
+            if version != _VERSION:
+                raise ValueError(f"'{path}' is a compiled deck of unsupported version {version}")
+            size = _HEADER.size + 4 * (n_keys + n_strings + 1 + n_contexts + 1 + n_parts + n_actions * _ACTION_FIELDS) \
+                + pool_size + motions_size
+            actual_size = os.fstat(f.fileno()).st_size
+            if actual_size != size:
+                raise ValueError(f"'{path}' is a truncated or corrupt compiled deck: {actual_size} bytes instead "
+                                 f"of {size}")
+            self.__mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self.__mmap)
+
+        offset = _HEADER.size
+        sections = []
+        for count in (n_keys, n_strings + 1, n_contexts + 1, n_parts, n_actions * _ACTION_FIELDS):
+            sections.append(self.__u32s(buffer, offset, count))
+            offset += 4 * count
+        key_table, self.__string_offsets, self.__context_offsets, self.__context_parts, self.__actions = sections
+        self.__pool = buffer[offset:offset + pool_size]
+        self.__motions = buffer[offset + pool_size:offset + pool_size + motions_size]
+        self.__len = n_actions
+
+        # NOTE(zeronineseven): Deck key ids are remapped onto the shared motion flyweights once, so that
+        #                      materializing a combo is a table lookup per motion whatever order the keys are in.
+        keys = [self.__string(i) for i in key_table]
+        self.__remap: List[Motion] = [motion_from_id(2 * KEY_IDS[k] + release) if k in KEY_IDS else None
+                                      for k in keys for release in (0, 1)]
+        self.__contexts: Dict[int, Tuple[str, ...]] = {}
+
+    def __len__(self) -> int:
+        return self.__len
+
+    @overload
+    def __getitem__(self, index: int) -> NormalizedAction: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Sequence[NormalizedAction]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self[i] for i in range(*index.indices(self.__len)))
+        if index < 0:
+            index += self.__len
+        if not 0 <= index < self.__len:
+            raise IndexError("action index out of range")
+        row = index * _ACTION_FIELDS
+        context_id, description_id, motions_offset, motions_len = self.__actions[row:row + _ACTION_FIELDS]
+        try:
+            context = self.__contexts[context_id]
+        except KeyError:
+            parts = self.__context_parts[self.__context_offsets[context_id]:self.__context_offsets[context_id + 1]]
+            context = self.__contexts[context_id] = tuple(map(self.__string, parts))
+        combo = tuple(map(self.__remap.__getitem__, self.__motions[motions_offset:motions_offset + motions_len]))
+        if None in combo:
+            raise ValueError(f"Action #{index} uses keys unknown to this version")
+        return NormalizedAction(context, combo, self.__string(description_id))
+
+    def __iter__(self) -> Iterator[NormalizedAction]:
+        return map(self.__getitem__, range(self.__len))
+
+    def close(self) -> None:
+        # NOTE(zeronineseven): Views handed out by `__init__` must be released before the mmap can be closed.
+        for view in (self.__string_offsets, self.__context_offsets, self.__context_parts, self.__actions,
+                     self.__pool, self.__motions):
+            if isinstance(view, memoryview):
+                view.release()
+        self.__mmap.close()
+
+    def __enter__(self) -> "CompiledDeck":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def __string(self, i: int) -> str:
+        return str(self.__pool[self.__string_offsets[i]:self.__string_offsets[i + 1]], "utf-8")
+
+    @staticmethod
+    def __u32s(buffer: memoryview, offset: int, count: int) -> Sequence[int]:
+        if sys.byteorder == "little":
+            return buffer[offset:offset + 4 * count].cast("I")
+        return struct.unpack_from(f"<{count}I", buffer, offset)
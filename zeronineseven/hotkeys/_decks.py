@@ -0,0 +1,142 @@
+import hashlib
+import importlib
+import importlib.util
+import marshal
+import os
+import sys
+from typing import Dict, Iterable, Mapping, Optional, Sequence, Tuple
+
+from ._common import Motions, NormalizedAction, PackedMotions, motion_from_id
+from ._deck_format import CompiledDeck
+
+__all__ = "DECKS", "deck_source", "load_deck", "load_decks", "reload_deck"
+
+DECKS: Mapping[str, str] = {
+    "pycharm": f"{__package__}.pycharm",
+    "edge": f"{__package__}.edge",
+}
+
+_SNAPSHOT_VERSION = 1
+
+
+def _snapshot_dir() -> str:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "zeronineseven-hotkeys")
+
+
+def _source_digest(module_name: str, source: Optional[bytes] = None) -> Optional[str]:
+    # NOTE(zeronineseven): The parser and the registry are part of the key as well, so that changing them never serves
+    #                      stale snapshots. `source` is the deck module's own source, when it has already been read.
+    digest = hashlib.sha256(f"{_SNAPSHOT_VERSION}:{sys.version_info[:2]}".encode())
+    for name in (module_name, f"{__package__}._common", f"{__package__}._registry"):
+        if name == module_name and source is not None:
+            digest.update(source)
+            continue
+        spec = importlib.util.find_spec(name)
+        if spec is None or spec.origin is None or not os.path.isfile(spec.origin):
+            return None
+        with open(spec.origin, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _load_snapshot(path: str) -> Optional[Tuple[NormalizedAction, ...]]:
+    try:
+        with open(path, "rb") as f:
+            rows = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    # NOTE(zeronineseven): marshal already keeps identical descriptions and contexts shared, combos are shared here.
+    combos: Dict[bytes, Motions] = {}
+    actions = []
+    for context, combo, description in rows:
+        try:
+            motions = combos[combo]
+        except KeyError:
+            motions = combos[combo] = tuple(map(motion_from_id, combo))
+        actions.append(NormalizedAction(context, motions, description))
+    return tuple(actions)
+
+
+def _save_snapshot(path: str, actions: Tuple[NormalizedAction, ...]) -> None:
+    rows = tuple((a.context, bytes(PackedMotions(a.combo)), a.description) for a in actions)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.{os.getpid()}.tmp", "wb") as f:
+            marshal.dump(rows, f)
+        os.replace(f"{path}.{os.getpid()}.tmp", path)
+        prefix = os.path.basename(path).rsplit("-", 1)[0] + "-"
+        for stale in os.listdir(os.path.dirname(path)):
+            if stale.startswith(prefix) and len(stale) == len(os.path.basename(path)) and stale.endswith(".marshal") \
+                    and stale != os.path.basename(path):
+                os.remove(os.path.join(os.path.dirname(path), stale))
+    except OSError:
+        pass
+
+
+def load_deck(name: str, use_snapshot: bool = True) -> Sequence[NormalizedAction]:
+    # NOTE(zeronineseven): Contexts are always plain tuples (never the decks' `Mode` enums), so that actions look the
+    #                      same whether they come from a snapshot or from importing the deck module. Compiled decks
+    #                      are handed out as they are, so that actions are only materialized once accessed; their
+    #                      file stays mapped for as long as the deck is referenced.
+    if name.endswith(".deck") and os.path.isfile(name):
+        return CompiledDeck(name)
+    module_name = DECKS.get(name, name)
+    digest = _source_digest(module_name) if use_snapshot else None
+    if digest is not None:
+        path = os.path.join(_snapshot_dir(), f"{name}-{digest}.marshal")
+        actions = _load_snapshot(path)
+        if actions is not None:
+            return actions
+    actions = _module_actions(importlib.import_module(module_name))
+    if digest is not None:
+        _save_snapshot(path, actions)
+    return actions
+
+
+def _module_actions(module) -> Tuple[NormalizedAction, ...]:
+    return tuple(NormalizedAction(tuple(a.context), a.combo, a.description) for a in module.all_controls)
+
+
+def deck_source(name: str) -> Optional[str]:
+    if name.endswith(".deck") and os.path.isfile(name):
+        return name
+    spec = importlib.util.find_spec(DECKS.get(name, name))
+    return spec.origin if spec is not None and spec.origin is not None and os.path.isfile(spec.origin) else None
+
+
+def reload_deck(name: str) -> Sequence[NormalizedAction]:
+    # NOTE(zeronineseven): Re-executes the deck module from its current source. Combos that didn't change are served
+    #                      from the registry's parse cache, and the snapshot is refreshed for the next start. The
+    #                      source is read once, and the very same bytes are executed and digested: `importlib.reload`
+    #                      may serve a stale .pyc when the file is rewritten within the mtime's resolution, and the
+    #                      snapshot would then store the old actions under the new source's key.
+    if name.endswith(".deck"):
+        return load_deck(name)
+    module_name = DECKS.get(name, name)
+    spec = importlib.util.find_spec(module_name)
+    if spec is None or spec.origin is None or not os.path.isfile(spec.origin):
+        return load_deck(name, use_snapshot=False)
+    with open(spec.origin, "rb") as f:
+        source = f.read()
+    code = compile(source, spec.origin, "exec", dont_inherit=True)
+    fresh = module_name not in sys.modules
+    module = sys.modules[module_name] = sys.modules.get(module_name) or importlib.util.module_from_spec(spec)
+    try:
+        exec(code, module.__dict__)
+    except BaseException:
+        if fresh:
+            del sys.modules[module_name]
+        raise
+    actions = _module_actions(module)
+    digest = _source_digest(module_name, source)
+    if digest is not None:
+        _save_snapshot(os.path.join(_snapshot_dir(), f"{name}-{digest}.marshal"), actions)
+    return actions
+
+
+def load_decks(names: Iterable[str] = DECKS, use_snapshot: bool = True) -> Sequence[NormalizedAction]:
+    names = tuple(names)
+    if len(names) == 1:
+        return load_deck(names[0], use_snapshot)
+    return tuple(a for name in names for a in load_deck(name, use_snapshot))
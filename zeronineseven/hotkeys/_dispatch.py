@@ -0,0 +1,29 @@
+from typing import Any, Callable, Tuple
+
+import attr
+
+__all__ = "Dispatcher", "Subscriber"
+
+Subscriber = Callable[[Any], Any]
+
+
+@attr.mutable
+class Dispatcher:
+    # NOTE(zeronineseven): Synchronous fan-out: `publish` calls every subscriber right away on the caller's stack,
+    #                      in subscription order. Subscribing or unsubscribing from within a subscriber only takes
+    #                      effect from the next event on.
+    def subscribe(self, subscriber: Subscriber) -> Callable[[], None]:
+        self._subscribers += (subscriber,)
+
+        def unsubscribe() -> None:
+            self._subscribers = tuple(s for s in self._subscribers if s is not subscriber)
+
+        return unsubscribe
+
+    def publish(self, event: Any) -> None:
+        self.published += 1
+        for subscriber in self._subscribers:
+            subscriber(event)
+
+    _subscribers: Tuple[Subscriber, ...] = attr.ib(default=(), init=False)
+    published: int = 0
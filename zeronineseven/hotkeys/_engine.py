@@ -0,0 +1,113 @@
+from typing import Any, Callable, List, Optional, Set
+
+import attr
+
+from ._common import CanonicalMotions, Motion, Motions, Press, canonicalize_motions
+
+__all__ = "ComboEngine", "Matched", "Mismatched", "ReadyForNextCombo"
+
+
+@attr.frozen
+class Matched:
+    combo: Motions
+
+
+@attr.frozen
+class Mismatched:
+    expected: Motions
+    entered: Motions
+
+
+ReadyForNextCombo = object()
+
+_IDLE, _ENTERING, _DRAINING = "idle", "entering", "draining"
+
+
+@attr.mutable
+class ComboEngine:
+    # NOTE(zeronineseven): Pure state machine behind the trainer: every entered motion is echoed to `emit`, followed
+    #                      by `Matched`/`Mismatched` once the outcome is known and by `ReadyForNextCombo` once all
+    #                      the keys are released again, so that none of them leak into the next combo. Motions fed
+    #                      while idle are dropped. With `chords` enabled modifiers held together may be pressed in
+    #                      any order, see `canonicalize_motions`.
+    def expect(self, combo: Motions) -> None:
+        self.expected = combo
+        self.entered = []
+        self.pressed = 0
+        self.state = _ENTERING
+        if self.chords:
+            self._steps = canonicalize_motions(combo)
+            self._step = 0
+            self._enter_step()
+
+    def feed(self, m: Motion) -> None:
+        state = self.state
+        if state is _ENTERING:
+            self.pressed += 1 if type(m) is Press else -1
+            entered, expected = self.entered, self.expected
+            entered.append(m)
+            self.emit(m)
+            n = len(entered)
+            if self.chords:
+                matches = self._advance(m)
+                complete = matches and self._step == len(self._steps)
+            else:
+                matches = n <= len(expected) and (m is expected[n - 1] or m == expected[n - 1])
+                complete = matches and n == len(expected)
+            if not matches:
+                self.emit(Mismatched(expected, tuple(entered)))
+                self._finish()
+            elif complete:
+                self.emit(Matched(expected))
+                self._finish()
+        elif state is _DRAINING:
+            self.pressed += 1 if type(m) is Press else -1
+            if self.pressed <= 0:
+                self._ready()
+
+    def _advance(self, m: Motion) -> bool:
+        step = self._steps[self._step]
+        if type(step) is frozenset:
+            held = self._chord
+            if m not in held:
+                return False
+            held.remove(m)
+            if held:
+                return True
+        elif m is not step and m != step:
+            return False
+        self._step += 1
+        self._enter_step()
+        return True
+
+    def _enter_step(self) -> None:
+        if self._step < len(self._steps) and type(self._steps[self._step]) is frozenset:
+            self._chord = set(self._steps[self._step])
+
+    def _finish(self) -> None:
+        if self.pressed > 0:
+            self.state = _DRAINING
+        else:
+            self._ready()
+
+    def _ready(self) -> None:
+        self.state = _IDLE
+        self.emit(ReadyForNextCombo)
+
+    @property
+    def is_idle(self) -> bool:
+        return self.state is _IDLE
+
+    @property
+    def is_entering(self) -> bool:
+        return self.state is _ENTERING
+
+    emit: Callable[[Any], Any]
+    expected: Optional[Motions] = None
+    entered: List[Motion] = attr.ib(factory=list)
+    pressed: int = 0
+    state: str = _IDLE
+    chords: bool = False
+    _steps: CanonicalMotions = attr.ib(default=(), init=False)
+    _step: int = attr.ib(default=0, init=False)
+    _chord: Set[Press] = attr.ib(factory=set, init=False)
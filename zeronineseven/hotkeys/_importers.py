@@ -0,0 +1,187 @@
+import json
+import os
+from typing import Callable, Dict, Iterable, Iterator, Mapping, Optional, Set, Tuple, Union
+from xml.etree.ElementTree import iterparse
+
+from ._common import NormalizedAction, _KEYS
+from ._registry import ControlsRegistry
+
+__all__ = "JetBrainsKeymapImporter", "import_vscode_keybindings", "keystrokes_to_dsl"
+
+_Path = Union[str, os.PathLike]
+_Context = Tuple[str, ...]
+
+_KEY_ALIASES: Mapping[str, str] = {
+    "control": "ctrl",
+    "escape": "esc",
+    "back_slash": "\\",
+    "backslash": "\\",
+    "return": "enter",
+    "ins": "insert",
+    "braceleft": "{",
+    "braceright": "}",
+}
+_MODIFIERS = frozenset(("ctrl", "shift", "alt"))
+
+
+def keystrokes_to_dsl(keystrokes: Iterable[Iterable[str]]) -> Optional[str]:
+    # NOTE(zeronineseven): Every keystroke is "modifiers held, key tapped, modifiers released"; only the last one
+    #                      leaves its keys held, matching how the decks write single-keystroke combos. `None` means
+    #                      that some key is unknown to the `Key` literal.
+    keystrokes = [[_KEY_ALIASES.get(k.lower(), k.lower()) for k in keystroke] for keystroke in keystrokes]
+    parts = []
+    for n, keys in enumerate(keystrokes):
+        if not keys or any(k not in _KEYS for k in keys):
+            return None
+        *modifiers, key = keys
+        parts.extend("↓" + m for m in modifiers)
+        if n + 1 < len(keystrokes):
+            parts.append("↓↑" + key)
+            parts.extend("↑" + m for m in reversed(modifiers))
+        else:
+            parts.append("↓" + key)
+    return "".join(parts)
+
+
+class JetBrainsKeymapImporter:
+    def __init__(self, search_path: Iterable[_Path] = (),
+                 contexts: Callable[[str], Optional[_Context]] = lambda action_id: ("Imported",),
+                 registry: Optional[ControlsRegistry] = None):
+        self.__search_path = tuple(search_path)
+        self.__contexts = contexts
+        self.__registry = registry if registry is not None else ControlsRegistry()
+        self.__keymap_files: Optional[Dict[str, str]] = None
+        self.__parents: Dict[str, Tuple[NormalizedAction, ...]] = {}
+        self.missing_parents: Set[str] = set()
+        self.skipped: int = 0
+
+    def import_file(self, path: _Path) -> Iterator[NormalizedAction]:
+        # NOTE(zeronineseven): Actions of the keymap itself are streamed first, only the ids of the actions it
+        #                      overrides are kept around in order to filter the inherited ones afterwards. Memory is
+        #                      not constant then: it grows with the number of action ids, though not with the size of
+        #                      the file, and parent keymaps are cached whole.
+        overridden: Set[str] = set()
+        context = iterparse(os.fspath(path), events=("start", "end"))
+        _, root = next(context)
+        parent = root.get("parent")
+        for event, element in context:
+            if event != "end" or element.tag != "action":
+                continue
+            action_id = element.get("id", "")
+            overridden.add(action_id)
+            action_context = self.__contexts(action_id)
+            for shortcut in element.iter("keyboard-shortcut"):
+                strokes = [shortcut.get("first-keystroke", "").split()]
+                if shortcut.get("second-keystroke"):
+                    strokes.append(shortcut.get("second-keystroke").split())
+                dsl = keystrokes_to_dsl(strokes)
+                if dsl is None or action_context is None:
+                    self.skipped += 1
+                    continue
+                yield self.__registry.add(action_context, dsl, action_id)
+            root.clear()
+        if parent is not None:
+            for action in self.__load_parent(parent):
+                if action.description not in overridden:
+                    yield action
+
+    def __load_parent(self, name: str) -> Tuple[NormalizedAction, ...]:
+        try:
+            return self.__parents[name]
+        except KeyError:
+            pass
+        path = self.__find_keymap(name)
+        # NOTE(zeronineseven): Marks the keymap as being loaded, so that cyclic `parent=` chains terminate.
+        self.__parents[name] = ()
+        if path is None:
+            self.missing_parents.add(name)
+            actions = ()
+        else:
+            actions = tuple(self.import_file(path))
+        self.__parents[name] = actions
+        return actions
+
+    def __find_keymap(self, name: str) -> Optional[str]:
+        if self.__keymap_files is None:
+            self.__keymap_files = {}
+            for directory in self.__search_path:
+                for entry in os.scandir(directory):
+                    if not entry.name.endswith(".xml"):
+                        continue
+                    # NOTE(zeronineseven): Only the root element is parsed to learn the keymap's name.
+                    for _, root in iterparse(entry.path, events=("start",)):
+                        self.__keymap_files.setdefault(root.get("name", ""), entry.path)
+                        break
+        return self.__keymap_files.get(name)
+
+
+def _iter_json_array(path: _Path, chunk_size: int = 64 * 1024) -> Iterator[object]:
+    # NOTE(zeronineseven): Decodes one array item at a time from a sliding buffer, so memory use only depends on the
+    #                      size of the largest single item. Comments between the items (JSONC) are skipped.
+    decoder, buffer, index, started = json.JSONDecoder(), "", 0, False
+    with open(path, encoding="utf-8") as f:
+        eof = False
+        while True:
+            while index < len(buffer) and (buffer[index] in " \t\r\n," or (not started and buffer[index] == "[")):
+                started = started or buffer[index] == "["
+                index += 1
+            if buffer.startswith("//", index) or buffer.startswith("/*", index):
+                end = buffer.find("\n" if buffer[index + 1] == "/" else "*/", index)
+                if end != -1:
+                    index = end + (1 if buffer[index + 1] == "/" else 2)
+                    continue
+            elif index < len(buffer) and buffer[index] == "]":
+                return
+            elif index < len(buffer):
+                try:
+                    item, end = decoder.raw_decode(buffer, index)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                else:
+                    yield item
+                    index = end
+                    continue
+            if eof:
+                return
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer, index = buffer[index:] + chunk, 0
+
+
+def import_vscode_keybindings(path: _Path, defaults: Optional[_Path] = None,
+                              contexts: Callable[[str], Optional[_Context]] = lambda when: ("Imported",),
+                              registry: Optional[ControlsRegistry] = None) -> Iterator[NormalizedAction]:
+    registry = registry if registry is not None else ControlsRegistry()
+    # NOTE(zeronineseven): Bindings are streamed, only the '-command' removals are kept around until the defaults
+    #                      get filtered, so memory grows with their number alone.
+    removed: Set[Tuple[str, str, str]] = set()
+    for binding in _iter_json_array(path):
+        if not isinstance(binding, dict) or not binding.get("key") or not binding.get("command"):
+            continue
+        key, command, when = binding["key"], binding["command"], binding.get("when", "")
+        if command.startswith("-"):
+            removed.add((key, command[1:], when))
+            continue
+        action = _vscode_action(registry, contexts, key, command, when)
+        if action is not None:
+            yield action
+    if defaults is not None:
+        for binding in _iter_json_array(defaults):
+            if not isinstance(binding, dict) or not binding.get("key") or not binding.get("command"):
+                continue
+            key, command, when = binding["key"], binding["command"], binding.get("when", "")
+            if (key, command, when) in removed or command.startswith("-"):
+                continue
+            action = _vscode_action(registry, contexts, key, command, when)
+            if action is not None:
+                yield action
+
+
+def _vscode_action(registry: ControlsRegistry, contexts: Callable[[str], Optional[_Context]], key: str,
+                   command: str, when: str) -> Optional[NormalizedAction]:
+    context = contexts(when)
+    dsl = keystrokes_to_dsl(stroke.split("+") for stroke in key.split())
+    if context is None or dsl is None:
+        return None
+    return registry.add(context, dsl, command)
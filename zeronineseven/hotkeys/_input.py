@@ -0,0 +1,119 @@
+import asyncio
+import contextlib
+import os
+import struct
+from typing import Callable, ContextManager, Iterator, Mapping, Optional, Protocol, Tuple, Union
+
+import attr
+
+from ._common import Key, KEYS_BY_ID, Motion, SIDED_TO_GENERIC, _PRESSES, _RELEASES
+
+__all__ = "EvdevBackend", "InputBackend", "MotionSink", "decode_evdev_events", "read_evdev_dump"
+
+# NOTE(zeronineseven): Timestamps are in milliseconds of whatever clock the backend has at hand, only differences
+#                      between them are meaningful.
+MotionSink = Callable[[Motion, int], None]
+
+
+class InputBackend(Protocol):
+    def capturing(self, sink: MotionSink) -> ContextManager[None]:
+        ...
+
+
+# NOTE(zeronineseven): `struct input_event` from <linux/input.h>: a `struct timeval` followed by type, code and
+#                      value. Native sizes, so that it matches the running kernel on both 32 and 64 bit.
+_INPUT_EVENT = struct.Struct("@llHHi")
+_EV_KEY = 1
+_KEY_RELEASED, _KEY_PRESSED = 0, 1
+
+_EVDEV_KEYS: Mapping[int, Key] = {code: KEYS_BY_ID[KEYS_BY_ID.index(k)] for code, k in {
+    1: "esc",
+    **{2 + n: d for n, d in enumerate("1234567890")},
+    15: "tab",
+    **{16 + n: c for n, c in enumerate("qwertyuiop")},
+    26: "[",
+    27: "]",
+    28: "enter",
+    29: "lctrl",
+    **{30 + n: c for n, c in enumerate("asdfghjkl")},
+    42: "lshift",
+    43: "\\",
+    **{44 + n: c for n, c in enumerate("zxcvbnm")},
+    54: "rshift",
+    56: "lalt",
+    57: "space",
+    **{59 + n: f"f{n + 1}" for n in range(10)},
+    87: "f11",
+    88: "f12",
+    96: "enter",
+    97: "rctrl",
+    100: "ralt",
+    103: "up",
+    105: "left",
+    106: "right",
+    108: "down",
+    110: "insert",
+}.items()}
+
+
+def decode_evdev_events(data: bytes, sided: bool = False) -> Iterator[Tuple[Motion, int]]:
+    # NOTE(zeronineseven): Autorepeats, non-key events and keys the trainer doesn't know about are skipped.
+    for sec, usec, type_, code, value in _INPUT_EVENT.iter_unpack(data):
+        if type_ != _EV_KEY or value not in (_KEY_RELEASED, _KEY_PRESSED):
+            continue
+        key = _EVDEV_KEYS.get(code)
+        if key is None:
+            continue
+        if not sided:
+            key = SIDED_TO_GENERIC.get(key, key)
+        yield (_PRESSES if value == _KEY_PRESSED else _RELEASES)[key], sec * 1000 + usec // 1000
+
+
+def read_evdev_dump(path: str, sided: bool = False) -> Iterator[Tuple[Motion, int]]:
+    # NOTE(zeronineseven): Dumps are just the raw device stream, e.g. `cat /dev/input/eventN > dump`.
+    with open(path, "rb") as f:
+        data = f.read()
+    return decode_evdev_events(data[:len(data) - len(data) % _INPUT_EVENT.size], sided)
+
+
+@attr.mutable
+class EvdevBackend:
+    # NOTE(zeronineseven): Reads key events straight from the kernel, bypassing the window system and Qt's event
+    #                      compression. Any readable fd with the device's stream works, so pipes can stand in for
+    #                      real devices; `eof` resolves once the writing end is gone.
+    @contextlib.contextmanager
+    def capturing(self, sink: MotionSink) -> Iterator[None]:
+        loop = asyncio.get_running_loop()
+        fd = os.open(self.source, os.O_RDONLY | os.O_NONBLOCK) if isinstance(self.source, str) else self.source
+        os.set_blocking(fd, False)
+        self.eof = loop.create_future()
+        pending = bytearray()
+
+        def on_readable() -> None:
+            try:
+                chunk = os.read(fd, _INPUT_EVENT.size * 64)
+            except BlockingIOError:
+                return
+            if not chunk:
+                loop.remove_reader(fd)
+                if not self.eof.done():
+                    self.eof.set_result(None)
+                return
+            # NOTE(zeronineseven): Devices always deliver whole records, pipes may split them.
+            pending.extend(chunk)
+            whole = len(pending) - len(pending) % _INPUT_EVENT.size
+            for m, timestamp in decode_evdev_events(bytes(pending[:whole]), self.sided):
+                sink(m, timestamp)
+            del pending[:whole]
+
+        loop.add_reader(fd, on_readable)
+        try:
+            yield
+        finally:
+            loop.remove_reader(fd)
+            if isinstance(self.source, str):
+                os.close(fd)
+
+    source: Union[str, int]
+    sided: bool = False
+    eof: Optional[asyncio.Future] = attr.ib(default=None, init=False)
@@ -0,0 +1,110 @@
+import time
+from collections import deque
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+import attr
+
+__all__ = "LatencyHistogram", "LatencyTracer"
+
+
+@attr.mutable
+class LatencyHistogram:
+    # NOTE(zeronineseven): HDR-style log-linear buckets: values below `2 ** precision_bits` are counted exactly and
+    #                      every further power of two is split into `2 ** (precision_bits - 1)` linear sub-buckets,
+    #                      so the relative error stays below `2 ** -(precision_bits - 1)` at any magnitude.
+    def record(self, value: int) -> None:
+        if value < 0:
+            value = 0
+        sub_buckets = 1 << self.precision_bits
+        if value < sub_buckets:
+            index = value
+        else:
+            shift = value.bit_length() - self.precision_bits
+            index = sub_buckets + (shift - 1) * (sub_buckets >> 1) + (value >> shift) - (sub_buckets >> 1)
+        counts = self._counts
+        if index >= len(counts):
+            counts.extend([0] * (index + 1 - len(counts)))
+        counts[index] += 1
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, p: float) -> int:
+        if self.count == 0:
+            return 0
+        threshold, seen = max(1, round(self.count * p / 100)), 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= threshold:
+                return min(self._highest_equivalent_value(index), self.max)
+        return self.max
+
+    def _highest_equivalent_value(self, index: int) -> int:
+        sub_buckets = 1 << self.precision_bits
+        if index < sub_buckets:
+            return index
+        shift, top = divmod(index - sub_buckets, sub_buckets >> 1)
+        return ((top + (sub_buckets >> 1) + 1) << (shift + 1)) - 1
+
+    precision_bits: int = 7
+    _counts: List[int] = attr.ib(factory=list)
+    count: int = 0
+    max: int = 0
+
+
+@attr.mutable
+class LatencyTracer:
+    STAGES = "qt", "emit", "repaint"
+
+    # NOTE(zeronineseven): Motions are shared flyweights, so timestamps can't travel with them. Instead every hop
+    #                      has a matching FIFO of timestamps here, which stays aligned with the motions as long as
+    #                      every hand-over is reported. All latencies but "qt" are measured from the moment the
+    #                      motion left the Qt handler. Motions are fed to the engine right there, so there's no queue
+    #                      in between worth a stage of its own.
+    def received(self, qt_timestamp_ms: int) -> None:
+        now = time.perf_counter_ns()
+        # NOTE(zeronineseven): Qt timestamps come from the window system clock, so only their offset from the
+        #                      fastest delivery ever seen is meaningful.
+        offset = now - qt_timestamp_ms * 1_000_000
+        if self._qt_offset is None or offset < self._qt_offset:
+            self._qt_offset = offset
+        self.histograms["qt"].record(offset - self._qt_offset)
+        self._current = now
+
+    def emitted(self) -> None:
+        if self._current is not None:
+            self.histograms["emit"].record(time.perf_counter_ns() - self._current)
+        self._emitted.append(self._current)
+
+    def consumed(self) -> None:
+        if self._emitted:
+            self._current = self._emitted.popleft()
+        self.rendering()
+
+    def rendering(self) -> None:
+        if self._current is not None:
+            self._rendering.append(self._current)
+            self._current = None
+
+    def repainted(self) -> None:
+        now, histogram = time.perf_counter_ns(), self.histograms["repaint"]
+        for started in self._rendering:
+            histogram.record(now - started)
+        self._rendering.clear()
+
+    def summary(self) -> Iterator[Tuple[str, int, int, int, int]]:
+        for stage, h in self.histograms.items():
+            yield stage, h.count, h.percentile(50), h.percentile(99), h.max
+
+    def report(self) -> str:
+        lines = [f"{'stage':>8} {'count':>8} {'p50, us':>10} {'p99, us':>10} {'max, us':>10}"]
+        for stage, count, p50, p99, max_ in self.summary():
+            lines.append(f"{stage:>8} {count:>8} {p50 / 1000:>10.1f} {p99 / 1000:>10.1f} {max_ / 1000:>10.1f}")
+        return "\n".join(lines)
+
+    histograms: Dict[str, LatencyHistogram] = attr.ib(factory=lambda: {s: LatencyHistogram() for s in
+                                                                       LatencyTracer.STAGES})
+    _emitted: Deque[Optional[int]] = attr.ib(factory=deque)
+    _rendering: List[int] = attr.ib(factory=list)
+    _current: Optional[int] = None
+    _qt_offset: Optional[int] = None
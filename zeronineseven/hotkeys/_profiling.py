@@ -0,0 +1,118 @@
+import asyncio
+import contextlib
+import logging
+import threading
+import time
+import weakref
+from typing import Callable, Dict, Iterator
+
+import attr
+
+from ._latency import LatencyHistogram
+
+__all__ = "LoopProfiler",
+
+_log = logging.getLogger("zeronineseven.hotkeys")
+
+# NOTE(zeronineseven): Handles are plain Python objects shared by every loop in the process, so timing them means
+#                      patching `Handle._run` for all of them. The patch only times handles of loops registered
+#                      here and is lifted again once the last one is uninstalled or garbage collected.
+_run = asyncio.Handle._run
+_profiled: Dict[int, "LoopProfiler"] = {}
+_profiled_lock = threading.Lock()
+
+
+def _timed_run(handle: asyncio.Handle) -> None:
+    profiler = _profiled.get(id(handle._loop))
+    if profiler is None:
+        return _run(handle)
+    started = time.perf_counter()
+    _run(handle)
+    took = time.perf_counter() - started
+    if took >= profiler.slow_callback:
+        profiler.slow_callbacks += 1
+        _log.warning("Slow callback: %s took %.1fms", _describe(handle), took * 1000)
+
+
+def _profile(loop_id: int, profiler: "LoopProfiler") -> None:
+    with _profiled_lock:
+        if loop_id in _profiled:
+            raise RuntimeError("The loop is already being profiled")
+        _profiled[loop_id] = profiler
+        asyncio.Handle._run = _timed_run
+
+
+def _unprofile(loop_id: int) -> None:
+    with _profiled_lock:
+        del _profiled[loop_id]
+        if not _profiled:
+            asyncio.Handle._run = _run
+
+
+def _describe(handle: asyncio.Handle) -> str:
+    # NOTE(zeronineseven): Task steps are scheduled as callbacks bound to the task, which is what's worth naming.
+    task = getattr(handle._callback, "__self__", None)
+    if isinstance(task, asyncio.Task):
+        coro = task.get_coro()
+        frame = getattr(coro, "cr_frame", None)
+        where = f" at {frame.f_code.co_filename}:{frame.f_lineno}" if frame is not None else ""
+        return f"task {task.get_name()!r} running {getattr(coro, '__qualname__', coro)!r}{where}"
+    return repr(handle)
+
+
+@attr.mutable
+class LoopProfiler:
+    # NOTE(zeronineseven): Profiling mode only. The lag sampler schedules itself every `interval` and records how
+    #                      late it fired, which is exactly how late any other callback would have been. Callbacks
+    #                      running longer than `slow_callback` are logged along with the coroutine behind them
+    #                      without paying for asyncio's whole debug mode. Watched queue depths are sampled on
+    #                      every tick.
+    @contextlib.contextmanager
+    def installed(self, loop: asyncio.AbstractEventLoop) -> Iterator["LoopProfiler"]:
+        previous_factory = loop.get_task_factory()
+
+        def task_factory(loop_, coro, **kwargs):
+            self.tasks_created += 1
+            if previous_factory is not None:
+                return previous_factory(loop_, coro, **kwargs)
+            return asyncio.Task(coro, loop=loop_, **kwargs)
+
+        expected_at = loop.time() + self.interval
+
+        def tick() -> None:
+            nonlocal expected_at, handle
+            now = loop.time()
+            self.lag.record(max(0, int((now - expected_at) * 1e9)))
+            for name, depth in self._watched.items():
+                self.depths[name] = max(self.depths.get(name, 0), depth())
+            expected_at = now + self.interval
+            handle = loop.call_later(self.interval, tick)
+
+        _profile(id(loop), self)
+        unprofile = weakref.finalize(loop, _unprofile, id(loop))
+        loop.set_task_factory(task_factory)
+        handle = loop.call_later(self.interval, tick)
+        try:
+            yield self
+        finally:
+            handle.cancel()
+            unprofile()
+            loop.set_task_factory(previous_factory)
+
+    def watch(self, name: str, depth: Callable[[], int]) -> None:
+        self._watched[name] = depth
+
+    def report(self) -> str:
+        lines = [f"loop lag: {self.lag.count} samples, p50 {self.lag.percentile(50) / 1e6:.1f}ms, "
+                 f"p99 {self.lag.percentile(99) / 1e6:.1f}ms, max {self.lag.max / 1e6:.1f}ms",
+                 f"slow callbacks: {self.slow_callbacks}, tasks created: {self.tasks_created}"]
+        lines.extend(f"max {name} queue depth: {depth}" for name, depth in sorted(self.depths.items()))
+        return "\n".join(lines)
+
+    interval: float = 0.05
+    slow_callback: float = 0.05
+    lag: LatencyHistogram = attr.ib(factory=LatencyHistogram)
+    slow_callbacks: int = 0
+    tasks_created: int = 0
+    depths: Dict[str, int] = attr.ib(factory=dict)
+    _watched: Dict[str, Callable[[], int]] = attr.ib(factory=dict, init=False)
@@ -0,0 +1,86 @@
+import functools
+from typing import Mapping, Optional
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QGuiApplication, QKeyEvent
+
+from ._common import Key, KEYS_BY_ID, SIDED_TO_GENERIC
+
+__all__ = "QtKeyTranslator", "SIDED_TO_GENERIC"
+
+
+def _interned(k: str) -> Key:
+    return KEYS_BY_ID[KEYS_BY_ID.index(k)]
+
+
+_QT_KEYS: Mapping[int, Key] = {qt_key: _interned(k) for qt_key, k in {
+    Qt.Key_Escape: "esc",
+    Qt.Key_Enter: "enter",
+    Qt.Key_Return: "enter",
+    Qt.Key_Control: "ctrl",
+    Qt.Key_Alt: "alt",
+    Qt.Key_AltGr: "alt",
+    Qt.Key_Shift: "shift",
+    Qt.Key_Insert: "insert",
+    Qt.Key_Down: "down",
+    Qt.Key_Up: "up",
+    Qt.Key_Left: "left",
+    Qt.Key_Right: "right",
+    Qt.Key_Tab: "tab",
+    Qt.Key_Backtab: "tab",
+    Qt.Key_Space: "space",
+    Qt.Key_Backslash: "\\",
+    Qt.Key_BraceRight: "}",
+    Qt.Key_BraceLeft: "{",
+    Qt.Key_BracketRight: "]",
+    Qt.Key_BracketLeft: "[",
+    **{getattr(Qt, f"Key_{d}"): d for d in "0123456789"},
+    **{getattr(Qt, f"Key_F{n}"): f"f{n}" for n in range(1, 13)},
+    **{getattr(Qt, f"Key_{c.upper()}"): c for c in "abcdefghijklmnopqrstuvwxyz"},
+}.items()}
+
+_KEYS_BY_TEXT: Mapping[str, Key] = {k: k for k in KEYS_BY_ID}
+
+# NOTE(zeronineseven): Qt reports left and right modifiers with the very same `event.key()`, so the side has to be
+#                      recovered from native codes, which are platform specific:
+#                      * xcb/wayland: X11 keycodes (evdev codes + 8) in `nativeScanCode()`;
+#                      * windows: set 1 scan codes with the extended bit at 0x100 in `nativeScanCode()`;
+#                      * cocoa: virtual key codes in `nativeVirtualKey()`.
+_X11_SCAN_CODES: Mapping[int, Key] = {50: "lshift", 62: "rshift", 37: "lctrl", 105: "rctrl", 64: "lalt", 108: "ralt",
+                                      92: "ralt"}
+_NATIVE_SIDED_KEYS: Mapping[str, Mapping[str, Mapping[int, Key]]] = {
+    "xcb": {"nativeScanCode": _X11_SCAN_CODES},
+    "wayland": {"nativeScanCode": _X11_SCAN_CODES},
+    "windows": {"nativeScanCode": {0x2A: "lshift", 0x36: "rshift", 0x1D: "lctrl", 0x11D: "rctrl", 0x38: "lalt",
+                                   0x138: "ralt"}},
+    "cocoa": {"nativeVirtualKey": {0x38: "lshift", 0x3C: "rshift", 0x3B: "lctrl", 0x3E: "rctrl", 0x3A: "lalt",
+                                   0x3D: "ralt"}},
+}
+
+
+class QtKeyTranslator:
+    def __init__(self, platform_name: Optional[str] = None):
+        self.__platform_name = platform_name
+        self.__qt_keys = _QT_KEYS.get
+
+    def key(self, event: QKeyEvent) -> Optional[Key]:
+        key = self.__qt_keys(event.key())
+        if key is not None:
+            return key
+        # NOTE(zeronineseven): Keys missing from the table are rare, only they pay for allocating the text. Whatever
+        #                      text isn't a key of the trainer, e.g. of another layout, is reported as no key at all.
+        return _KEYS_BY_TEXT.get(event.text().lower())
+
+    def sided_key(self, event: QKeyEvent) -> Optional[Key]:
+        key = self.key(event)
+        if key in ("shift", "ctrl", "alt"):
+            native_code, sided_keys = self._native_sided_keys
+            return sided_keys.get(getattr(event, native_code)(), key)
+        return key
+
+    @functools.cached_property
+    def _native_sided_keys(self):
+        platform_name = self.__platform_name or QGuiApplication.platformName()
+        for native_code, sided_keys in _NATIVE_SIDED_KEYS.get(platform_name, {}).items():
+            return native_code, {code: _interned(k) for code, k in sided_keys.items()}
+        return "nativeScanCode", {}
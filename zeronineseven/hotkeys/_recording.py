@@ -0,0 +1,156 @@
+import enum
+import hashlib
+import mmap
+import os
+import struct
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Iterator, NamedTuple, Optional, Union
+
+from ._common import Motion, NormalizedAction, motion_from_id, motion_to_id, serialize_motions_to_str
+
+__all__ = "action_fingerprint", "Record", "RecordKind", "SessionLog", "SessionRecorder"
+
+_MAGIC = b"ZNSHKREC"
+_VERSION = 2
+# NOTE(zeronineseven): Header is exactly one record wide, so that records stay aligned within the file.
+_HEADER = struct.Struct("<8sHH12x")
+# NOTE(zeronineseven): Timestamp (ns), kind, motion id, reserved, payload: action fingerprint for actions and
+#                      outcomes, wall clock seconds for session starts. The payload is 8 byte aligned.
+_RECORD = struct.Struct("<QBBH4xq")
+assert _HEADER.size == _RECORD.size
+
+
+@enum.unique
+class RecordKind(enum.IntEnum):
+    SESSION = 0
+    EXPECTED = 1
+    MOTION = 2
+    MATCHED = 3
+    MISMATCHED = 4
+
+
+class Record(NamedTuple):
+    timestamp_ns: int
+    kind: RecordKind
+    motion: Optional[Motion]
+    payload: int
+
+
+def action_fingerprint(action: NormalizedAction) -> int:
+    # NOTE(zeronineseven): 64 bits keep collisions out of reach even for merged decks of millions of bindings.
+    #                      Signed, so that it fits SQLite's INTEGER as is.
+    return int.from_bytes(hashlib.blake2b(_fingerprinted(action), digest_size=8).digest(), "little", signed=True)
+
+
+def _legacy_action_fingerprint(action: NormalizedAction) -> int:
+    # NOTE(zeronineseven): What `action_fingerprint` used to be, only to carry over state keyed by it.
+    return zlib.crc32(_fingerprinted(action))
+
+
+def _fingerprinted(action: NormalizedAction) -> bytes:
+    return "\0".join((*action.context, serialize_motions_to_str(action.combo), action.description)).encode("utf-8")
+
+
+class SessionRecorder:
+    def __init__(self, path: Union[str, os.PathLike], buffer_size: int = 64 * 1024):
+        self.__file: BinaryIO = open(path, "ab", buffering=0)
+        self.__buffer = bytearray()
+        self.__buffer_size = buffer_size
+        # NOTE(zeronineseven): The only thread ever touching the file, so that chunks are written in order and
+        #                      callers never wait for the disk.
+        self.__writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session-recorder")
+        if self.__file.tell() == 0:
+            self.__buffer += _HEADER.pack(_MAGIC, _VERSION, _RECORD.size)
+        self.__append(RecordKind.SESSION, 0, int(time.time()))
+
+    def expected(self, action: NormalizedAction) -> None:
+        self.__append(RecordKind.EXPECTED, 0, action_fingerprint(action))
+
+    def motion(self, m: Motion) -> None:
+        try:
+            motion_id = motion_to_id(m)
+        except KeyError:
+            # NOTE(zeronineseven): Keys outside of `Key` have no id to be recorded with, and a recording is never
+            #                      worth stopping the trainer for.
+            return
+        self.__append(RecordKind.MOTION, motion_id, 0)
+
+    def matched(self, action: NormalizedAction) -> None:
+        self.__append(RecordKind.MATCHED, 0, action_fingerprint(action))
+
+    def mismatched(self, action: NormalizedAction) -> None:
+        self.__append(RecordKind.MISMATCHED, 0, action_fingerprint(action))
+
+    def flush(self) -> None:
+        if self.__buffer:
+            chunk, self.__buffer = bytes(self.__buffer), bytearray()
+            self.__writer.submit(self.__file.write, chunk)
+
+    def close(self) -> None:
+        self.flush()
+        self.__writer.shutdown(wait=True)
+        self.__file.close()
+
+    def __enter__(self) -> "SessionRecorder":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def __append(self, kind: RecordKind, motion_id: int, payload: int) -> None:
+        self.__buffer += _RECORD.pack(time.monotonic_ns(), kind, motion_id, 0, payload)
+        if len(self.__buffer) >= self.__buffer_size:
+            self.flush()
+
+
+class SessionLog:
+    def __init__(self, path: Union[str, os.PathLike]):
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            self.__mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        if size:
+            magic, version, record_size = _HEADER.unpack_from(self.__mmap)
+            if magic != _MAGIC or version != _VERSION or record_size != _RECORD.size:
+                raise ValueError(f"'{path}' is not a session recording")
+        # NOTE(zeronineseven): A partially written trailing record (e.g. after a crash) is ignored.
+        self.__len = max(0, size // _RECORD.size - 1)
+
+    def __len__(self) -> int:
+        return self.__len
+
+    def __getitem__(self, index: int) -> Record:
+        if index < 0:
+            index += self.__len
+        if not 0 <= index < self.__len:
+            raise IndexError("record index out of range")
+        return self.__to_record(*_RECORD.unpack_from(self.__mmap, (index + 1) * _RECORD.size))
+
+    def __iter__(self) -> Iterator[Record]:
+        to_record = self.__to_record
+        for fields in _RECORD.iter_unpack(self.raw()):
+            yield to_record(*fields)
+
+    def raw(self) -> memoryview:
+        return memoryview(self.__mmap)[_RECORD.size:(self.__len + 1) * _RECORD.size]
+
+    def motions(self) -> Iterator[Motion]:
+        for _, kind, motion_id, _, _ in _RECORD.iter_unpack(self.raw()):
+            if kind == RecordKind.MOTION:
+                yield motion_from_id(motion_id)
+
+    def close(self) -> None:
+        if isinstance(self.__mmap, mmap.mmap):
+            self.__mmap.close()
+
+    def __enter__(self) -> "SessionLog":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    @staticmethod
+    def __to_record(timestamp_ns: int, kind: int, motion_id: int, _: int, payload: int) -> Record:
+        kind = RecordKind(kind)
+        return Record(timestamp_ns, kind, motion_from_id(motion_id) if kind is RecordKind.MOTION else None, payload)
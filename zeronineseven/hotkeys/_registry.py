@@ -0,0 +1,57 @@
+import sys
+from typing import Dict, Iterator, List, Tuple
+
+from ._common import Motions, NormalizedAction, parse_key_combo_dsl
+
+__all__ = "ControlsRegistry",
+
+# NOTE(zeronineseven): Shared by all the registries, so that the same combo is parsed once per process even when
+#                      it is bound in several decks.
+_parsed_combos: Dict[str, Motions] = {}
+
+
+class ControlsRegistry:
+    # NOTE(zeronineseven): Every unique (combo, description) binding is parsed and stored once and merely linked to
+    #                      every context it is registered in, so splatting shared tuples of controls into many modes
+    #                      costs one link per mode instead of one more parsed action.
+    def __init__(self):
+        self.__bindings: Dict[Tuple[str, str], int] = {}
+        self.__combos: List[Motions] = []
+        self.__descriptions: List[str] = []
+        self.__binding_contexts: List[Dict[Tuple[str, ...], None]] = []
+        self.__links: List[Tuple[Tuple[str, ...], int]] = []
+
+    def add(self, context: Tuple[str, ...], combo: str, description: str) -> NormalizedAction:
+        try:
+            binding = self.__bindings[combo, description]
+        except KeyError:
+            try:
+                motions = _parsed_combos[combo]
+            except KeyError:
+                motions = _parsed_combos[combo] = parse_key_combo_dsl(combo)
+            binding = self.__bindings[combo, description] = len(self.__combos)
+            self.__combos.append(motions)
+            self.__descriptions.append(sys.intern(description))
+            self.__binding_contexts.append({})
+        self.__binding_contexts[binding][context] = None
+        self.__links.append((context, binding))
+        return NormalizedAction(context, self.__combos[binding], self.__descriptions[binding])
+
+    def __len__(self) -> int:
+        return len(self.__links)
+
+    def __iter__(self) -> Iterator[NormalizedAction]:
+        combos, descriptions = self.__combos, self.__descriptions
+        for context, binding in self.__links:
+            yield NormalizedAction(context, combos[binding], descriptions[binding])
+
+    def bindings(self) -> Iterator[Tuple[Motions, str]]:
+        return zip(self.__combos, self.__descriptions)
+
+    def contexts(self, combo: str, description: str) -> Tuple[Tuple[str, ...], ...]:
+        binding = self.__bindings.get((combo, description))
+        return tuple(self.__binding_contexts[binding]) if binding is not None else ()
+
+    @property
+    def dedup_ratio(self) -> float:
+        return len(self.__links) / len(self.__combos) if self.__combos else 1.0
@@ -0,0 +1,185 @@
+import asyncio
+import contextlib
+import ctypes
+import ctypes.util
+import logging
+import os
+import struct
+import sys
+from typing import Callable, Dict, Iterable, Iterator, Mapping, Optional, Sequence, Tuple
+
+import attr
+
+from ._common import NormalizedAction
+from ._decks import deck_source, load_deck, reload_deck
+from ._dispatch import Dispatcher
+
+__all__ = "DeckDiff", "DeckReloader", "DeckWatcher", "diff_decks"
+
+_log = logging.getLogger("zeronineseven.hotkeys")
+
+_IN_MODIFY, _IN_CLOSE_WRITE, _IN_MOVED_TO, _IN_CREATE = 0x2, 0x8, 0x80, 0x100
+_IN_NONBLOCK, _IN_CLOEXEC = os.O_NONBLOCK, getattr(os, "O_CLOEXEC", 0)
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+
+@attr.frozen
+class DeckDiff:
+    added: Tuple[NormalizedAction, ...]
+    removed: Tuple[NormalizedAction, ...]
+    # NOTE(zeronineseven): Bindings with the same context and description, but a new combo. They are part of both
+    #                      `added` and `removed` as well.
+    changed: Mapping[NormalizedAction, NormalizedAction]
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed)
+
+
+def diff_decks(old: Iterable[NormalizedAction], new: Iterable[NormalizedAction]) -> DeckDiff:
+    old, new = tuple(old), tuple(new)
+    old_set, new_set = frozenset(old), frozenset(new)
+    added = tuple(a for a in new if a not in old_set)
+    removed = tuple(a for a in old if a not in new_set)
+    renamed = {(a.context, a.description): a for a in added}
+    changed = {a: renamed[(a.context, a.description)] for a in removed if (a.context, a.description) in renamed}
+    return DeckDiff(added, removed, changed)
+
+
+def _inotify() -> Optional[ctypes.CDLL]:
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1, libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+@attr.mutable
+class DeckWatcher:
+    # NOTE(zeronineseven): Watches the directories rather than the files, because editors tend to save by writing a
+    #                      new file and renaming it over the old one. Bursts of events are debounced per file. Without
+    #                      inotify the files' mtimes are polled instead.
+    @contextlib.contextmanager
+    def watching(self, on_change: Callable[[str], object]) -> Iterator[None]:
+        loop = asyncio.get_running_loop()
+        pending: Dict[str, asyncio.TimerHandle] = {}
+        names = {os.path.abspath(path): name for name, path in self.paths.items()}
+
+        def changed(path: str) -> None:
+            name = names.get(path)
+            if name is None:
+                return
+            if name in pending:
+                pending[name].cancel()
+
+            def settled() -> None:
+                del pending[name]
+                on_change(name)
+
+            pending[name] = loop.call_later(self.debounce, settled)
+
+        libc = _inotify() if self.use_inotify else None
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC) if libc is not None else -1
+        try:
+            if fd >= 0:
+                self.backend = "inotify"
+                directories = {}
+                for path in names:
+                    wd = libc.inotify_add_watch(fd, os.fsencode(os.path.dirname(path)),
+                                                _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE | _IN_MODIFY)
+                    if wd < 0:
+                        raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+                    directories[wd] = os.path.dirname(path)
+
+                def on_readable() -> None:
+                    try:
+                        data = os.read(fd, 64 * 1024)
+                    except BlockingIOError:
+                        return
+                    offset = 0
+                    while offset < len(data):
+                        wd, _, _, length = _INOTIFY_EVENT.unpack_from(data, offset)
+                        name = data[offset + _INOTIFY_EVENT.size:offset + _INOTIFY_EVENT.size + length].rstrip(b"\0")
+                        offset += _INOTIFY_EVENT.size + length
+                        if wd in directories:
+                            changed(os.path.join(directories[wd], os.fsdecode(name)))
+
+                loop.add_reader(fd, on_readable)
+                try:
+                    yield
+                finally:
+                    loop.remove_reader(fd)
+            else:
+                self.backend = "polling"
+                yield from self.__polling(loop, names, changed)
+        finally:
+            if fd >= 0:
+                os.close(fd)
+            for handle in pending.values():
+                handle.cancel()
+
+    def __polling(self, loop: asyncio.AbstractEventLoop, names: Mapping[str, str],
+                  changed: Callable[[str], None]) -> Iterator[None]:
+        def stat(path: str) -> Optional[Tuple[int, int]]:
+            try:
+                st = os.stat(path)
+            except OSError:
+                return None
+            return st.st_mtime_ns, st.st_size
+
+        stats = {path: stat(path) for path in names}
+
+        def poll() -> None:
+            nonlocal handle
+            for path, last in stats.items():
+                current = stat(path)
+                if current != last:
+                    stats[path] = current
+                    changed(path)
+            handle = loop.call_later(self.poll_interval, poll)
+
+        handle = loop.call_later(self.poll_interval, poll)
+        try:
+            yield
+        finally:
+            handle.cancel()
+
+    paths: Mapping[str, str]
+    debounce: float = 0.1
+    poll_interval: float = 1.0
+    use_inotify: bool = True
+    backend: Optional[str] = None
+
+
+@attr.mutable
+class DeckReloader:
+    # NOTE(zeronineseven): Keeps the last good version of every deck. A deck which fails to load is reported and
+    #                      otherwise ignored until it gets fixed. Diffs are published through `changes`.
+    def __init__(self, names: Iterable[str]):
+        self.__attrs_init__({name: load_deck(name) for name in names})
+
+    @property
+    def actions(self) -> Tuple[NormalizedAction, ...]:
+        return tuple(a for deck in self.decks.values() for a in deck)
+
+    def watcher(self, **kwargs) -> DeckWatcher:
+        return DeckWatcher({name: path for name in self.decks if (path := deck_source(name)) is not None}, **kwargs)
+
+    def reload(self, name: str) -> Optional[DeckDiff]:
+        try:
+            new = reload_deck(name)
+        except Exception:
+            _log.exception("Failed to reload deck %r, keeping the previous version", name)
+            return None
+        diff = diff_decks(self.decks[name], new)
+        self.decks[name] = new
+        if diff:
+            _log.info("Reloaded deck %r: %d added, %d removed, %d changed", name, len(diff.added),
+                      len(diff.removed), len(diff.changed))
+            self.changes.publish(diff)
+        return diff
+
+    decks: Dict[str, Sequence[NormalizedAction]]
+    changes: Dispatcher = attr.ib(factory=Dispatcher)
@@ -0,0 +1,53 @@
+import asyncio
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import attr
+
+__all__ = "RenderScheduler",
+
+
+@attr.mutable
+class RenderScheduler:
+    def __init__(self, frame_interval: float = 1 / 60, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.__attrs_init__(frame_interval, loop or asyncio.get_event_loop())
+
+    def set(self, setter: Callable[..., Any], *args) -> None:
+        self._schedule(setter, None, args)
+
+    def set_lazy(self, setter: Callable[[Any], Any], fn: Callable[..., Any], *args) -> None:
+        # NOTE(zeronineseven): `fn` is evaluated only once per frame, right before the flush, so that
+        #                      expensive values are never computed for renders that get coalesced.
+        self._schedule(setter, fn, args)
+
+    def flush(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        pending, self._pending = self._pending, {}
+        for setter, (fn, args) in pending.items():
+            if fn is None:
+                setter(*args)
+            else:
+                setter(fn(*args))
+        self.renders += len(pending)
+        if self.on_flush is not None:
+            self.on_flush()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def _schedule(self, setter: Callable[..., Any], fn: Optional[Callable[..., Any]], args: Tuple) -> None:
+        if setter in self._pending:
+            self.coalesced += 1
+        self._pending[setter] = fn, args
+        if self._handle is None:
+            self._handle = self._loop.call_later(self.frame_interval, self.flush)
+
+    frame_interval: float
+    _loop: asyncio.AbstractEventLoop
+    _pending: Dict[Callable[..., Any], Tuple[Optional[Callable[..., Any]], Tuple]] = attr.ib(factory=dict)
+    _handle: Optional[asyncio.TimerHandle] = None
+    renders: int = 0
+    coalesced: int = 0
+    on_flush: Optional[Callable[[], Any]] = None
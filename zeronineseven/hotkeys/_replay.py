@@ -0,0 +1,76 @@
+import random
+import time
+from typing import Iterable, List, Sequence, Tuple
+
+import attr
+
+from ._common import KEYS_BY_ID, Motion, Motions, Press, Release, NormalizedAction, motion_from_id, motion_to_id
+from ._engine import ComboEngine, Matched, Mismatched, ReadyForNextCombo
+
+__all__ = "ReplayStats", "replay", "synthesize_attempt", "synthesize_session"
+
+
+@attr.frozen
+class ReplayStats:
+    motions: int
+    combos: int
+    matched: int
+    mismatched: int
+    seconds: float
+
+    @property
+    def motions_per_second(self) -> float:
+        return self.motions / self.seconds if self.seconds else float("inf")
+
+
+def synthesize_session(actions: Sequence[NormalizedAction], combos: int, error_rate: float = 0.05,
+                       seed: int = 0) -> Tuple[Tuple[Motions, ...], List[Motion]]:
+    # NOTE(zeronineseven): Simulates a typist who gets a combo wrong with `error_rate` probability by pressing a
+    #                      random key which is not held at the moment, and who releases everything held afterwards.
+    rnd = random.Random(seed)
+    schedule = tuple(rnd.choice(actions).combo for _ in range(combos))
+    motions: List[Motion] = []
+    for combo in schedule:
+        motions.extend(synthesize_attempt(combo, rnd, error_rate))
+    return schedule, motions
+
+
+def synthesize_attempt(combo: Motions, rnd: random.Random, error_rate: float = 0.05) -> List[Motion]:
+    motions: List[Motion] = []
+    held = {}
+    mistake_at = rnd.randrange(len(combo)) if combo and rnd.random() < error_rate else -1
+    for n, m in enumerate(combo):
+        if n == mistake_at:
+            m = motion_from_id(2 * KEYS_BY_ID.index(rnd.choice([k for k in KEYS_BY_ID if k not in held])))
+        motions.append(m)
+        if type(m) is Press:
+            held[m.key] = None
+        else:
+            held.pop(m.key, None)
+        if n == mistake_at:
+            break
+    motions.extend(motion_from_id(motion_to_id(Release(k))) for k in reversed(held))
+    return motions
+
+
+def replay(schedule: Iterable[Motions], motions: Iterable[Motion]) -> ReplayStats:
+    combos, counts = iter(schedule), {Matched: 0, Mismatched: 0}
+
+    def on_event(event) -> None:
+        t = type(event)
+        if t is Matched or t is Mismatched:
+            counts[t] += 1
+        elif event is ReadyForNextCombo:
+            for combo in combos:
+                engine.expect(combo)
+                break
+
+    engine = ComboEngine(on_event)
+    on_event(ReadyForNextCombo)
+    started, fed = time.perf_counter(), 0
+    feed = engine.feed
+    for m in motions:
+        feed(m)
+        fed += 1
+    return ReplayStats(fed, counts[Matched] + counts[Mismatched], counts[Matched], counts[Mismatched],
+                       time.perf_counter() - started)
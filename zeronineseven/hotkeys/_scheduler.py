@@ -0,0 +1,159 @@
+import heapq
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, TextIO, Tuple, Union
+
+import attr
+
+from ._common import NormalizedAction
+from ._recording import _legacy_action_fingerprint, action_fingerprint
+
+__all__ = "Card", "SpacedRepetitionScheduler"
+
+_DAY = 24 * 60 * 60
+
+
+@attr.mutable
+class Card:
+    due: float = 0.0
+    ease: float = 2.5
+    interval: float = 0.0
+    repetitions: int = 0
+
+    def reviewed(self, matched: bool, now: float, relearn_interval: float) -> None:
+        # NOTE(zeronineseven): SM-2 with only two grades available: a match is a perfect recall (5) and a mismatch
+        #                      is a complete blackout (1). A mismatched card is relearned after `relearn_interval`.
+        quality = 5 if matched else 1
+        self.ease = max(1.3, self.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+        if matched:
+            self.interval = _DAY if self.repetitions == 0 else 6 * _DAY if self.repetitions == 1 \
+                else self.interval * self.ease
+            self.repetitions += 1
+        else:
+            self.interval = relearn_interval
+            self.repetitions = 0
+        self.due = now + self.interval
+
+
+class SpacedRepetitionScheduler:
+    def __init__(self, actions: Iterable[NormalizedAction], journal: Optional[Union[str, os.PathLike]] = None,
+                 clock: Callable[[], float] = time.time, relearn_interval: float = 60.0, seed: Optional[int] = None):
+        self.__actions: Dict[int, NormalizedAction] = {action_fingerprint(a): a for a in actions}
+        self.__cards: Dict[int, Card] = {f: Card() for f in self.__actions}
+        self.__clock = clock
+        self.__relearn_interval = relearn_interval
+        self.__journal: Optional[TextIO] = None
+        self.__writer: Optional[ThreadPoolExecutor] = None
+        if journal is not None:
+            self.__load(journal)
+            self.__journal = open(journal, "a", encoding="utf-8")
+            # NOTE(zeronineseven): Reviews happen right on the keystroke path, so the disk is left to this thread.
+            self.__writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="schedule-journal")
+        # NOTE(zeronineseven): Heap entries are never updated in place. A card reviewed again simply gets a new entry
+        #                      and the outdated one is skipped once it surfaces, which keeps every operation O(log n).
+        #                      Mismatched cards go to their own heap, so that they jump the queue once due.
+        rnd = random.Random(seed)
+        self.__heap: List[Tuple[float, float, int]] = [(c.due, rnd.random(), f) for f, c in self.__cards.items()]
+        heapq.heapify(self.__heap)
+        self.__relearn: List[Tuple[float, float, int]] = []
+        self.__rnd = rnd
+
+    def __len__(self) -> int:
+        return len(self.__cards)
+
+    def next(self) -> Optional[NormalizedAction]:
+        heap, relearn = self.__drop_outdated(self.__heap), self.__drop_outdated(self.__relearn)
+        if relearn and (not heap or relearn[0][0] <= max(heap[0][0], self.__clock())):
+            heap = relearn
+        elif not heap:
+            return None
+        return self.__actions[heapq.heappop(heap)[2]]
+
+    def review(self, action: NormalizedAction, matched: bool) -> Card:
+        fingerprint = action_fingerprint(action)
+        card = self.__cards[fingerprint]
+        card.reviewed(matched, self.__clock(), self.__relearn_interval)
+        heapq.heappush(self.__heap if matched else self.__relearn, (card.due, self.__rnd.random(), fingerprint))
+        if self.__writer is not None:
+            self.__writer.submit(self.__write, f"{fingerprint} {card.due!r} {card.ease!r} {card.interval!r} "
+                                               f"{card.repetitions}\n")
+        return card
+
+    def update(self, added: Iterable[NormalizedAction], removed: Iterable[NormalizedAction]) -> None:
+        # NOTE(zeronineseven): Heap entries of removed cards are left behind and skipped once popped, just like the
+        #                      outdated ones.
+        for action in removed:
+            fingerprint = action_fingerprint(action)
+            self.__actions.pop(fingerprint, None)
+            self.__cards.pop(fingerprint, None)
+        for action in added:
+            fingerprint = action_fingerprint(action)
+            if fingerprint not in self.__cards:
+                self.__actions[fingerprint] = action
+                card = self.__cards[fingerprint] = Card()
+                heapq.heappush(self.__heap, (card.due, self.__rnd.random(), fingerprint))
+
+    def card(self, action: NormalizedAction) -> Card:
+        return self.__cards[action_fingerprint(action)]
+
+    def close(self) -> None:
+        if self.__writer is not None:
+            self.__writer.shutdown(wait=True)
+            self.__writer = None
+        if self.__journal is not None:
+            self.__journal.close()
+            self.__journal = None
+
+    def __enter__(self) -> "SpacedRepetitionScheduler":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def __drop_outdated(self, heap: List[Tuple[float, float, int]]) -> List[Tuple[float, float, int]]:
+        cards = self.__cards
+        while heap:
+            due, _, fingerprint = heap[0]
+            card = cards.get(fingerprint)
+            if card is not None and card.due == due:
+                break
+            heapq.heappop(heap)
+        return heap
+
+    def __write(self, line: str) -> None:
+        self.__journal.write(line)
+        self.__journal.flush()
+
+    def __load(self, journal: Union[str, os.PathLike]) -> None:
+        # NOTE(zeronineseven): The journal is append-only, the last line about a card wins. It gets compacted on load
+        #                      once outdated lines start to dominate, so that reviews only ever append one line. Cards
+        #                      of other decks share the journal, their last lines are carried over as they are.
+        # NOTE(zeronineseven): Lines keyed by the former 32 bit fingerprints are migrated to the current ones.
+        legacy = {_legacy_action_fingerprint(a): f for f, a in self.__actions.items()}
+        lines, known, unknown = 0, set(), {}
+        try:
+            with open(journal, encoding="utf-8") as f:
+                for line in f:
+                    lines += 1
+                    fingerprint, due, ease, interval, repetitions = line.split()
+                    fingerprint = int(fingerprint)
+                    fingerprint = fingerprint if fingerprint in self.__cards else legacy.get(fingerprint, fingerprint)
+                    card = self.__cards.get(fingerprint)
+                    if card is not None:
+                        card.due, card.ease, card.interval = float(due), float(ease), float(interval)
+                        card.repetitions = int(repetitions)
+                        known.add(fingerprint)
+                    else:
+                        unknown[fingerprint] = line
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(os.path.abspath(journal)), exist_ok=True)
+            return
+        if lines > 2 * (len(known) + len(unknown)) + 1000:
+            with open(f"{journal}.tmp", "w", encoding="utf-8") as f:
+                f.writelines(unknown.values())
+                for fingerprint in known:
+                    c = self.__cards[fingerprint]
+                    f.write(f"{fingerprint} {c.due!r} {c.ease!r} {c.interval!r} {c.repetitions}\n")
+            os.replace(f"{journal}.tmp", journal)
@@ -0,0 +1,231 @@
+import bisect
+import collections
+import heapq
+import re
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import attr
+
+from ._common import Key, NormalizedAction, get_combo_keys, pretty_print_context
+
+__all__ = "ShortcutIndex", "tokenize"
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+# NOTE(zeronineseven): Prefixes up to this long match the most actions, so their unions are precomputed.
+_SHORT_PREFIX = 2
+_PREFIX_MEMO_SIZE = 1024
+
+
+def tokenize(s: str) -> List[str]:
+    return _TOKEN_RE.findall(s.lower())
+
+
+def _bits(ids: Sequence[int]) -> int:
+    # NOTE(zeronineseven): Or-ing shifted ints one by one would copy the whole bitmap for every id.
+    buffer = bytearray((max(ids, default=-1) >> 3) + 1)
+    for i in ids:
+        buffer[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buffer, "little")
+
+
+_NONZERO_BYTE_RE = re.compile(rb"[^\x00]")
+
+
+def _iter_bits(bits: int) -> Iterator[int]:
+    # NOTE(zeronineseven): Stripping bits off the int one by one would copy the whole bitmap every time, while
+    #                      scanning its bytes skips the empty stretches at C speed.
+    for match in _NONZERO_BYTE_RE.finditer(bits.to_bytes((bits.bit_length() + 7) // 8, "little")):
+        base, byte = match.start() * 8, match.group()[0]
+        while byte:
+            lowest = byte & -byte
+            yield base + lowest.bit_length() - 1
+            byte ^= lowest
+
+
+@attr.frozen
+class _Field:
+    @classmethod
+    def build(cls, tokens_by_id: Iterable[Iterable[str]]) -> "_Field":
+        postings: Dict[str, List[int]] = {}
+        for i, tokens in enumerate(tokens_by_id):
+            for token in tokens:
+                postings.setdefault(token, []).append(i)
+        # NOTE(zeronineseven): Short prefixes are collected from the id lists, merging their bitmaps instead would copy
+        #                      a whole bitmap for every token.
+        short: Dict[str, List[int]] = {}
+        for token, ids in postings.items():
+            for n in range(1, min(len(token), _SHORT_PREFIX) + 1):
+                short.setdefault(token[:n], []).extend(ids)
+        vocabulary = sorted(postings)
+        return cls({t: _bits(postings[t]) for t in vocabulary}, vocabulary, {p: _bits(ids) for p, ids in short.items()},
+                   collections.OrderedDict())
+
+    def add(self, i: int, tokens: Iterable[str]) -> None:
+        bit = 1 << i
+        for token in tokens:
+            if token not in self._postings:
+                bisect.insort(self._vocabulary, token)
+            self._postings[token] = self._postings.get(token, 0) | bit
+            for n in range(1, min(len(token), _SHORT_PREFIX) + 1):
+                self._short_prefixes[token[:n]] = self._short_prefixes.get(token[:n], 0) | bit
+        self._prefixes.clear()
+
+    def discard(self, i: int, tokens: Iterable[str]) -> None:
+        # NOTE(zeronineseven): Words of one action may repeat and share their short prefixes, each is cleared once.
+        mask, tokens = ~(1 << i), set(tokens)
+        for token in tokens:
+            self._postings[token] &= mask
+            if not self._postings[token]:
+                del self._postings[token]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, token)]
+        for prefix in {token[:n] for token in tokens for n in range(1, min(len(token), _SHORT_PREFIX) + 1)}:
+            self._short_prefixes[prefix] &= mask
+            if not self._short_prefixes[prefix]:
+                del self._short_prefixes[prefix]
+        self._prefixes.clear()
+
+    def exact(self, token: str) -> int:
+        return self._postings.get(token, 0)
+
+    def prefix(self, prefix: str) -> int:
+        if len(prefix) <= _SHORT_PREFIX:
+            return self._short_prefixes.get(prefix, 0)
+        prefixes = self._prefixes
+        try:
+            prefixes.move_to_end(prefix)
+            return prefixes[prefix]
+        except KeyError:
+            pass
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        end = bisect.bisect_left(self._vocabulary, prefix + "\U0010ffff", start)
+        bits = 0
+        for token in self._vocabulary[start:end]:
+            bits |= self._postings[token]
+        prefixes[prefix] = bits
+        if len(prefixes) > _PREFIX_MEMO_SIZE:
+            prefixes.popitem(last=False)
+        return bits
+
+    _postings: Dict[str, int]
+    _vocabulary: List[str]
+    _short_prefixes: Dict[str, int]
+    # NOTE(zeronineseven): Typing a query walks through all of its prefixes, so the recent unions are kept around.
+    _prefixes: "collections.OrderedDict[str, int]"
+
+
+@attr.frozen
+class ShortcutIndex:
+    # NOTE(zeronineseven): Posting lists are bitmaps packed into Python ints, so that intersecting and merging them
+    #                      runs at C speed no matter how many bindings match. Actions are numbered from the shortest
+    #                      description up, which makes bit order the tie-breaking rank within a tier:
+    #                      1. every query word is a description word, the last one may be a prefix;
+    #                      2. every query word starts some description word;
+    #                      3. every query word starts some description or context word.
+    #                      Actions added later get the next free numbers, and are merged into the rank order when
+    #                      read; removed ones just leave their number unused.
+    @classmethod
+    def build(cls, actions: Iterable[NormalizedAction]) -> "ShortcutIndex":
+        ranked = tuple(sorted(actions, key=lambda a: (len(a.description), a.description)))
+        by_keys: Dict[Key, List[int]] = {}
+        by_key_set: Dict[FrozenSet[Key], List[int]] = {}
+        ids_by_action: Dict[NormalizedAction, List[int]] = {}
+        for i, action in enumerate(ranked):
+            keys = get_combo_keys(action.combo)
+            for k in keys:
+                by_keys.setdefault(k, []).append(i)
+            by_key_set.setdefault(keys, []).append(i)
+            ids_by_action.setdefault(action, []).append(i)
+        return cls(list(ranked), ids_by_action, len(ranked),
+                   _Field.build(tokenize(a.description) for a in ranked),
+                   _Field.build(tokenize(pretty_print_context(a.context)) for a in ranked),
+                   {k: _bits(ids) for k, ids in by_keys.items()},
+                   {k: tuple(ranked[i] for i in ids) for k, ids in by_key_set.items()})
+
+    def add(self, action: NormalizedAction) -> None:
+        i = len(self._actions)
+        self._actions.append(action)
+        self._ids.setdefault(action, []).append(i)
+        self._description.add(i, tokenize(action.description))
+        self._context.add(i, tokenize(pretty_print_context(action.context)))
+        keys = get_combo_keys(action.combo)
+        for k in keys:
+            self._by_keys[k] = self._by_keys.get(k, 0) | 1 << i
+        self._by_key_set[keys] = (*self._by_key_set.get(keys, ()), action)
+
+    def discard(self, action: NormalizedAction) -> None:
+        ids = self._ids.get(action)
+        if ids is None:
+            return
+        i = ids.pop()
+        if not ids:
+            del self._ids[action]
+        self._actions[i] = None
+        self._description.discard(i, tokenize(action.description))
+        self._context.discard(i, tokenize(pretty_print_context(action.context)))
+        keys = get_combo_keys(action.combo)
+        for k in keys:
+            self._by_keys[k] &= ~(1 << i)
+            if not self._by_keys[k]:
+                del self._by_keys[k]
+        same_keys = list(self._by_key_set[keys])
+        same_keys.remove(action)
+        if same_keys:
+            self._by_key_set[keys] = tuple(same_keys)
+        else:
+            del self._by_key_set[keys]
+
+    def search(self, query: str, limit: int = 20) -> Tuple[NormalizedAction, ...]:
+        tokens = tokenize(query)
+        if not tokens:
+            return ()
+        *complete, last = tokens
+        description, context = self._description, self._context
+        exact = description.prefix(last)
+        prefix = exact
+        anywhere = exact | context.prefix(last)
+        for token in complete:
+            exact &= description.exact(token)
+            token_prefix = description.prefix(token)
+            prefix &= token_prefix
+            anywhere &= token_prefix | context.prefix(token)
+        results: List[NormalizedAction] = []
+        for tier in (exact, prefix & ~exact, anywhere & ~prefix):
+            for i in self._iter_ranked(tier):
+                if len(results) == limit:
+                    return tuple(results)
+                results.append(self._actions[i])
+        return tuple(results)
+
+    def with_keys(self, keys: Iterable[Key], exact: bool = False) -> Tuple[NormalizedAction, ...]:
+        keys = frozenset(keys)
+        if exact:
+            return self._by_key_set.get(keys, ())
+        bits = -1 if keys else 0
+        for k in keys:
+            bits &= self._by_keys.get(k, 0)
+        return tuple(self._actions[i] for i in self._iter_ranked(bits))
+
+    def _iter_ranked(self, bits: int) -> Iterator[int]:
+        late = bits >> self._ranked
+        if not late:
+            yield from _iter_bits(bits)
+            return
+        late_ids = sorted((self._ranked + i for i in _iter_bits(late)), key=self._rank)
+        yield from heapq.merge(_iter_bits(bits & ((1 << self._ranked) - 1)), late_ids, key=self._rank)
+
+    def _rank(self, i: int) -> Tuple[int, str]:
+        description = self._actions[i].description
+        return len(description), description
+
+    def __len__(self) -> int:
+        return len(self._actions) - self._actions.count(None)
+
+    # NOTE(zeronineseven): Removed actions leave a None behind, so that the numbers of the rest never change.
+    _actions: List[Optional[NormalizedAction]]
+    _ids: Dict[NormalizedAction, List[int]]
+    # NOTE(zeronineseven): Actions numbered below this one were ranked by `build`.
+    _ranked: int
+    _description: _Field
+    _context: _Field
+    _by_keys: Dict[Key, int]
+    _by_key_set: Dict[FrozenSet[Key], Tuple[NormalizedAction, ...]]
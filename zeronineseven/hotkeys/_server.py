@@ -0,0 +1,190 @@
+import asyncio
+import enum
+import random
+import struct
+import zlib
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import attr
+
+from ._common import Motion, NormalizedAction, motion_from_id, motion_to_id
+from ._engine import ComboEngine, Matched, Mismatched, ReadyForNextCombo
+from ._recording import action_fingerprint
+
+__all__ = "EventKind", "Score", "TrainingClient", "TrainingServer", "deck_fingerprint"
+
+# NOTE(zeronineseven): Wire protocol. A client opens with its name terminated by a newline and then streams raw
+#                      motion ids, one byte each. The server answers with fixed size records of a kind and a
+#                      payload: HELLO carries the deck size and DECK its fingerprint, so that the client can check it
+#                      loaded the very same deck; EXPECTED, MATCHED and MISMATCHED carry an index into that deck.
+_RECORD = struct.Struct("<BI")
+_MAX_NAME = 256
+
+
+class EventKind(enum.IntEnum):
+    HELLO = 0
+    DECK = 1
+    EXPECTED = 2
+    MATCHED = 3
+    MISMATCHED = 4
+
+
+def deck_fingerprint(actions: Iterable[NormalizedAction]) -> int:
+    fingerprint = 0
+    for action in actions:
+        fingerprint = zlib.crc32(action_fingerprint(action).to_bytes(8, "little", signed=True), fingerprint)
+    return fingerprint
+
+
+@attr.mutable
+class Score:
+    matched: int = 0
+    mismatched: int = 0
+
+
+class _TraineeProtocol(asyncio.Protocol):
+    def __init__(self, server: "TrainingServer"):
+        self.__server = server
+        self.__engine = ComboEngine(self.__on_event, chords=server.chords)
+        self.__transport: Optional[asyncio.Transport] = None
+        self.__rnd = random.Random(server.seed + server.accepted)
+        self.__name: Optional[bytes] = None
+        self.__handshake = bytearray()
+        self.__current = 0
+        self.__outgoing = bytearray()
+        self.__flush_handle: Optional[asyncio.Handle] = None
+        self.score: Optional[Score] = None
+
+    def connection_made(self, transport: asyncio.Transport) -> None:
+        self.__transport = transport
+        transport.set_write_buffer_limits(high=self.__server.high_water)
+        self.__server.accepted += 1
+        self.__server.connections += 1
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self.__server.connections -= 1
+        if self.__flush_handle is not None:
+            self.__flush_handle.cancel()
+
+    # NOTE(zeronineseven): Backpressure: a client that doesn't read its results doesn't get graded either, so
+    #                      that neither its input nor its output piles up in the server.
+    def pause_writing(self) -> None:
+        self.__server.paused += 1
+        self.__transport.pause_reading()
+
+    def resume_writing(self) -> None:
+        self.__transport.resume_reading()
+
+    def data_received(self, data: bytes) -> None:
+        if self.__name is None:
+            self.__handshake += data
+            name, newline, data = self.__handshake.partition(b"\n")
+            if not newline:
+                if len(self.__handshake) > _MAX_NAME:
+                    self.__transport.close()
+                return
+            self.__name = bytes(name)
+            self.score = self.__server.scores.setdefault(self.__name.decode("utf-8", "replace"), Score())
+            self.__send(EventKind.HELLO, len(self.__server.actions))
+            self.__send(EventKind.DECK, self.__server.fingerprint)
+            self.__on_event(ReadyForNextCombo)
+        feed = self.__engine.feed
+        try:
+            for motion_id in data:
+                feed(motion_from_id(motion_id))
+        except IndexError:
+            self.__transport.close()
+        self.__server.motions += len(data)
+
+    def __on_event(self, event) -> None:
+        t = type(event)
+        if t is Matched:
+            self.score.matched += 1
+            self.__send(EventKind.MATCHED, self.__current)
+        elif t is Mismatched:
+            self.score.mismatched += 1
+            self.__send(EventKind.MISMATCHED, self.__current)
+        elif event is ReadyForNextCombo:
+            actions = self.__server.actions
+            self.__current = self.__rnd.randrange(len(actions))
+            self.__engine.expect(actions[self.__current].combo)
+            self.__send(EventKind.EXPECTED, self.__current)
+
+    def __send(self, kind: EventKind, payload: int) -> None:
+        # NOTE(zeronineseven): Whatever gets produced within one loop iteration goes out in a single write.
+        self.__outgoing += _RECORD.pack(kind, payload)
+        if self.__flush_handle is None:
+            self.__flush_handle = asyncio.get_running_loop().call_soon(self.__flush)
+
+    def __flush(self) -> None:
+        self.__flush_handle = None
+        if not self.__transport.is_closing():
+            self.__transport.write(bytes(self.__outgoing))
+        self.__outgoing.clear()
+        self.__server.writes += 1
+
+
+@attr.mutable
+class TrainingServer:
+    # NOTE(zeronineseven): Headless trainer for many trainees at once. The deck is held once and every connection
+    #                      only adds its own `ComboEngine`, which grades motions as they arrive.
+    def __init__(self, actions: Sequence[NormalizedAction], chords: bool = False, seed: int = 0,
+                 high_water: int = 64 * 1024, backlog: int = 1024):
+        self.__attrs_init__(tuple(actions), deck_fingerprint(actions), chords, seed, high_water, backlog)
+
+    async def serve_unix(self, path: str) -> asyncio.AbstractServer:
+        return await asyncio.get_running_loop().create_unix_server(lambda: _TraineeProtocol(self), path,
+                                                                   backlog=self.backlog)
+
+    async def serve_tcp(self, host: str = "127.0.0.1", port: int = 0) -> asyncio.AbstractServer:
+        return await asyncio.get_running_loop().create_server(lambda: _TraineeProtocol(self), host, port,
+                                                              backlog=self.backlog)
+
+    actions: Tuple[NormalizedAction, ...]
+    fingerprint: int
+    chords: bool
+    seed: int
+    high_water: int
+    backlog: int
+    scores: Dict[str, Score] = attr.ib(factory=dict)
+    accepted: int = 0
+    connections: int = 0
+    motions: int = 0
+    writes: int = 0
+    paused: int = 0
+
+
+@attr.mutable
+class TrainingClient:
+    @classmethod
+    async def open_unix(cls, path: str, name: str) -> "TrainingClient":
+        return await cls._handshake(*await asyncio.open_unix_connection(path), name)
+
+    @classmethod
+    async def open_tcp(cls, host: str, port: int, name: str) -> "TrainingClient":
+        return await cls._handshake(*await asyncio.open_connection(host, port), name)
+
+    @classmethod
+    async def _handshake(cls, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                         name: str) -> "TrainingClient":
+        writer.write(name.encode("utf-8") + b"\n")
+        self = cls(reader, writer)
+        (_, self.deck_size), (_, self.fingerprint) = await self.next_event(), await self.next_event()
+        return self
+
+    async def next_event(self) -> Tuple[EventKind, int]:
+        kind, payload = _RECORD.unpack(await self.reader.readexactly(_RECORD.size))
+        return EventKind(kind), payload
+
+    async def send(self, motions: Iterable[Motion]) -> None:
+        self.writer.write(bytes(motion_to_id(m) for m in motions))
+        await self.writer.drain()
+
+    async def close(self) -> None:
+        self.writer.close()
+        await self.writer.wait_closed()
+
+    reader: asyncio.StreamReader
+    writer: asyncio.StreamWriter
+    deck_size: int = 0
+    fingerprint: int = 0
@@ -0,0 +1,181 @@
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple, Union
+
+import attr
+
+from ._common import NormalizedAction
+from ._recording import _legacy_action_fingerprint, action_fingerprint
+
+__all__ = "ComboStats", "StatsStore"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS attempts (
+    fingerprint INTEGER NOT NULL,
+    context TEXT NOT NULL,
+    matched INTEGER NOT NULL,
+    first_press REAL NOT NULL,
+    complete REAL NOT NULL,
+    at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS combo_stats (
+    fingerprint INTEGER PRIMARY KEY,
+    context TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    errors INTEGER NOT NULL,
+    accuracy REAL NOT NULL,
+    first_press REAL NOT NULL,
+    complete REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS context_stats (
+    context TEXT PRIMARY KEY,
+    attempts INTEGER NOT NULL,
+    errors INTEGER NOT NULL,
+    accuracy REAL NOT NULL,
+    first_press REAL NOT NULL,
+    complete REAL NOT NULL
+);
+"""
+
+# NOTE(zeronineseven): Contexts used to be stored joined by "/", which did not survive contexts containing one.
+#                      Databases still at version 0 get their contexts rewritten as JSON arrays on open.
+_VERSION = 1
+
+_STOP = object()
+
+_log = logging.getLogger("zeronineseven.hotkeys")
+
+
+@attr.mutable
+class ComboStats:
+    attempts: int = 0
+    errors: int = 0
+    accuracy: float = 0.0
+    first_press: float = 0.0
+    complete: float = 0.0
+
+    def add(self, matched: bool, first_press: float, complete: float, alpha: float) -> None:
+        # NOTE(zeronineseven): EWMAs are seeded with the very first attempt instead of decaying from zero.
+        alpha = 1.0 if self.attempts == 0 else alpha
+        self.attempts += 1
+        self.errors += not matched
+        self.accuracy += alpha * (matched - self.accuracy)
+        self.first_press += alpha * (first_press - self.first_press)
+        self.complete += alpha * (complete - self.complete)
+
+
+def _encode_context(context: Tuple[str, ...]) -> str:
+    return json.dumps(context, ensure_ascii=False)
+
+
+def _migrate(connection: sqlite3.Connection) -> None:
+    connection.create_function("encode_legacy_context", 1, lambda c: _encode_context(tuple(c.split("/")) if c else ()),
+                               deterministic=True)
+    with connection:
+        for table in "attempts", "combo_stats", "context_stats":
+            connection.execute(f"UPDATE {table} SET context = encode_legacy_context(context)")
+        connection.execute(f"PRAGMA user_version = {_VERSION}")
+
+
+class StatsStore:
+    def __init__(self, path: Union[str, os.PathLike], alpha: float = 0.2, batch_size: int = 256):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.__alpha = alpha
+        self.__combos: Dict[int, ComboStats] = {}
+        self.__contexts: Dict[str, ComboStats] = {}
+        connection = sqlite3.connect(path)
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(_SCHEMA)
+            if connection.execute("PRAGMA user_version").fetchone()[0] < _VERSION:
+                _migrate(connection)
+            for fingerprint, *stats in connection.execute(
+                    "SELECT fingerprint, attempts, errors, accuracy, first_press, complete FROM combo_stats"):
+                self.__combos[fingerprint] = ComboStats(*stats)
+            for context, *stats in connection.execute(
+                    "SELECT context, attempts, errors, accuracy, first_press, complete FROM context_stats"):
+                self.__contexts[context] = ComboStats(*stats)
+        finally:
+            connection.close()
+        # NOTE(zeronineseven): Aggregates are kept up to date in memory and only mirrored to disk by the writer
+        #                      thread, which commits whatever piled up since its last transaction in one go.
+        self.__pending: "queue.SimpleQueue[object]" = queue.SimpleQueue()
+        self.__lost = 0
+        self.__error: Optional[BaseException] = None
+        self.__writer = threading.Thread(target=self.__write, args=(path, batch_size), name="stats-store",
+                                         daemon=True)
+        self.__writer.start()
+
+    def attempt(self, action: NormalizedAction, matched: bool, first_press: float, complete: float) -> ComboStats:
+        fingerprint, context = action_fingerprint(action), _encode_context(action.context)
+        combo_stats = self.__combos.get(fingerprint) or self.__migrated(action, fingerprint)
+        combo_stats.add(matched, first_press, complete, self.__alpha)
+        context_stats = self.__contexts.setdefault(context, ComboStats())
+        context_stats.add(matched, first_press, complete, self.__alpha)
+        self.__pending.put((fingerprint, context, matched, first_press, complete, time.time(),
+                            attr.astuple(combo_stats), attr.astuple(context_stats)))
+        return combo_stats
+
+    def stats(self, action: NormalizedAction) -> ComboStats:
+        fingerprint = action_fingerprint(action)
+        return self.__combos.get(fingerprint) or self.__migrated(action, fingerprint)
+
+    def context_stats(self) -> Dict[Tuple[str, ...], ComboStats]:
+        return {tuple(json.loads(c)): s for c, s in self.__contexts.items()}
+
+    @property
+    def pending(self) -> int:
+        return self.__pending.qsize()
+
+    def close(self) -> None:
+        self.__pending.put(_STOP)
+        self.__writer.join()
+        if self.__error is not None:
+            raise RuntimeError(f"{self.__lost} attempt(s) could not be stored") from self.__error
+
+    def __enter__(self) -> "StatsStore":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def __migrated(self, action: NormalizedAction, fingerprint: int) -> ComboStats:
+        # NOTE(zeronineseven): Stats kept under the former 32 bit fingerprints are carried over on first use.
+        combo_stats = self.__combos[fingerprint] = self.__combos.pop(_legacy_action_fingerprint(action), ComboStats())
+        return combo_stats
+
+    def __write(self, path: Union[str, os.PathLike], batch_size: int) -> None:
+        connection = sqlite3.connect(path)
+        try:
+            stop = False
+            while not stop:
+                batch = [self.__pending.get()]
+                while len(batch) < batch_size:
+                    try:
+                        batch.append(self.__pending.get_nowait())
+                    except queue.Empty:
+                        break
+                if batch[-1] is _STOP:
+                    stop = True
+                    batch.pop()
+                # NOTE(zeronineseven): A failed batch is logged and dropped, the thread carries on with the next
+                #                      ones. Failures are raised again once the store gets closed.
+                try:
+                    with connection:
+                        connection.executemany("INSERT INTO attempts VALUES (?, ?, ?, ?, ?, ?)",
+                                               [item[:6] for item in batch])
+                        connection.executemany("INSERT OR REPLACE INTO combo_stats VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                               [(item[0], item[1], *item[6]) for item in batch])
+                        connection.executemany("INSERT OR REPLACE INTO context_stats VALUES (?, ?, ?, ?, ?, ?)",
+                                               [(item[1], *item[7]) for item in batch])
+                except Exception as e:
+                    _log.exception("Failed to store %d attempt(s)", len(batch))
+                    self.__lost += len(batch)
+                    self.__error = self.__error or e
+        finally:
+            connection.close()
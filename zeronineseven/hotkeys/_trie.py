@@ -0,0 +1,146 @@
+from typing import AbstractSet, Dict, Iterable, Mapping, Optional, Set, Tuple
+
+import attr
+
+from ._common import CanonicalMotions, Motion, NormalizedAction, canonicalize_motions
+
+__all__ = "ComboTrie", "ComboMatcher"
+
+
+@attr.mutable
+class _Node:
+    children: Dict[Motion, "_Node"] = attr.ib(factory=dict)
+    # NOTE(zeronineseven): Updated in place by `ComboTrie.add` and `ComboTrie.discard`, so that changing a single
+    #                      binding costs the length of its combo rather than a copy of every set along its path.
+    possible: Set[NormalizedAction] = attr.ib(factory=set)
+    exact: Mapping[Tuple[str], Tuple[NormalizedAction, ...]] = attr.ib(factory=dict)
+
+
+_DEAD_END = _Node(possible=frozenset())
+
+
+@attr.frozen
+class ComboTrie:
+    @classmethod
+    def build(cls, actions: Iterable[NormalizedAction]) -> "ComboTrie":
+        root = _Node()
+        nodes = [root]
+        chords: Dict[CanonicalMotions, Dict[Tuple[str], list]] = {}
+        for action in actions:
+            node = root
+            node.possible.add(action)
+            for m in action.combo:
+                try:
+                    node = node.children[m]
+                except KeyError:
+                    node.children[m] = child = _Node()
+                    nodes.append(child)
+                    node = child
+                node.possible.add(action)
+            node.exact.setdefault(action.context, []).append(action)
+            chords.setdefault(canonicalize_motions(action.combo), {}).setdefault(action.context, []).append(action)
+        # NOTE(zeronineseven): Everything a matcher may ask for is precomputed here, so that a step
+        #                      never has to walk the subtree.
+        for node in nodes:
+            node.exact = {c: tuple(a) for c, a in node.exact.items()}
+        return cls(root, {k: {c: tuple(a) for c, a in v.items()} for k, v in chords.items()})
+
+    def add(self, action: NormalizedAction) -> None:
+        # NOTE(zeronineseven): Only the nodes along the combo's path change, so live matchers keep working. Updates
+        #                      run on the event loop, between keystrokes, so no matcher ever sees a half updated node.
+        node = self._root
+        node.possible.add(action)
+        for m in action.combo:
+            child = node.children.get(m)
+            if child is None:
+                node.children[m] = child = _Node()
+            node = child
+            node.possible.add(action)
+        node.exact = {**node.exact, action.context: (*node.exact.get(action.context, ()), action)}
+        key = canonicalize_motions(action.combo)
+        exact = self._chords.get(key, {})
+        self._chords[key] = {**exact, action.context: (*exact.get(action.context, ()), action)}
+
+    def discard(self, action: NormalizedAction) -> None:
+        path = [self._root]
+        for m in action.combo:
+            child = path[-1].children.get(m)
+            if child is None:
+                return
+            path.append(child)
+        if action not in path[-1].possible:
+            return
+        for node in path:
+            node.possible.discard(action)
+        path[-1].exact = self._without(path[-1].exact, action)
+        key = canonicalize_motions(action.combo)
+        exact = self._without(self._chords.get(key, {}), action)
+        if exact:
+            self._chords[key] = exact
+        else:
+            self._chords.pop(key, None)
+        # NOTE(zeronineseven): Nodes left without any action are pruned, so that matchers dead-end as early as before.
+        for parent, m, node in zip(reversed(path[:-1]), reversed(action.combo), reversed(path)):
+            if node.possible:
+                break
+            del parent.children[m]
+
+    @staticmethod
+    def _without(exact: Mapping[Tuple[str], Tuple[NormalizedAction, ...]],
+                 action: NormalizedAction) -> Dict[Tuple[str], Tuple[NormalizedAction, ...]]:
+        remaining = tuple(a for a in exact.get(action.context, ()) if a != action)
+        return {**{c: a for c, a in exact.items() if c != action.context},
+                **({action.context: remaining} if remaining else {})}
+
+    @property
+    def size(self) -> int:
+        return len(self._root.possible)
+
+    def walk(self, ms: Iterable[Motion]) -> "ComboMatcher":
+        matcher = self.matcher()
+        for m in ms:
+            matcher.step(m)
+        return matcher
+
+    def matcher(self) -> "ComboMatcher":
+        return ComboMatcher(self, self._root, 0)
+
+    def exact_chord(self, ms: Iterable[Motion]) -> Mapping[Tuple[str], Tuple[NormalizedAction, ...]]:
+        # NOTE(zeronineseven): Chord-tolerant counterpart of `ComboMatcher.exact`: modifiers held together
+        #                      match in any order.
+        return self._chords.get(canonicalize_motions(ms), {})
+
+    _root: _Node
+    _chords: Mapping[CanonicalMotions, Mapping[Tuple[str], Tuple[NormalizedAction, ...]]]
+
+
+@attr.mutable
+class ComboMatcher:
+    def step(self, m: Motion) -> "ComboMatcher":
+        self._node = self._node.children.get(m, _DEAD_END)
+        self.depth += 1
+        return self
+
+    def reset(self) -> "ComboMatcher":
+        self._node = self.trie._root
+        self.depth = 0
+        return self
+
+    @property
+    def possible(self) -> AbstractSet[NormalizedAction]:
+        return self._node.possible
+
+    @property
+    def exact(self) -> Mapping[Tuple[str], Tuple[NormalizedAction, ...]]:
+        return self._node.exact
+
+    @property
+    def is_dead_end(self) -> bool:
+        return self._node is _DEAD_END
+
+    def exact_in(self, context: Tuple[str]) -> Optional[Tuple[NormalizedAction, ...]]:
+        return self._node.exact.get(context)
+
+    trie: ComboTrie
+    _node: _Node
+    depth: int
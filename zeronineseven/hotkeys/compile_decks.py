@@ -0,0 +1,94 @@
+import argparse
+import functools
+import importlib
+import importlib.util
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
+
+from ._common import _validate_key, NormalizedAction, PackedMotions
+from ._deck_format import write_compiled_deck
+from ._decks import DECKS
+from ._importers import JetBrainsKeymapImporter, import_vscode_keybindings
+
+_Row = Tuple[Tuple[str, ...], bytes, str]
+
+
+def _module_name(source: str) -> str:
+    if source in DECKS:
+        return DECKS[source]
+    if not source.endswith(".py"):
+        return source
+    # NOTE(zeronineseven): Decks living inside this very package use relative imports, so they have to be imported
+    #                      under their proper names rather than straight from their files.
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    if os.path.dirname(os.path.abspath(source)) == package_dir:
+        return f"{__package__}.{os.path.basename(source)[:-3]}"
+    return source
+
+
+def _load_source(source: str, context: Tuple[str, ...]) -> List[_Row]:
+    if source.endswith(".xml"):
+        importer = JetBrainsKeymapImporter([os.path.dirname(os.path.abspath(source))], lambda _: context)
+        return [(a.context, bytes(PackedMotions(a.combo)), a.description) for a in importer.import_file(source)]
+    if source.endswith(".json"):
+        return [(a.context, bytes(PackedMotions(a.combo)), a.description)
+                for a in import_vscode_keybindings(source, contexts=lambda _: context)]
+    module_name = _module_name(source)
+    if module_name.endswith(".py"):
+        spec = importlib.util.spec_from_file_location(f"_deck_{abs(hash(module_name))}", module_name)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    else:
+        module = importlib.import_module(module_name)
+    actions = []
+    for action in module.all_controls:
+        for m in action.combo:
+            _validate_key(m.key)
+        # NOTE(zeronineseven): Packed rows are much cheaper to ship back from a worker than motion objects.
+        actions.append((tuple(action.context), bytes(PackedMotions(action.combo)), action.description))
+    return actions
+
+
+def _compile_source(source: str, context: Tuple[str, ...]) -> Tuple[str, List[_Row], str]:
+    try:
+        return source, _load_source(source, context), ""
+    except Exception as e:
+        return source, [], f"{type(e).__name__}: {e}"
+
+
+def _main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m zeronineseven.hotkeys.compile_decks",
+                                     description="Validate deck sources and compile them into one binary deck.")
+    parser.add_argument("sources", nargs="+",
+                        help="deck names, deck module names, deck .py files, JetBrains keymap .xml files "
+                             "or VS Code keybindings .json files")
+    parser.add_argument("--context", default="Imported",
+                        help="slash separated context to put imported keymaps' actions in (default: %(default)s)")
+    parser.add_argument("-o", "--output", required=True, help="compiled deck to write")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="number of worker processes")
+    args = parser.parse_args()
+
+    compile_source = functools.partial(_compile_source, context=tuple(args.context.split("/")))
+    if args.jobs > 1 and len(args.sources) > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            results = list(pool.map(compile_source, args.sources, chunksize=max(1, len(args.sources) // args.jobs)))
+    else:
+        results = list(map(compile_source, args.sources))
+
+    failed = False
+    for source, _, error in results:
+        if error:
+            failed = True
+            print(f"{source}: {error}", file=sys.stderr)
+    if failed:
+        return 1
+    count = write_compiled_deck(args.output, (NormalizedAction(context, PackedMotions.from_bytes(combo), description)
+                                              for _, rows, _ in results for context, combo, description in rows))
+    print(f"Compiled {count} actions from {len(results)} source(s) into '{args.output}'.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main())
@@ -3,9 +3,9 @@ import functools
 from enum import Enum
 from typing import Tuple
 
-from ._common import normalize_action
+from ._registry import ControlsRegistry
 
-__all__ = "all_controls",
+__all__ = "all_controls", "controls_registry"
 
 
 @enum.unique
@@ -14,7 +14,9 @@ class Mode(tuple, Enum):
     VISUAL = ("Edge", "visual")
 
 
-all_controls = tuple(normalize_action(k, *v) for k, vs in {
+controls_registry = ControlsRegistry()
+
+all_controls = tuple(controls_registry.add(k, *v) for k, vs in {
     Mode.NORMAL: (
         ("↓k", "Scroll one line up."),
         ("↓j", "Scroll one line down."),
@@ -0,0 +1,35 @@
+import argparse
+import importlib
+import sys
+
+from ._conflicts import analyze_controls
+
+
+def _main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m zeronineseven.hotkeys.lint",
+                                     description="Report duplicated, conflicting and shadowed controls.")
+    parser.add_argument("decks", nargs="*", default=["pycharm", "edge"], help="deck modules to check")
+    parser.add_argument("--merged", action="store_true", help="also check all the decks merged together")
+    args = parser.parse_args()
+
+    decks = {name: importlib.import_module(f"{__package__}.{name}") for name in args.decks}
+    reports = {name: analyze_controls(deck.all_controls, getattr(deck, "Mode", ())) for name, deck in decks.items()}
+    if args.merged:
+        reports["<merged>"] = analyze_controls(a for deck in decks.values() for a in deck.all_controls)
+
+    for name, deck in decks.items():
+        registry = getattr(deck, "controls_registry", None)
+        if registry is not None:
+            print(f"{name}: {len(registry)} controls share {sum(1 for _ in registry.bindings())} unique bindings "
+                  f"({registry.dedup_ratio:.2f}x deduplication)")
+
+    failed = False
+    for name, report in reports.items():
+        for finding in report:
+            failed = True
+            print(f"{name}: {type(finding).__name__}: {finding}")
+    return int(failed)
+
+
+if __name__ == "__main__":
+    sys.exit(_main())
@@ -1,9 +1,9 @@
 import enum
 from enum import Enum
 
-from ._common import normalize_action
+from ._registry import ControlsRegistry
 
-__all__ = "all_controls",
+__all__ = "all_controls", "controls_registry"
 
 _modes_root = "PyCharm"
 
@@ -69,7 +69,9 @@ _editor_common_controls = (
     ("↓alt↓shift↓g", "Add carets to the end of each line in the selected block."),
 )
 
-all_controls = tuple(normalize_action(k, *v) for k, vs in {
+controls_registry = ControlsRegistry()
+
+all_controls = tuple(controls_registry.add(k, *v) for k, vs in {
     Mode.PROJECT_NORMAL: (
         *_global_controls,
         *_common_refactoring_controls,
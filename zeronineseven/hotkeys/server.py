@@ -0,0 +1,45 @@
+import argparse
+import asyncio
+import sys
+
+from ._decks import DECKS, load_decks
+from ._server import TrainingServer
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    server = TrainingServer(load_decks(args.decks or DECKS), chords=args.chords)
+    listening = await (server.serve_unix(args.unix) if args.unix else server.serve_tcp(args.host, args.port))
+    print(f"Serving {len(server.actions)} combos on "
+          f"{', '.join(str(s.getsockname()) for s in listening.sockets)}", flush=True)
+    async with listening:
+        try:
+            while True:
+                await asyncio.sleep(args.report_every)
+                print(f"{server.connections} connected, {server.motions} motions graded, "
+                      f"{server.writes} writes, {server.paused} backpressure pauses", flush=True)
+        finally:
+            for name, score in sorted(server.scores.items(), key=lambda item: -item[1].matched):
+                print(f"{name}: {score.matched} matched, {score.mismatched} mismatched")
+
+
+def _main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m zeronineseven.hotkeys.server",
+                                     description="Grade many trainees typing against the same decks at once.")
+    parser.add_argument("--deck", dest="decks", action="append", metavar="DECK",
+                        help=f"serve the given deck only, one of {', '.join(DECKS)} or a compiled .deck file; "
+                             f"may be repeated (default: all of them)")
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9797)
+    parser.add_argument("--chords", action="store_true", help="accept modifiers held together in any order")
+    parser.add_argument("--report-every", type=float, default=10, metavar="SECONDS")
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main())